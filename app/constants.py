@@ -1,5 +1,5 @@
-import secrets
-
-SECRET_KEY = secrets.token_hex(32)
-ENCRYPTION_ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+
+# Must match the sorting whitelist of get_books_function.
+BOOK_SORT_COLUMNS = ("title", "published_year", "genre", "isbn")
+DEFAULT_BOOK_SORT_COLUMN = "title"
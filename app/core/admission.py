@@ -0,0 +1,159 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Optional
+
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import LaneLimits, settings
+from app.core.metrics import ADMISSION_SHED, ADMISSION_WAIT
+
+# (methods or None for any method, path prefix, lane). The first matching rule wins; requests that match
+# no rule (docs, metrics, health, stats, jobs) are not limited. Expensive requests get lanes of their own
+# so that a burst of them cannot take the slots the cheap reads need.
+LANE_RULES: tuple[tuple[Optional[frozenset[str]], str, str], ...] = (
+    (None, "/api/login/", "login"),
+    (None, "/api/register/", "login"),
+    (None, "/api/books/import/", "import"),
+    (None, "/api/books/export/", "export"),
+    (frozenset({"POST"}), "/api/authors/lookup/", "read"),
+    (frozenset({"GET", "HEAD"}), "/api/books/", "read"),
+    (frozenset({"GET", "HEAD"}), "/api/authors/", "read"),
+    (None, "/api/books/", "write"),
+    (None, "/api/authors/", "write"),
+)
+
+
+def classify(method: str, path: str) -> Optional[str]:
+    for methods, prefix, lane in LANE_RULES:
+        if path.startswith(prefix) and (methods is None or method in methods):
+            return lane
+    return None
+
+
+class Lane:
+    """
+    A concurrency limit with a bounded FIFO queue in front of it.
+
+    A freed slot is handed directly to the longest waiting request, so a newcomer cannot overtake the queue.
+    A request is shed when the queue is already full or when it waited longer than `queue_timeout`.
+    """
+
+    def __init__(self, name: str, concurrency: int, queue: int, queue_timeout: float) -> None:
+        self.name = name
+        self.concurrency = concurrency
+        self.max_queue = queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self.admitted = 0
+        self.shed_queue_full = 0
+        self.shed_timeout = 0
+        self.max_queued = 0
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> bool:
+        """Wait for a slot. Returns False when the request is shed; otherwise `release()` must follow."""
+        if self.active < self.concurrency and not self._waiters:
+            self.active += 1
+            self.admitted += 1
+            ADMISSION_WAIT.labels(self.name).observe(0.0)
+            return True
+        if len(self._waiters) >= self.max_queue:
+            self.shed_queue_full += 1
+            ADMISSION_SHED.labels(self.name, "queue_full").inc()
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.max_queued = max(self.max_queued, len(self._waiters))
+        queued_at = time.perf_counter()
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the wait ended; pass it on.
+                self.release()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            if not isinstance(e, asyncio.TimeoutError):
+                raise
+            self.shed_timeout += 1
+            ADMISSION_SHED.labels(self.name, "timeout").inc()
+            return False
+        self.admitted += 1
+        ADMISSION_WAIT.labels(self.name).observe(time.perf_counter() - queued_at)
+        return True
+
+    def release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)  # The slot moves to the waiter; `active` stays the same.
+                return
+        self.active -= 1
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "concurrency": self.concurrency,
+            "active": self.active,
+            "queued": self.queued,
+            "max_queued": self.max_queued,
+            "admitted": self.admitted,
+            "shed_queue_full": self.shed_queue_full,
+            "shed_timeout": self.shed_timeout,
+        }
+
+
+class AdmissionController:
+    def __init__(self, lanes: dict[str, LaneLimits], retry_after: int = 1) -> None:
+        self.lanes = {name: Lane(name, **limits.model_dump()) for name, limits in lanes.items()}
+        self.retry_after = retry_after
+
+    def lane_for(self, method: str, path: str) -> Optional[Lane]:
+        lane = classify(method, path)
+        return self.lanes.get(lane) if lane is not None else None
+
+    def stats(self) -> dict[str, Any]:
+        """Flat `<lane>_<counter>` values, so they can be exported as gauges."""
+        return {f"{name}_{key}": value for name, lane in self.lanes.items() for key, value in lane.stats().items()}
+
+
+class AdmissionControlMiddleware:
+    """
+    Pure ASGI middleware putting each database-bound request into its lane before it reaches the app.
+    The slot is held until the response has been sent completely, streamed exports included.
+    Shed requests are answered with 503 and a Retry-After header without touching the database.
+    """
+
+    def __init__(self, app: ASGIApp, controller: AdmissionController) -> None:
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        lane = self.controller.lane_for(scope["method"], scope["path"]) if scope["type"] == "http" else None
+        if lane is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await lane.acquire():
+            response = JSONResponse(
+                status_code=503,
+                content={"detail": "The server is busy. Please retry later."},
+                headers={"Retry-After": str(self.controller.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            lane.release()
+
+
+admission_controller = AdmissionController(
+    settings.admission_lanes, retry_after=settings.admission_retry_after_seconds
+)
@@ -0,0 +1,281 @@
+import codecs
+import csv
+import io
+import json
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+
+from fastapi import HTTPException, UploadFile
+from pydantic import TypeAdapter, ValidationError
+
+from app.crud.book import create_books_batch_crud
+from app.schemas.book import BookCreate, BookImportError, BookImportReport
+
+_books_adapter = TypeAdapter(list[BookCreate])
+_json_decoder = json.JSONDecoder()
+_NON_WHITESPACE = re.compile(r"\S")
+
+
+async def iter_upload_chunks(file: UploadFile, chunk_size: int) -> AsyncIterator[bytes]:
+    while chunk := await file.read(chunk_size):
+        yield chunk
+
+
+async def _iter_text(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    async for chunk in chunks:
+        if text := decoder.decode(chunk):
+            yield text
+    if text := decoder.decode(b"", final=True):
+        yield text
+
+
+def _split_complete_csv_rows(text: str) -> tuple[str, str]:
+    """
+    Split `text` after its last complete CSV row. A line break only ends a row when it is not inside
+    a quoted field, i.e. when an even number of quote characters precedes it ("" escapes keep the parity).
+    """
+    cut, position, quotes = 0, 0, 0
+    for line in text.splitlines(keepends=True):
+        position += len(line)
+        quotes += line.count('"')
+        if quotes % 2 == 0 and line.endswith(("\n", "\r")):
+            cut = position
+    return text[:cut], text[cut:]
+
+
+async def _iter_complete_csv_text(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    pending = ""
+    async for text in _iter_text(chunks):
+        complete, pending = _split_complete_csv_rows(pending + text)
+        if complete:
+            yield complete
+    if pending:
+        yield pending
+
+
+async def iter_csv_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[dict[str, str]]:
+    """Parse CSV rows as the upload arrives. The first row is the header."""
+    header: Optional[list[str]] = None
+    async for text in _iter_complete_csv_text(chunks):
+        for row in csv.reader(io.StringIO(text, newline="")):
+            if header is None:
+                header = [column.strip() for column in row]
+            elif row:
+                yield dict(zip(header, row))
+
+
+async def iter_json_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[Any]:
+    """Parse the items of a top-level JSON list one by one, without loading the whole document."""
+    texts = _iter_text(chunks)
+    buffer, position = "", 0
+    started, eof = False, False
+    while not eof:
+        text = await anext(texts, None)
+        if text is None:
+            eof = True
+        else:
+            buffer, position = buffer[position:] + text, 0
+
+        while True:
+            match = _NON_WHITESPACE.search(buffer, position)
+            if match is None:
+                position = len(buffer)
+                break
+            position = match.start()
+            char = buffer[position]
+            if not started:
+                if char != "[":
+                    raise ValueError("JSON file must contain a list of books.")
+                started = True
+                position += 1
+            elif char == ",":
+                position += 1
+            elif char == "]":
+                return
+            else:
+                try:
+                    record, end = _json_decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    break  # The item continues in the next chunk.
+                if end == len(buffer) and not eof:
+                    break  # A scalar at the end of the buffer (e.g. a number) may not be complete yet.
+                yield record
+                position = end
+
+    raise ValueError("JSON list is not closed.")
+
+
+@dataclass(frozen=True)
+class UnparsableRecord:
+    """A record that could not be parsed, yielded in its place when the reader can go on with the next one."""
+
+    error: str
+
+
+def _parse_ndjson_line(line: str) -> Any:
+    try:
+        return json.loads(line)
+    except json.JSONDecodeError as e:
+        return UnparsableRecord(f"Invalid JSON: {e}")
+
+
+async def iter_ndjson_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[Any]:
+    """Parse one JSON value per line. Every line stands on its own, so a malformed one only fails its row."""
+    pending = ""
+    async for text in _iter_text(chunks):
+        *lines, pending = (pending + text).split("\n")
+        for line in lines:
+            if line.strip():
+                yield _parse_ndjson_line(line)
+    if pending.strip():
+        yield _parse_ndjson_line(pending)
+
+
+_RECORD_READERS = {"json": iter_json_records, "ndjson": iter_ndjson_records, "csv": iter_csv_records}
+
+
+def get_import_format(filename: Optional[str]) -> Optional[str]:
+    extension = (filename or "").rsplit(".", 1)[-1].lower()
+    return extension if extension in _RECORD_READERS else None
+
+
+class _ImportReportBuilder:
+    def __init__(self, max_reported_errors: int) -> None:
+        self.max_reported_errors = max_reported_errors
+        self.total_rows = 0
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.failed = 0
+        self.errors: list[BookImportError] = []
+        self.errors_truncated = False
+
+    def fail(self, row: int, isbn: Any, error: str) -> None:
+        self.failed += 1
+        if len(self.errors) >= self.max_reported_errors:
+            self.errors_truncated = True
+            return
+        self.errors.append(BookImportError(row=row, isbn=None if isbn is None else str(isbn), error=error))
+
+    def build(self, elapsed_seconds: float) -> BookImportReport:
+        return BookImportReport(
+            total_rows=self.total_rows,
+            imported=self.inserted + self.updated + self.unchanged,
+            inserted=self.inserted,
+            updated=self.updated,
+            unchanged=self.unchanged,
+            failed=self.failed,
+            errors=self.errors,
+            errors_truncated=self.errors_truncated,
+            elapsed_seconds=round(elapsed_seconds, 3),
+            rows_per_second=round(self.total_rows / elapsed_seconds, 1) if elapsed_seconds > 0 else 0.0,
+        )
+
+
+def _validate_batch(records: list[Any]) -> tuple[list[tuple[int, BookCreate]], dict[int, str]]:
+    """
+    Validate a whole batch through BookCreate in one call. If some records are invalid, their errors are
+    collected by position and the remaining records are validated again as a batch.
+    """
+    try:
+        return list(enumerate(_books_adapter.validate_python(records))), {}
+    except ValidationError as e:
+        messages: dict[int, list[str]] = {}
+        for error in e.errors():
+            index, *field = error["loc"]
+            location = ".".join(str(part) for part in field)
+            messages.setdefault(index, []).append(f"{location}: {error['msg']}" if location else error["msg"])
+
+    valid_indexes = [index for index in range(len(records)) if index not in messages]
+    books = _books_adapter.validate_python([records[index] for index in valid_indexes])
+    return list(zip(valid_indexes, books)), {index: "; ".join(errors) for index, errors in messages.items()}
+
+
+async def _import_batch(batch: list[tuple[int, Any]], report: _ImportReportBuilder, upsert: bool) -> None:
+    books, invalid = _validate_batch([record for _, record in batch])
+    for index, error in invalid.items():
+        row, record = batch[index]
+        report.fail(row, record.get("isbn") if isinstance(record, dict) else None, error)
+
+    unique_books: list[tuple[int, BookCreate]] = []
+    seen_isbns: set[str] = set()
+    for index, book in books:
+        if book.isbn in seen_isbns:
+            report.fail(batch[index][0], book.isbn, "Duplicate ISBN in the uploaded file.")
+            continue
+        seen_isbns.add(book.isbn)
+        unique_books.append((batch[index][0], book))
+    if not unique_books:
+        return
+
+    try:
+        written, missing_authors = await create_books_batch_crud([book for _, book in unique_books], upsert=upsert)
+    except HTTPException as e:
+        for row, book in unique_books:
+            report.fail(row, book.isbn, f"Batch failed: {e.detail}")
+        return
+
+    written_by_isbn = {book["isbn"]: book for book in written}
+    for row, book in unique_books:
+        result = written_by_isbn.get(book.isbn)
+        if book.author_name in missing_authors:
+            report.fail(row, book.isbn, f'Author "{book.author_name}" does not exist.')
+        elif result is not None and (not upsert or result["inserted"]):
+            report.inserted += 1
+        elif result is not None:
+            report.updated += 1
+        elif upsert:
+            report.unchanged += 1
+        else:
+            report.fail(row, book.isbn, "Book with this ISBN already exists.")
+
+
+async def run_book_import(
+    chunks: AsyncIterator[bytes],
+    import_format: str,
+    batch_size: int = 1000,
+    max_reported_errors: int = 1000,
+    mode: str = "insert",
+    progress: Optional[Callable[[int, int], Awaitable[None]]] = None,
+) -> BookImportReport:
+    """
+    Import books from a stream of raw file chunks.
+
+    Records are parsed incrementally and processed in batches of `batch_size`: each batch is validated
+    through BookCreate, its author names are resolved with one query and its books are inserted with one
+    set-based statement in a single transaction. Problems are reported per row, including NDJSON lines that
+    are not valid JSON; a JSON or CSV file that cannot be parsed any further stops the import after the rows
+    read so far.
+
+    In "insert" mode rows whose ISBN already exists fail. In "upsert" mode they update the existing book
+    when their data differs and are counted as unchanged otherwise, so a feed can be re-applied cheaply.
+
+    `progress`, if given, is awaited after every batch with the rows read and the rows failed so far.
+    """
+    started = time.perf_counter()
+    report = _ImportReportBuilder(max_reported_errors)
+    batch: list[tuple[int, Any]] = []
+    try:
+        async for record in _RECORD_READERS[import_format](chunks):
+            report.total_rows += 1
+            if isinstance(record, UnparsableRecord):
+                report.fail(report.total_rows, None, record.error)
+                continue
+            batch.append((report.total_rows, record))
+            if len(batch) >= batch_size:
+                await _import_batch(batch, report, upsert=mode == "upsert")
+                batch = []
+                if progress is not None:
+                    await progress(report.total_rows, report.failed)
+    except (ValueError, csv.Error) as e:
+        report.fail(report.total_rows + 1, None, f"Could not parse the file any further: {e}")
+    if batch:
+        await _import_batch(batch, report, upsert=mode == "upsert")
+    if progress is not None:
+        await progress(report.total_rows, report.failed)
+    return report.build(time.perf_counter() - started)
@@ -0,0 +1,328 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+
+import asyncpg
+
+from app.core.config import settings
+from app.core.serialization import dumps
+from app.core.writes import catalog_changed
+from app.crud.change import (
+    get_change_events_bounds_crud,
+    get_change_events_crud,
+    prune_change_events_crud,
+)
+from app.crud.user import USER_CHANNEL, users_changed
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "change_events"
+# Connections to the primary every process opens outside its pool: the change feed's listener.
+DEDICATED_CONNECTIONS = 1
+
+# Events are ordered and resumed by (transaction id, sequence number); see 012_order_change_events_by_snapshot.sql.
+Position = tuple[int, int]
+START: Position = (0, 0)
+
+# Called with the listener's connection and the payloads of the notifications received on a channel, or with
+# None after the listener (re)connected, when notifications may have been missed.
+Invalidation = Callable[[asyncpg.Connection, Optional[set[str]]], Awaitable[None]]
+
+
+class TooManySubscribers(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class ChangeFilter:
+    entity: Optional[str] = None
+    author_id: Optional[int] = None
+
+    def matches(self, event: dict[str, Any]) -> bool:
+        if self.entity is not None and event["entity"] != self.entity:
+            return False
+        return self.author_id is None or self.author_id in (event["author_id"], event["previous_author_id"])
+
+
+class Subscription:
+    """
+    The live events of one client. The queue is bounded: a client that falls more than `max_pending` events
+    behind is cut off and resumes from the database with its last event id, instead of buffering without limit.
+    """
+
+    def __init__(self, change_filter: ChangeFilter, max_pending: int, live_from: Optional[Position]) -> None:
+        self.filter = change_filter
+        # Events after this position reach the queue; older ones are read from the table.
+        self.live_from = live_from
+        self.queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(max_pending)
+        self.overflowed = False
+
+    def offer(self, event: dict[str, Any]) -> bool:
+        if not self.filter.matches(event):
+            return True
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            return False
+        return True
+
+
+def position(event: dict[str, Any]) -> Position:
+    return event["xid"], event["seq"]
+
+
+def format_position(value: Position) -> str:
+    return f"{value[0]}-{value[1]}"
+
+
+def parse_position(token: str) -> Position:
+    """Parse an event id ("<xid>-<seq>") sent back by a client. Raises ValueError if it is malformed."""
+    xid, separator, seq = token.strip().partition("-")
+    if not (separator and xid.isdigit() and seq.isdigit()):
+        raise ValueError(f"Invalid change event id: {token!r}")
+    return int(xid), int(seq)
+
+
+def format_event(event: dict[str, Any]) -> str:
+    return f"id: {format_position(position(event))}\nevent: {event['entity']}\ndata: {dumps(event).decode()}\n\n"
+
+
+class ChangeFeed:
+    """
+    Fans the change events of the primary out to Server-Sent Events clients.
+
+    One dedicated connection per process LISTENs on the 'change_events' channel. A notification only says
+    that new events were committed; the feed then reads every event after the last one it delivered from the
+    change_events table, so a lost notification or a reconnect of the listener never loses events. The same
+    table serves clients that resume with the position (SSE event id) of the last event they received.
+
+    Writers are not serialised, so a transaction can commit events while an older one is still running. The
+    table only hands out events below the oldest running transaction; while committed events are held back
+    that way, the feed looks again every `retry_interval` seconds instead of waiting for a notification.
+
+    The listener also keeps the in-process caches of every worker in step with writes made by the others:
+    notifications on the channels of `invalidations` ('change_events' for the response cache, 'user_changes'
+    for the user cache) are handed to their callback, and after a (re)connect every callback is told that
+    anything may have changed.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        max_clients: int = 1000,
+        max_pending: int = 1000,
+        heartbeat_seconds: float = 15.0,
+        retention_seconds: float = 7 * 24 * 60 * 60,
+        batch_size: int = 500,
+        poll_interval: float = 30.0,
+        retry_interval: float = 0.2,
+        reconnect_delay: float = 1.0,
+        prune_interval: float = 3600.0,
+        invalidations: Optional[dict[str, Invalidation]] = None,
+    ) -> None:
+        self.dsn = dsn
+        self.max_clients = max_clients
+        self.max_pending = max_pending
+        self.heartbeat_seconds = heartbeat_seconds
+        self.retention_seconds = retention_seconds
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.retry_interval = retry_interval
+        self.reconnect_delay = reconnect_delay
+        self.prune_interval = prune_interval
+        self.invalidations = dict(invalidations or {})
+        # Position of the last event handed to the subscribers; None until the feed has started.
+        self.last: Optional[Position] = None
+        self.held_back = False
+        self.connected = False
+        self.delivered = 0
+        self.dropped_subscribers = 0
+        self._subscriptions: set[Subscription] = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._last_pruned = 0.0
+        # Notification payloads per channel not yet handed to its invalidation; None when unknown.
+        self._notified: dict[str, Optional[set[str]]] = {}
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._listen(), name="change-feed")
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    def _notify(self, connection: asyncpg.Connection, pid: int, channel: str, payload: str) -> None:
+        if channel in self.invalidations:
+            payloads = self._notified.setdefault(channel, set())
+            if payloads is not None:
+                payloads.add(payload)
+        self._wakeup.set()
+
+    def _terminated(self, connection: asyncpg.Connection) -> None:
+        self._wakeup.set()
+
+    async def _invalidate(self, conn: asyncpg.Connection) -> None:
+        notified, self._notified = self._notified, {}
+        for channel, payloads in notified.items():
+            try:
+                await self.invalidations[channel](conn, payloads)
+            except Exception:
+                logger.exception("Could not apply the notifications received on %r", channel)
+
+    async def _listen(self) -> None:
+        while True:
+            conn: Optional[asyncpg.Connection] = None
+            try:
+                conn = await asyncpg.connect(self.dsn)
+                for channel in {CHANNEL, *self.invalidations}:
+                    await conn.add_listener(channel, self._notify)
+                conn.add_termination_listener(self._terminated)
+                # Whatever was written while no notification could arrive is unknown.
+                self._notified = dict.fromkeys(self.invalidations)
+                self.connected = True
+                if self.last is None:
+                    self.last = (await get_change_events_bounds_crud())["last"] or START
+                while not conn.is_closed():
+                    await self._invalidate(conn)
+                    # Events committed while no notification could arrive (startup, reconnect) are read as well.
+                    await self.catch_up()
+                    await self._prune_if_due()
+                    try:
+                        timeout = self.retry_interval if self.held_back else self.poll_interval
+                        await asyncio.wait_for(self._wakeup.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
+                    self._wakeup.clear()
+            except Exception as e:
+                logger.warning("Change feed listener failed, reconnecting: %s", e)
+            finally:
+                self.connected = False
+                if conn is not None and not conn.is_closed():
+                    await conn.close()
+            await asyncio.sleep(self.reconnect_delay)
+
+    async def catch_up(self) -> None:
+        """Deliver every settled event after `last` to the subscribers."""
+        while True:
+            events = [dict(record) for record in await get_change_events_crud(self.last, limit=self.batch_size)]
+            for event in events:
+                self.publish(event)
+            if len(events) < self.batch_size:
+                break
+        self.held_back = (await get_change_events_bounds_crud())["held_back"]
+
+    def publish(self, event: dict[str, Any]) -> None:
+        for subscription in list(self._subscriptions):
+            if not subscription.offer(event):
+                self._subscriptions.discard(subscription)
+                self.dropped_subscribers += 1
+        self.last = position(event)
+        self.delivered += 1
+
+    async def _prune_if_due(self) -> None:
+        if time.monotonic() - self._last_pruned < self.prune_interval:
+            return
+        self._last_pruned = time.monotonic()
+        pruned = await prune_change_events_crud(self.retention_seconds)
+        if pruned:
+            logger.info("Pruned %s change events", pruned)
+
+    def check_capacity(self) -> None:
+        if len(self._subscriptions) >= self.max_clients:
+            raise TooManySubscribers()
+
+    def subscribe(self, change_filter: ChangeFilter) -> Subscription:
+        self.check_capacity()
+        subscription = Subscription(change_filter, self.max_pending, self.last)
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscriptions.discard(subscription)
+
+    async def _replay(
+        self, subscription: Subscription, after: Position, until: Position
+    ) -> AsyncIterator[dict[str, Any]]:
+        change_filter = subscription.filter
+        while after < until:
+            events = await get_change_events_crud(
+                after, until, self.batch_size, change_filter.entity, change_filter.author_id
+            )
+            for event in events:
+                yield dict(event)
+            if len(events) < self.batch_size:
+                return
+            after = position(events[-1])
+
+    async def stream(self, change_filter: ChangeFilter, after: Optional[Position] = None) -> AsyncIterator[str]:
+        """
+        Server-Sent Events for one client: first the stored events after `after` (the resume token), then the
+        live ones. A `reset` event tells a client that events it missed were already pruned, so it has to
+        reload its state. The stream ends when the client fell too far behind; the client then reconnects
+        with its Last-Event-ID and continues from the database.
+
+        The subscription is only made once the response body is iterated and is removed when the iteration
+        ends, so a response that is never sent leaves nothing behind.
+        """
+        retry = f"retry: {int(self.reconnect_delay * 1000)}\n\n"
+        try:
+            subscription = self.subscribe(change_filter)
+        except TooManySubscribers:
+            # Other clients took the free places since the request was accepted: only ask this one to retry.
+            yield retry
+            return
+        try:
+            yield retry
+            live_from = subscription.live_from
+            if live_from is None:
+                live_from = (await get_change_events_bounds_crud())["last"] or START
+            sent = live_from
+            if after is not None and after < live_from:
+                pruned = (await get_change_events_bounds_crud())["pruned"]
+                if pruned is not None and after < pruned:
+                    yield f"event: reset\ndata: {dumps({'pruned': format_position(pruned)}).decode()}\n\n"
+                async for event in self._replay(subscription, after, live_from):
+                    yield format_event(event)
+            elif after is not None:
+                sent = after
+
+            while True:
+                if subscription.overflowed and subscription.queue.empty():
+                    return
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), self.heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if position(event) > sent:
+                    sent = position(event)
+                    yield format_event(event)
+        finally:
+            self.unsubscribe(subscription)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "connected": int(self.connected),
+            "subscribers": len(self._subscriptions),
+            "last_seq": self.last[1] if self.last else 0,
+            "held_back": int(self.held_back),
+            "delivered": self.delivered,
+            "dropped_subscribers": self.dropped_subscribers,
+        }
+
+
+change_feed = ChangeFeed(
+    settings.db_url,
+    max_clients=settings.change_stream_max_clients,
+    max_pending=settings.change_stream_max_pending,
+    heartbeat_seconds=settings.change_stream_heartbeat_seconds,
+    retention_seconds=settings.change_events_retention_seconds,
+    invalidations={CHANNEL: catalog_changed, USER_CHANNEL: users_changed},
+)
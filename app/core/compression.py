@@ -0,0 +1,217 @@
+import zlib
+from typing import Callable, Optional, Protocol, Sequence
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import RESPONSE_COMPRESSION_BYTES
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "application/problem+json",
+    "image/svg+xml",
+)
+# Server-Sent Events must reach the client event by event; intermediaries tend to buffer compressed streams.
+UNCOMPRESSED_TYPES = ("text/event-stream",)
+
+
+class Encoder(Protocol):
+    def compress(self, data: bytes) -> bytes:
+        """Feed data; may return nothing while the compressor buffers it."""
+
+    def flush(self) -> bytes:
+        """Emit everything compressed so far while keeping the stream open."""
+
+    def finish(self) -> bytes:
+        """Emit the rest and end the stream."""
+
+
+class GzipEncoder:
+    def __init__(self, level: int) -> None:
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class ZstdEncoder:
+    def __init__(self, level: int) -> None:
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class BrotliEncoder:
+    def __init__(self, level: int) -> None:
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+# Content-Encoding token -> encoder factory taking a compression level; only the installed libraries are listed.
+ENCODERS: dict[str, Callable[[int], Encoder]] = {"gzip": GzipEncoder}
+if zstandard is not None:
+    ENCODERS["zstd"] = ZstdEncoder
+if brotli is not None:
+    ENCODERS["br"] = BrotliEncoder
+
+
+def _quality(value: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        return 0.0
+
+
+def negotiate(accept_encoding: Optional[str], encodings: Sequence[str]) -> Optional[str]:
+    """
+    Pick the encoding for a request from `encodings` (in the server's order of preference) by the
+    q-values of its Accept-Encoding header. Returns None when the client accepts none of them.
+    """
+    if not accept_encoding:
+        return None
+    accepted: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        token, _, params = item.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                quality = _quality(value.strip())
+        if token:
+            accepted[token.strip().lower()] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in encodings:
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def _compressible(headers: Headers, status: int) -> bool:
+    if status < 200 or status in (204, 304) or "content-encoding" in headers:
+        return False
+    content_type = headers.get("content-type", "").lower()
+    return content_type.startswith(COMPRESSIBLE_TYPES) and not content_type.startswith(UNCOMPRESSED_TYPES)
+
+
+class CompressionMiddleware:
+    """
+    Pure ASGI middleware compressing response bodies with the best encoding the client accepts.
+
+    Bodies are compressed message by message: every chunk of a streaming response (e.g. an export batch) is
+    compressed and flushed as it passes, so nothing is buffered beyond `minimum_size` bytes. That much is
+    held back to decide whether compressing pays off; bodies that end before reaching it are sent as they are.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        encodings: Sequence[str] = ("zstd", "br", "gzip"),
+        levels: Optional[dict[str, int]] = None,
+        minimum_size: int = 1024,
+    ) -> None:
+        self.app = app
+        self.encodings = [encoding for encoding in encodings if encoding in ENCODERS]
+        self.levels = {"gzip": 6, "zstd": 3, "br": 4, **(levels or {})}
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding"), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        pending: list[bytes] = []
+        pending_size = 0
+        encoder: Optional[Encoder] = None
+        passthrough = False
+
+        async def send_compressed(body: bytes, more_body: bool) -> None:
+            compressed = encoder.compress(body) + (encoder.flush() if more_body else encoder.finish())
+            RESPONSE_COMPRESSION_BYTES.labels(encoding, "in").inc(len(body))
+            RESPONSE_COMPRESSION_BYTES.labels(encoding, "out").inc(len(compressed))
+            await send({"type": "http.response.body", "body": compressed, "more_body": more_body})
+
+        async def send_with_compression(message: Message) -> None:
+            nonlocal start, pending_size, encoder, passthrough
+            if message["type"] == "http.response.start":
+                if _compressible(Headers(raw=message["headers"]), message["status"]):
+                    start = message
+                else:
+                    passthrough = True
+                    await send(message)
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body, more_body = message.get("body", b""), message.get("more_body", False)
+            if encoder is not None:
+                if body or not more_body:
+                    await send_compressed(body, more_body)
+                return
+
+            pending.append(body)
+            pending_size += len(body)
+            if more_body and pending_size < self.minimum_size:
+                return
+            if pending_size < self.minimum_size:
+                # The whole body is smaller than the threshold: not worth compressing.
+                passthrough = True
+                await send(start)
+                await send({"type": "http.response.body", "body": b"".join(pending), "more_body": False})
+                return
+
+            headers = MutableHeaders(raw=list(start["headers"]))
+            del headers["content-length"]
+            headers["content-encoding"] = encoding
+            headers.add_vary_header("Accept-Encoding")
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                # The compressed bytes differ from the identity representation the strong ETag was made for.
+                headers["etag"] = f"W/{etag}"
+            encoder = ENCODERS[encoding](self.levels[encoding])
+            await send({**start, "headers": headers.raw})
+            await send_compressed(b"".join(pending), more_body)
+
+        await self.app(scope, receive, send_with_compression)
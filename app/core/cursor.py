@@ -0,0 +1,47 @@
+import base64
+import binascii
+import json
+from typing import Any, Mapping, Optional, Sequence
+
+from app.constants import BOOK_SORT_COLUMNS, DEFAULT_BOOK_SORT_COLUMN
+
+
+def normalize_book_sort(sort_by: str, sort_order: str) -> tuple[str, str]:
+    """Apply the same sorting whitelist as the stored functions do."""
+    if sort_by not in BOOK_SORT_COLUMNS:
+        sort_by = DEFAULT_BOOK_SORT_COLUMN
+    sort_order = sort_order.lower()
+    if sort_order not in ("asc", "desc"):
+        sort_order = "asc"
+    return sort_by, sort_order
+
+
+def encode_cursor(sort_by: str, sort_order: str, value: Any, last_id: int) -> str:
+    payload = json.dumps({"s": sort_by, "o": sort_order, "v": value, "id": last_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_by: str, sort_order: str) -> tuple[Any, int]:
+    """
+    Decode an opaque cursor into the (sort value, id) pair of the last row seen.
+    Raises ValueError if the cursor is malformed or was issued for a different sort order.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        value, last_id = payload["v"], int(payload["id"])
+        issued_for = (payload["s"], payload["o"])
+    except (binascii.Error, UnicodeError, ValueError, TypeError, KeyError):
+        raise ValueError("Invalid cursor.")
+    if issued_for != normalize_book_sort(sort_by, sort_order):
+        raise ValueError("Cursor does not match the requested sorting.")
+    return value, last_id
+
+
+def next_book_cursor(books: Sequence[Mapping[str, Any]], sort_by: str, sort_order: str, limit: int) -> Optional[str]:
+    """Return the cursor of the page following `books`, or None if this was the last page."""
+    if not books or len(books) < limit:
+        return None
+    sort_by, sort_order = normalize_book_sort(sort_by, sort_order)
+    last = books[-1]
+    return encode_cursor(sort_by, sort_order, last[sort_by], last["id"])
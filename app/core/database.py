@@ -0,0 +1,204 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+import asyncpg
+
+from app.core.config import settings
+from app.core.metrics import DB_POOL_ACQUIRE_DURATION, DB_REPLICA_READS
+from app.core.replication import format_lsn, required_lsn
+
+logger = logging.getLogger(__name__)
+
+_pool: Optional[asyncpg.Pool] = None
+_pool_loop: Optional[asyncio.AbstractEventLoop] = None
+_replica_pool: Optional[asyncpg.Pool] = None
+_replica_pool_loop: Optional[asyncio.AbstractEventLoop] = None
+# Monotonic time until which the replica is skipped after it failed.
+_replica_down_until = 0.0
+
+
+async def _create_pool(dsn: str) -> asyncpg.Pool:
+    return await asyncpg.create_pool(
+        dsn,
+        min_size=settings.db_pool_min_size,
+        max_size=settings.db_pool_max_size,
+        max_inactive_connection_lifetime=settings.db_pool_max_inactive_connection_lifetime,
+    )
+
+
+async def init_pool() -> asyncpg.Pool:
+    """
+    Create the application-wide connection pool and warm it up.
+
+    asyncpg opens `db_pool_min_size` connections while creating the pool; a trivial
+    query afterwards makes sure the server actually accepts them before we serve traffic.
+    """
+    global _pool, _pool_loop
+    if _pool is not None and _pool_loop is asyncio.get_running_loop():
+        return _pool
+
+    pool = await _create_pool(settings.db_url)
+    # Another coroutine may have finished creating the pool while we were connecting.
+    if _pool is not None and _pool_loop is asyncio.get_running_loop():
+        await pool.close()
+        return _pool
+
+    _pool, _pool_loop = pool, asyncio.get_running_loop()
+    await _pool.execute("SELECT 1")
+    return _pool
+
+
+async def init_replica_pool() -> Optional[asyncpg.Pool]:
+    """
+    Create the replica pool when a replica is configured. An unreachable replica is not fatal:
+    reads go to the primary until a later attempt succeeds.
+    """
+    global _replica_pool, _replica_pool_loop
+    if not settings.database_replica_url:
+        return None
+    if _replica_pool is not None and _replica_pool_loop is asyncio.get_running_loop():
+        return _replica_pool
+
+    try:
+        pool = await _create_pool(settings.database_replica_url)
+    except (OSError, asyncio.TimeoutError, asyncpg.PostgresError) as e:
+        _mark_replica_down(e)
+        return None
+    if _replica_pool is not None and _replica_pool_loop is asyncio.get_running_loop():
+        await pool.close()
+        return _replica_pool
+
+    _replica_pool, _replica_pool_loop = pool, asyncio.get_running_loop()
+    return _replica_pool
+
+
+async def close_pool() -> None:
+    global _pool, _pool_loop, _replica_pool, _replica_pool_loop
+    if _pool is not None:
+        await _pool.close()
+    if _replica_pool is not None:
+        await _replica_pool.close()
+    _pool = _replica_pool = None
+    _pool_loop = _replica_pool_loop = None
+
+
+async def get_pool() -> asyncpg.Pool:
+    """
+    FastAPI dependency returning the shared pool.
+    The pool is created lazily when the lifespan hook did not run (e.g. tests using ASGITransport)
+    or when it was bound to an event loop that is no longer running.
+    """
+    if _pool is None or _pool_loop is not asyncio.get_running_loop():
+        return await init_pool()
+    return _pool
+
+
+@asynccontextmanager
+async def get_connection() -> AsyncIterator[asyncpg.Connection]:
+    """Acquire a connection to the primary from the shared pool and release it back when done."""
+    pool = await get_pool()
+    started = time.perf_counter()
+    async with pool.acquire(timeout=settings.db_pool_acquire_timeout) as conn:
+        DB_POOL_ACQUIRE_DURATION.observe(time.perf_counter() - started)
+        yield conn
+
+
+async def _replica_caught_up(conn: asyncpg.Connection, lsn: Optional[int]) -> bool:
+    """Wait up to `replica_max_wait_seconds` for the replica to replay the WAL up to `lsn`."""
+    if lsn is None:
+        return True
+    deadline = time.monotonic() + settings.replica_max_wait_seconds
+    while True:
+        # NULL when the server is not a streaming standby; then its data cannot be trusted to be current.
+        caught_up = await conn.fetchval("SELECT pg_last_wal_replay_lsn() >= $1::text::pg_lsn", format_lsn(lsn))
+        if caught_up:
+            return True
+        if caught_up is None or time.monotonic() >= deadline:
+            return False
+        await asyncio.sleep(0.005)
+
+
+def _mark_replica_down(error: Exception) -> None:
+    global _replica_down_until
+    logger.warning("Replica is unavailable, reading from the primary: %s", error)
+    _replica_down_until = time.monotonic() + settings.replica_retry_after_seconds
+
+
+async def _acquire_replica() -> Optional[tuple[asyncpg.Pool, asyncpg.Connection]]:
+    """A replica connection that has caught up with the required LSN, or None to read from the primary."""
+    if time.monotonic() < _replica_down_until:
+        DB_REPLICA_READS.labels("unavailable").inc()
+        return None
+    pool = _replica_pool
+    if pool is None or _replica_pool_loop is not asyncio.get_running_loop():
+        pool = await init_replica_pool()
+        if pool is None:
+            DB_REPLICA_READS.labels("unavailable").inc()
+            return None
+
+    try:
+        conn = await pool.acquire(timeout=settings.replica_acquire_timeout)
+    except (OSError, asyncio.TimeoutError, asyncpg.PostgresError) as e:
+        _mark_replica_down(e)
+        DB_REPLICA_READS.labels("unavailable").inc()
+        return None
+
+    try:
+        if await _replica_caught_up(conn, required_lsn()):
+            DB_REPLICA_READS.labels("replica").inc()
+            return pool, conn
+        DB_REPLICA_READS.labels("lagging").inc()
+    except (OSError, asyncpg.PostgresError) as e:
+        _mark_replica_down(e)
+        DB_REPLICA_READS.labels("unavailable").inc()
+    await pool.release(conn)
+    return None
+
+
+@asynccontextmanager
+async def get_read_connection() -> AsyncIterator[asyncpg.Connection]:
+    """
+    Acquire a connection for a read-only query: from the replica when one is configured, reachable and
+    caught up with the writes this client and this process have made, otherwise from the primary.
+    """
+    replica = await _acquire_replica() if settings.database_replica_url else None
+    if replica is None:
+        async with get_connection() as conn:
+            yield conn
+        return
+
+    pool, conn = replica
+    try:
+        yield conn
+    finally:
+        await pool.release(conn)
+
+
+def _stats(pool: Optional[asyncpg.Pool]) -> dict[str, int]:
+    if pool is None:
+        return {}
+    size, idle = pool.get_size(), pool.get_idle_size()
+    return {
+        "size": size,
+        "idle": idle,
+        "in_use": size - idle,
+        "min_size": pool.get_min_size(),
+        "max_size": pool.get_max_size(),
+    }
+
+
+def pool_stats() -> dict[str, int]:
+    return _stats(_pool)
+
+
+def replica_pool_stats() -> dict[str, int]:
+    return _stats(_replica_pool)
+
+
+async def get_db_connection() -> AsyncIterator[asyncpg.Connection]:
+    """FastAPI dependency yielding a pooled connection for the duration of the request."""
+    async with get_connection() as conn:
+        yield conn
@@ -0,0 +1,50 @@
+import csv
+import io
+import json
+from typing import Any, AsyncIterator
+
+EXPORT_FIELDNAMES = ["id", "title", "isbn", "published_year", "genre", "author_id", "author_name"]
+EXPORT_MEDIA_TYPES = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+async def _csv_chunks(batches: AsyncIterator[list[dict[str, Any]]]) -> AsyncIterator[str]:
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=EXPORT_FIELDNAMES, extrasaction="ignore")
+    writer.writeheader()
+    yield output.getvalue()
+
+    async for batch in batches:
+        output.seek(0)
+        output.truncate()
+        writer.writerows(batch)
+        yield output.getvalue()
+
+
+async def _json_chunks(batches: AsyncIterator[list[dict[str, Any]]]) -> AsyncIterator[str]:
+    yield "["
+    separator = ""
+    async for batch in batches:
+        if batch:
+            yield separator + ",".join(json.dumps(book) for book in batch)
+            separator = ","
+    yield "]"
+
+
+async def _ndjson_chunks(batches: AsyncIterator[list[dict[str, Any]]]) -> AsyncIterator[str]:
+    async for batch in batches:
+        yield "".join(json.dumps(book) + "\n" for book in batch)
+
+
+_WRITERS = {"csv": _csv_chunks, "json": _json_chunks, "ndjson": _ndjson_chunks}
+
+
+def export_chunks(batches: AsyncIterator[list[dict[str, Any]]], export_format: str) -> AsyncIterator[str]:
+    """
+    Encode batches of book rows as they arrive. The opening chunk (CSV header, '[') is produced
+    before the first batch is awaited, so clients get the first byte without waiting on the database.
+    """
+    return _WRITERS[export_format](batches)
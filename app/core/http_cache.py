@@ -0,0 +1,140 @@
+import hashlib
+import json
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.serialization import dumps, to_builtins
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    etag: str
+    headers: dict[str, str] = field(default_factory=dict)
+
+
+class CacheBackend(ABC):
+    """
+    Storage for cached responses plus the catalog version they were produced at.
+    Keeping the version in the backend lets a shared backend invalidate every process at once.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        """Return the cached response stored under `key`, if any."""
+
+    @abstractmethod
+    async def set(self, key: str, value: CachedResponse) -> None:
+        """Store a response under `key`."""
+
+    @abstractmethod
+    async def get_version(self) -> int:
+        """Return the current catalog version."""
+
+    @abstractmethod
+    async def bump_version(self) -> int:
+        """Advance the catalog version after a write and return the new one."""
+
+    def stats(self) -> dict[str, Any]:
+        return {}
+
+
+class InMemoryCacheBackend(CacheBackend):
+    def __init__(self, max_size: int, ttl: float) -> None:
+        self._cache = TTLCache(max_size=max_size, ttl=ttl)
+        self._version = 0
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: CachedResponse) -> None:
+        self._cache.set(key, value)
+
+    async def get_version(self) -> int:
+        return self._version
+
+    async def bump_version(self) -> int:
+        self._version += 1
+        # Entries of older versions can no longer be reached; free the memory right away.
+        self._cache.clear()
+        return self._version
+
+    def stats(self) -> dict[str, Any]:
+        return {"version": self._version, **self._cache.stats()}
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison: a W/ prefix does not matter.
+    candidates = (candidate.strip().removeprefix("W/") for candidate in if_none_match.split(","))
+    return etag in candidates
+
+
+class ResponseCache:
+    """
+    Read-through cache of serialised JSON responses with strong ETags.
+
+    Keys combine the request path, the normalised query parameters and the catalog version;
+    every catalog write bumps the version, which makes all previously cached responses unreachable.
+    The in-memory backend keeps a version per worker process: a process bumps its own right after its writes,
+    and the others when the change feed's notification of the commit reaches them. Until then, or while their
+    listener is reconnecting, they can still answer from the older version.
+
+    In `trusted` mode the loaded content (stored-function records) is encoded directly with orjson;
+    otherwise it is validated through the response model's adapter first.
+    """
+
+    def __init__(self, backend: CacheBackend, max_age: int = 0, trusted: bool = False) -> None:
+        self.backend = backend
+        self.max_age = max_age
+        self.trusted = trusted
+
+    def encode(self, content: Any, adapter: TypeAdapter) -> bytes:
+        if self.trusted:
+            return dumps(content)
+        return adapter.dump_json(adapter.validate_python(to_builtins(content)))
+
+    async def bump_version(self) -> int:
+        return await self.backend.bump_version()
+
+    async def respond(
+        self,
+        request: Request,
+        load: Callable[[], Awaitable[tuple[Any, dict[str, str]]]],
+        adapter: TypeAdapter,
+        params: Optional[dict[str, Any]] = None,
+    ) -> Response:
+        """
+        Return the cached response for this request, or build it with `load` (returning the content and
+        extra response headers) encoded as described above. Answers 304 when the client's ETag is current.
+        """
+        version = await self.backend.get_version()
+        key = f"{request.url.path}?{json.dumps(params or {}, sort_keys=True, default=str)}#{version}"
+        entry = await self.backend.get(key)
+        if entry is None:
+            content, headers = await load()
+            body = self.encode(content, adapter)
+            etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+            entry = CachedResponse(body=body, etag=etag, headers=headers)
+            await self.backend.set(key, entry)
+
+        headers = {"ETag": entry.etag, "Cache-Control": f"public, max-age={self.max_age}", **entry.headers}
+        if _etag_matches(request.headers.get("if-none-match"), entry.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+response_cache = ResponseCache(
+    InMemoryCacheBackend(max_size=settings.http_cache_max_entries, ttl=settings.http_cache_ttl_seconds),
+    max_age=settings.http_cache_max_age,
+    trusted=settings.trusted_results,
+)
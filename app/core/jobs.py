@@ -0,0 +1,234 @@
+import asyncio
+import logging
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+from uuid import UUID
+
+from app.core.book_import import run_book_import
+from app.core.config import settings
+from app.core.export import export_chunks
+from app.core.metrics import JOB_DURATION, JOBS_FINISHED
+from app.crud.book import iter_books_crud
+from app.crud.job import (
+    claim_job_crud,
+    expire_jobs_crud,
+    finish_job_crud,
+    update_job_progress_crud,
+)
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_NAME = "upload"
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobProgress:
+    """Reports the counters of a running job. Raises JobCancelled once the job's cancellation was requested."""
+
+    def __init__(self, job_id: UUID) -> None:
+        self.job_id = job_id
+
+    async def __call__(self, processed_rows: int, failed_rows: int = 0) -> None:
+        if await update_job_progress_crud(self.job_id, processed_rows, failed_rows):
+            raise JobCancelled()
+
+
+# A handler runs one job with its own directory and returns the job's result and the name of its
+# result file inside that directory, if it produced one.
+JobResult = tuple[Optional[dict[str, Any]], Optional[str]]
+JobHandler = Callable[[dict[str, Any], JobProgress, Path], Awaitable[JobResult]]
+
+
+async def _read_chunks(path: Path, chunk_size: int) -> AsyncIterator[bytes]:
+    with open(path, "rb") as file:
+        while chunk := await asyncio.to_thread(file.read, chunk_size):
+            yield chunk
+
+
+async def save_upload(chunks: AsyncIterator[bytes], directory: Path) -> None:
+    """Store an upload in a job directory before the job is queued, so any worker of this node can pick it up."""
+    await asyncio.to_thread(directory.mkdir, parents=True, exist_ok=True)
+    with open(directory / UPLOAD_NAME, "wb") as file:
+        async for chunk in chunks:
+            await asyncio.to_thread(file.write, chunk)
+
+
+async def run_import_job(job: dict[str, Any], progress: JobProgress, directory: Path) -> JobResult:
+    params = job["params"]
+    upload = directory / UPLOAD_NAME
+    report = await run_book_import(
+        _read_chunks(upload, settings.import_read_chunk_size),
+        params["format"],
+        batch_size=settings.import_batch_size,
+        max_reported_errors=settings.import_max_reported_errors,
+        mode=params["mode"],
+        progress=progress,
+    )
+    await asyncio.to_thread(upload.unlink, missing_ok=True)
+    return report.model_dump(mode="json"), None
+
+
+async def run_export_job(job: dict[str, Any], progress: JobProgress, directory: Path) -> JobResult:
+    export_format = job["params"]["format"]
+    file_name = f"books.{export_format}"
+    partial = directory / f"{file_name}.part"
+    rows = 0
+
+    async def counted_batches():
+        nonlocal rows
+        async for batch in iter_books_crud(settings.export_fetch_batch_size):
+            rows += len(batch)
+            await progress(rows)
+            yield batch
+
+    await asyncio.to_thread(directory.mkdir, parents=True, exist_ok=True)
+    with open(partial, "w", encoding="utf-8", newline="") as file:
+        async for chunk in export_chunks(counted_batches(), export_format):
+            await asyncio.to_thread(file.write, chunk)
+    # The result file only appears under its final name once it is complete.
+    await asyncio.to_thread(os.replace, partial, directory / file_name)
+    return {"rows": rows, "format": export_format}, file_name
+
+
+JOB_HANDLERS: dict[str, JobHandler] = {"import": run_import_job, "export": run_export_job}
+
+
+class JobWorkers:
+    """
+    A bounded pool of in-process workers that run jobs from the `jobs` table.
+
+    Each of the `concurrency` workers claims the oldest queued job, runs its handler and records the
+    outcome; an idle worker sleeps until `notify()` is called or `poll_interval` has passed, so jobs
+    queued by other processes are picked up as well. Only jobs of `node_id` are claimed: their files are in
+    `directory`, which other nodes cannot read. A housekeeping task periodically fails jobs whose
+    worker stopped sending heartbeats and deletes finished jobs, with their files, after `retention_seconds`.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        concurrency: int = 2,
+        poll_interval: float = 5.0,
+        retention_seconds: float = 24 * 60 * 60,
+        stale_seconds: float = 300.0,
+        cleanup_interval: float = 600.0,
+        handlers: Optional[dict[str, JobHandler]] = None,
+        node_id: str = "local",
+    ) -> None:
+        self.directory = Path(directory)
+        self.node_id = node_id
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.retention_seconds = retention_seconds
+        self.stale_seconds = stale_seconds
+        self.cleanup_interval = cleanup_interval
+        self.handlers = JOB_HANDLERS if handlers is None else handlers
+        self._tasks: list[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self.running = 0
+        self.finished = 0
+
+    def job_directory(self, job_id: UUID) -> Path:
+        return self.directory / str(job_id)
+
+    async def remove_job_directory(self, job_id: UUID) -> None:
+        await asyncio.to_thread(shutil.rmtree, self.job_directory(job_id), ignore_errors=True)
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        await asyncio.to_thread(self.directory.mkdir, parents=True, exist_ok=True)
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._work(), name=f"job-worker-{i}") for i in range(self.concurrency)]
+        self._tasks.append(asyncio.create_task(self._clean_up_periodically(), name="job-cleanup"))
+
+    async def stop(self) -> None:
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def notify(self) -> None:
+        """Wake idle workers after a job was queued."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _work(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                job = await claim_job_crud(self.node_id)
+            except Exception:
+                logger.exception("Could not claim a job")
+                job = None
+            if job is not None:
+                try:
+                    await self.run(job)
+                except Exception:
+                    logger.exception("Could not record the outcome of job %s", job["id"])
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run(self, job: dict[str, Any]) -> str:
+        """Run a claimed job and record how it ended. Returns the final status."""
+        started = time.perf_counter()
+        self.running += 1
+        result, result_file, error = None, None, None
+        try:
+            handler = self.handlers[job["kind"]]
+            result, result_file = await handler(job, JobProgress(job["id"]), self.job_directory(job["id"]))
+            status = "succeeded"
+        except JobCancelled:
+            status = "cancelled"
+        except asyncio.CancelledError:
+            # The server is shutting down; record that before letting the cancellation through.
+            await asyncio.shield(finish_job_crud(job["id"], "failed", error="Interrupted by a server shutdown."))
+            raise
+        except Exception as e:
+            logger.exception("Job %s (%s) failed", job["id"], job["kind"])
+            status, error = "failed", str(e) or type(e).__name__
+        finally:
+            self.running -= 1
+
+        await finish_job_crud(job["id"], status, result=result, result_file=result_file, error=error)
+        self.finished += 1
+        JOBS_FINISHED.labels(job["kind"], status).inc()
+        JOB_DURATION.labels(job["kind"]).observe(time.perf_counter() - started)
+        return status
+
+    async def clean_up(self) -> list[UUID]:
+        expired = await expire_jobs_crud(self.retention_seconds, self.stale_seconds)
+        for job_id in expired:
+            await self.remove_job_directory(job_id)
+        return expired
+
+    async def _clean_up_periodically(self) -> None:
+        while True:
+            try:
+                await self.clean_up()
+            except Exception:
+                logger.exception("Job cleanup failed")
+            await asyncio.sleep(self.cleanup_interval)
+
+    def stats(self) -> dict[str, Any]:
+        return {"workers": self.concurrency, "running": self.running, "finished": self.finished}
+
+
+job_workers = JobWorkers(
+    settings.job_directory,
+    concurrency=settings.job_workers,
+    poll_interval=settings.job_poll_interval_seconds,
+    retention_seconds=settings.job_retention_seconds,
+    stale_seconds=settings.job_stale_seconds,
+    cleanup_interval=settings.job_cleanup_interval_seconds,
+    node_id=settings.job_node_id,
+)
@@ -0,0 +1,138 @@
+import hmac
+import logging
+import secrets
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import jwt
+
+logger = logging.getLogger(__name__)
+
+# HMAC secrets shorter than the SHA-256 block output are easy to brute-force offline.
+MIN_SECRET_LENGTH = 32
+
+
+class KeyConfigurationError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class VerificationKey:
+    kid: str
+    algorithm: str
+    key: Any
+
+
+def _load_pem(material: str, private: bool) -> tuple[str, Any]:
+    """Load a PEM key and pick its algorithm from the key type: RSA keys sign RS256, Ed25519 keys EdDSA."""
+    try:
+        from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+        from cryptography.hazmat.primitives.serialization import (
+            load_pem_private_key,
+            load_pem_public_key,
+        )
+    except ImportError:  # pragma: no cover - depends on the installed extras
+        raise KeyConfigurationError("PEM keys (RS256/EdDSA) need the 'cryptography' package to be installed.")
+
+    data = material.encode()
+    key = load_pem_private_key(data, password=None) if private else load_pem_public_key(data)
+    if isinstance(key, (rsa.RSAPrivateKey, rsa.RSAPublicKey)):
+        return "RS256", key
+    if isinstance(key, (ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey)):
+        return "EdDSA", key
+    raise KeyConfigurationError(f"Unsupported key type {type(key).__name__}; use an RSA or Ed25519 key.")
+
+
+def _load_key(material: str, private: bool) -> tuple[str, Any]:
+    if material.lstrip().startswith("-----BEGIN"):
+        return _load_pem(material, private)
+    if len(material) < MIN_SECRET_LENGTH:
+        raise KeyConfigurationError(f"HS256 secrets must be at least {MIN_SECRET_LENGTH} characters long.")
+    return "HS256", material
+
+
+def _same_key(first: VerificationKey, second: VerificationKey) -> bool:
+    if first.algorithm != second.algorithm:
+        return False
+    if first.algorithm == "HS256":
+        return hmac.compare_digest(first.key.encode(), second.key.encode())
+    from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
+
+    def public_bytes(key: Any) -> bytes:
+        return key.public_bytes(Encoding.DER, PublicFormat.SubjectPublicKeyInfo)
+
+    return public_bytes(first.key) == public_bytes(second.key)
+
+
+class KeyRing:
+    """
+    The keys used to sign and verify access tokens.
+
+    Every token carries the `kid` of the key that signed it, and is verified with the key of that id only,
+    using that key's algorithm. The algorithm follows from the key material: a plain secret is HS256, a PEM
+    RSA key RS256 and a PEM Ed25519 key EdDSA. Rotating keys means signing with a new key while the previous
+    ones stay in `verification_keys` until the tokens they signed have expired. Nodes that only verify tokens
+    can be given public keys alone and no signing key.
+    """
+
+    def __init__(
+        self,
+        signing_key: Optional[str] = None,
+        signing_kid: str = "default",
+        verification_keys: Optional[dict[str, str]] = None,
+    ) -> None:
+        self._verification: dict[str, VerificationKey] = {}
+        for kid, material in (verification_keys or {}).items():
+            algorithm, key = _load_key(material, private=False)
+            self._verification[kid] = VerificationKey(kid, algorithm, key)
+
+        self.signing_kid: Optional[str] = None
+        self._signing_key: Any = None
+        self.signing_algorithm: Optional[str] = None
+        if signing_key is not None:
+            self.signing_algorithm, self._signing_key = _load_key(signing_key, private=True)
+            self.signing_kid = signing_kid
+            public_key = self._signing_key if self.signing_algorithm == "HS256" else self._signing_key.public_key()
+            signing = VerificationKey(signing_kid, self.signing_algorithm, public_key)
+            configured = self._verification.get(signing_kid)
+            if configured is not None and not _same_key(configured, signing):
+                raise KeyConfigurationError(f"Key id '{signing_kid}' is configured with two different keys.")
+            self._verification[signing_kid] = signing
+
+    @property
+    def kids(self) -> list[str]:
+        return list(self._verification)
+
+    def sign(self, claims: dict[str, Any]) -> str:
+        if self._signing_key is None:
+            raise KeyConfigurationError("No JWT signing key is configured on this node.")
+        return jwt.encode(
+            claims, self._signing_key, algorithm=self.signing_algorithm, headers={"kid": self.signing_kid}
+        )
+
+    def verify(self, token: str) -> dict[str, Any]:
+        """
+        Return the claims of a valid token. Raises jwt.InvalidTokenError (or one of its subclasses,
+        such as jwt.ExpiredSignatureError) otherwise.
+        """
+        kid = jwt.get_unverified_header(token).get("kid")
+        key = self._verification.get(kid) if isinstance(kid, str) else None
+        if key is None:
+            raise jwt.InvalidTokenError("Unknown signing key.")
+        return jwt.decode(token, key.key, algorithms=[key.algorithm])
+
+
+def load_key_ring(
+    signing_key: Optional[str],
+    signing_key_file: Optional[str],
+    signing_kid: str,
+    verification_keys: dict[str, str],
+) -> KeyRing:
+    if signing_key_file is not None:
+        with open(signing_key_file, encoding="utf-8") as file:
+            signing_key = file.read()
+    if signing_key is None and not verification_keys:
+        # Development only: tokens signed with a random key do not validate in any other process.
+        logger.warning("No JWT keys are configured (JWT_SIGNING_KEY); using a random key for this process only.")
+        signing_key = secrets.token_hex(32)
+    return KeyRing(signing_key, signing_kid, verification_keys)
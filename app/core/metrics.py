@@ -0,0 +1,202 @@
+import os
+import re
+import time
+from functools import lru_cache
+from typing import Any, Callable, Iterator
+
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Labels are limited to route templates, methods, status codes and stored-function names,
+# so the number of time series does not grow with the number of distinct URLs or arguments.
+UNMATCHED_ROUTE = "<unmatched>"
+
+# Set by app.serve for several worker processes: every process then writes its counters, histograms and gauges
+# to files in this directory and /metrics merges those of all workers.
+MULTIPROC_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests handled.", ["method", "route", "status"])
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time to handle an HTTP request, including streaming the response body.",
+    ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+RESPONSE_COMPRESSION_BYTES = Counter(
+    "http_response_compression_bytes_total",
+    "Response body bytes before (stage=in) and after (stage=out) compression.",
+    ["encoding", "stage"],
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "HTTP requests being handled.", ["method"], multiprocess_mode="livesum"
+)
+
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Time to run a stored-function query and fetch its rows.",
+    ["function"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+DB_QUERY_ROWS = Histogram(
+    "db_query_rows",
+    "Rows returned per stored-function query.",
+    ["function"],
+    buckets=(0, 1, 10, 20, 50, 100, 1000, 10000),
+)
+DB_QUERY_ERRORS = Counter("db_query_errors_total", "Stored-function queries that raised.", ["function"])
+DB_POOL_ACQUIRE_DURATION = Histogram(
+    "db_pool_acquire_duration_seconds",
+    "Time spent waiting for a pooled connection.",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0),
+)
+DB_REPLICA_READS = Counter(
+    "db_replica_reads_total",
+    "Reads routed while a replica is configured: served by the replica, or by the primary because it was "
+    "lagging or unavailable.",
+    ["result"],
+)
+
+ADMISSION_WAIT = Histogram(
+    "admission_wait_seconds",
+    "Time an admitted request waited in its lane's queue.",
+    ["lane"],
+    buckets=(0.0, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+ADMISSION_SHED = Counter(
+    "admission_shed_total",
+    "Requests rejected with 503 because their lane's queue was full or the wait timed out.",
+    ["lane", "reason"],
+)
+
+JOBS_FINISHED = Counter("jobs_finished_total", "Background jobs that finished, by outcome.", ["kind", "status"])
+JOB_DURATION = Histogram(
+    "job_duration_seconds",
+    "Time a background job ran in a worker.",
+    ["kind"],
+    buckets=(0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0),
+)
+
+PASSWORD_HASH_DURATION = Histogram(
+    "password_hash_duration_seconds",
+    "Time an Argon2 hash or verification ran in the executor.",
+    ["operation"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+PASSWORD_HASH_WAIT = Histogram(
+    "password_hash_wait_seconds",
+    "Time an Argon2 operation waited for a free executor slot.",
+    ["operation"],
+    buckets=(0.0, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+_FUNCTION_NAME = re.compile(r"\bFROM\s+(\w+)\s*\(", re.IGNORECASE)
+
+
+@lru_cache(maxsize=256)
+def query_function_name(query: str) -> str:
+    """The stored function a `SELECT * FROM fn(...)` query calls, used as a metric label."""
+    match = _FUNCTION_NAME.search(query)
+    return match.group(1) if match else "other"
+
+
+def route_template(scope: Scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware counting requests and timing them per route template.
+    The router stores the matched route in the scope, so the label is known once the app returns.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            route = route_template(scope)
+            HTTP_REQUEST_DURATION.labels(method, route).observe(time.perf_counter() - started)
+            HTTP_REQUESTS.labels(method, route, str(status_code)).inc()
+
+
+def multiprocess_enabled() -> bool:
+    return bool(os.environ.get(MULTIPROC_DIR_ENV))
+
+
+class StatsCollector(Collector):
+    """
+    Exports the numeric values of a component's stats() dict as `<prefix>_<key>` gauges on every scrape.
+    The components live in each worker process, so with several workers the gauges describe the worker that
+    answered the scrape and carry its pid as a label.
+    """
+
+    def __init__(self, prefix: str, stats: Callable[[], dict[str, Any]], description: str) -> None:
+        self.prefix = prefix
+        self.stats = stats
+        self.description = description
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        labels = {"pid": str(os.getpid())} if multiprocess_enabled() else {}
+        for key, value in self.stats().items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                family = GaugeMetricFamily(f"{self.prefix}_{key}", f"{self.description}: {key}.", labels=list(labels))
+                family.add_metric(list(labels.values()), value)
+                yield family
+
+
+_stats_collectors: list[StatsCollector] = []
+
+
+def register_stats_collector(prefix: str, stats: Callable[[], dict[str, Any]], description: str) -> None:
+    collector = StatsCollector(prefix, stats, description)
+    _stats_collectors.append(collector)
+    REGISTRY.register(collector)
+
+
+@lru_cache(maxsize=1)
+def _multiprocess_registry() -> CollectorRegistry:
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    for collector in _stats_collectors:
+        registry.register(collector)
+    return registry
+
+
+def metrics_registry() -> CollectorRegistry:
+    """The registry /metrics exposes: this process's, or the merged one of all worker processes."""
+    return _multiprocess_registry() if multiprocess_enabled() else REGISTRY
+
+
+def mark_process_dead() -> None:
+    """Drop this worker's live gauges from the merged metrics when it shuts down."""
+    if multiprocess_enabled():
+        multiprocess.mark_process_dead(os.getpid())
@@ -0,0 +1,238 @@
+"""
+Migration runner with a `schema_migrations` ledger.
+
+Files in the migrations directory come in two kinds:
+
+* versioned files (`NNN_description.sql`) are applied once, in order; editing one after it was applied
+  is an error, because the change would never reach databases that already ran it;
+* repeatable files (`_description.sql`, the stored functions) are applied after the versioned ones and
+  re-applied whenever their checksum changes.
+
+Each file runs in its own transaction together with its ledger row. A file whose first lines contain
+`-- migrate: no-transaction` (e.g. for CREATE INDEX CONCURRENTLY) is instead split into statements that
+run one by one outside a transaction; such files must be idempotent, since they can fail halfway. A failed
+CREATE INDEX CONCURRENTLY leaves an invalid index behind, which IF NOT EXISTS would then accept; the runner
+drops such an index before the statement is retried.
+A session advisory lock makes concurrently starting instances apply migrations one at a time.
+
+This module only depends on asyncpg, so it can be used by the `run_migrations.py` script.
+"""
+
+import hashlib
+import logging
+import re
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import asyncpg
+
+logger = logging.getLogger("migrations")
+
+# Arbitrary application-wide key for pg_advisory_lock.
+MIGRATION_LOCK_KEY = 7_203_417_339_100_516
+NO_TRANSACTION_DIRECTIVE = re.compile(r"^\s*--\s*migrate:\s*no-transaction\s*$", re.MULTILINE)
+_VERSIONED_NAME = re.compile(r"^\d+_.+\.sql$")
+_IDENTIFIER = r'(?:"[^"]+"|[\w$]+)'
+_CONCURRENT_INDEX = re.compile(
+    rf"^\s*CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+IF\s+NOT\s+EXISTS\s+({_IDENTIFIER}(?:\.{_IDENTIFIER})?)",
+    re.IGNORECASE,
+)
+
+CREATE_LEDGER = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    filename TEXT PRIMARY KEY,
+    checksum TEXT NOT NULL,
+    repeatable BOOLEAN NOT NULL,
+    applied_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    execution_ms INT NOT NULL
+)
+"""
+RECORD_MIGRATION = """
+INSERT INTO schema_migrations (filename, checksum, repeatable, execution_ms)
+VALUES ($1, $2, $3, $4)
+ON CONFLICT (filename) DO UPDATE
+SET checksum = EXCLUDED.checksum, applied_at = CURRENT_TIMESTAMP, execution_ms = EXCLUDED.execution_ms
+"""
+
+
+class MigrationError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class Migration:
+    filename: str
+    sql: str
+
+    @property
+    def checksum(self) -> str:
+        return hashlib.sha256(self.sql.encode()).hexdigest()
+
+    @property
+    def repeatable(self) -> bool:
+        return self.filename.startswith("_")
+
+    @property
+    def transactional(self) -> bool:
+        header = "\n".join(self.sql.splitlines()[:5])
+        return NO_TRANSACTION_DIRECTIVE.search(header) is None
+
+
+@dataclass(frozen=True)
+class MigrationState:
+    migration: Migration
+    # "applied", "pending", "changed" (repeatable file edited since it was applied) or
+    # "modified" (versioned file edited after it was applied, which is an error).
+    status: str
+
+
+def load_migrations(directory: Path) -> list[Migration]:
+    """Versioned files in order, followed by the repeatable ones in name order."""
+    migrations = []
+    for path in sorted(directory.glob("*.sql")):
+        if not path.name.startswith("_") and not _VERSIONED_NAME.match(path.name):
+            raise MigrationError(f"{path.name}: expected NNN_name.sql (versioned) or _name.sql (repeatable)")
+        migrations.append(Migration(filename=path.name, sql=path.read_text()))
+    return sorted(migrations, key=lambda migration: (migration.repeatable, migration.filename))
+
+
+def plan(migrations: list[Migration], applied: dict[str, str]) -> list[MigrationState]:
+    """Compare the migration files with the ledger (filename -> checksum)."""
+    states = []
+    for migration in migrations:
+        checksum = applied.get(migration.filename)
+        if checksum is None:
+            status = "pending"
+        elif checksum == migration.checksum:
+            status = "applied"
+        else:
+            status = "changed" if migration.repeatable else "modified"
+        states.append(MigrationState(migration, status))
+    return states
+
+
+def split_statements(sql: str) -> list[str]:
+    """
+    Split SQL text on top-level semicolons, skipping those inside quotes, dollar-quoted bodies and comments.
+    Used for files that run outside a transaction, where each statement has to be sent on its own.
+    """
+    statements, start, position, length = [], 0, 0, len(sql)
+    while position < length:
+        char = sql[position]
+        if sql.startswith("--", position):
+            end = sql.find("\n", position)
+            position = length if end == -1 else end + 1
+        elif sql.startswith("/*", position):
+            end = sql.find("*/", position + 2)
+            position = length if end == -1 else end + 2
+        elif char in "'\"":
+            end = sql.find(char, position + 1)
+            position = length if end == -1 else end + 1
+        elif char == "$" and (match := re.match(r"\$[A-Za-z_]*\$", sql[position:])):
+            end = sql.find(match.group(), position + len(match.group()))
+            position = length if end == -1 else end + len(match.group())
+        elif char == ";":
+            statements.append(sql[start:position])
+            start = position = position + 1
+        else:
+            position += 1
+    statements.append(sql[start:])
+    return [statement.strip() for statement in statements if _has_code(statement)]
+
+
+def _strip_comments(statement: str) -> str:
+    return re.sub(r"--[^\n]*|/\*.*?\*/", "", statement, flags=re.DOTALL)
+
+
+def _has_code(statement: str) -> bool:
+    return bool(_strip_comments(statement).strip())
+
+
+def concurrent_index_name(statement: str) -> Optional[str]:
+    """The index a `CREATE INDEX CONCURRENTLY IF NOT EXISTS` statement creates, as written; None for others."""
+    match = _CONCURRENT_INDEX.match(_strip_comments(statement))
+    return match.group(1) if match else None
+
+
+async def drop_invalid_index(conn: asyncpg.Connection, name: str) -> bool:
+    """Drop index `name` if an interrupted CREATE INDEX CONCURRENTLY left it invalid. Returns whether it did."""
+    invalid = await conn.fetchval("SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass($1)", name)
+    if not invalid:
+        return False
+    logger.warning("Dropping invalid index %s left by an interrupted migration", name)
+    await conn.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+    return True
+
+
+async def read_ledger(conn: asyncpg.Connection) -> dict[str, str]:
+    exists = await conn.fetchval("SELECT to_regclass('schema_migrations') IS NOT NULL")
+    if not exists:
+        return {}
+    return {record["filename"]: record["checksum"] for record in await conn.fetch("SELECT * FROM schema_migrations")}
+
+
+async def apply_migration(conn: asyncpg.Connection, migration: Migration) -> None:
+    started = time.perf_counter()
+    if migration.transactional:
+        async with conn.transaction():
+            await conn.execute(migration.sql)
+            elapsed_ms = int((time.perf_counter() - started) * 1000)
+            await conn.execute(
+                RECORD_MIGRATION, migration.filename, migration.checksum, migration.repeatable, elapsed_ms
+            )
+        return
+
+    for statement in split_statements(migration.sql):
+        if index_name := concurrent_index_name(statement):
+            await drop_invalid_index(conn, index_name)
+        await conn.execute(statement)
+    elapsed_ms = int((time.perf_counter() - started) * 1000)
+    await conn.execute(RECORD_MIGRATION, migration.filename, migration.checksum, migration.repeatable, elapsed_ms)
+
+
+async def migration_status(dsn: str, directory: Path) -> list[MigrationState]:
+    conn = await asyncpg.connect(dsn)
+    try:
+        return plan(load_migrations(directory), await read_ledger(conn))
+    finally:
+        await conn.close()
+
+
+async def migrate(dsn: str, directory: Path, lock_timeout: Optional[float] = None) -> list[Migration]:
+    """
+    Apply every pending versioned file and every new or changed repeatable file, holding the advisory lock.
+    Returns the applied migrations; raises MigrationError (nothing further is applied) on the first failure.
+    """
+    migrations = load_migrations(directory)
+    conn = await asyncpg.connect(dsn)
+    try:
+        logger.info("Waiting for the migration lock")
+        await conn.execute("SELECT pg_advisory_lock($1)", MIGRATION_LOCK_KEY, timeout=lock_timeout)
+        try:
+            await conn.execute(CREATE_LEDGER)
+            # Read the ledger only once the lock is held: another instance may just have applied migrations.
+            states = plan(migrations, await read_ledger(conn))
+            modified = [state.migration.filename for state in states if state.status == "modified"]
+            if modified:
+                raise MigrationError(
+                    f"Applied versioned migrations were edited: {', '.join(modified)}. Add a new migration instead."
+                )
+
+            applied = []
+            for state in states:
+                if state.status == "applied":
+                    continue
+                logger.info("Applying %s (%s)", state.migration.filename, state.status)
+                try:
+                    await apply_migration(conn, state.migration)
+                except Exception as e:
+                    raise MigrationError(f"{state.migration.filename}: {e}") from e
+                applied.append(state.migration)
+            return applied
+        finally:
+            if not conn.is_closed():
+                await conn.execute("SELECT pg_advisory_unlock($1)", MIGRATION_LOCK_KEY)
+    finally:
+        await conn.close()
@@ -0,0 +1,114 @@
+"""
+Read-your-writes bookkeeping for routing reads to a streaming replica.
+
+After a request writes to the primary, the primary's current WAL position (LSN) is sent back to the client
+in the X-DB-LSN header and a cookie. Later requests carrying it only read from the replica once the replica
+has replayed up to that position. The process also remembers the newest LSN it wrote itself or saw through
+the change feed after another process wrote, so the reads that refill its response cache after an
+invalidation never see data older than the write that caused it.
+"""
+
+import re
+from contextvars import ContextVar
+from dataclasses import dataclass
+from http.cookies import CookieError, SimpleCookie
+from typing import Optional
+
+import asyncpg
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+LSN_HEADER = "x-db-lsn"
+LSN_COOKIE = "db_lsn"
+_LSN_FORMAT = re.compile(r"^[0-9A-Fa-f]{1,8}/[0-9A-Fa-f]{1,8}$")
+
+
+def parse_lsn(lsn: Optional[str]) -> Optional[int]:
+    """Turn a textual pg_lsn ("16/B374D848") into a comparable integer; None if it is not one."""
+    if not lsn or not _LSN_FORMAT.match(lsn):
+        return None
+    high, low = lsn.split("/")
+    return (int(high, 16) << 32) | int(low, 16)
+
+
+def format_lsn(lsn: int) -> str:
+    return f"{lsn >> 32:X}/{lsn & 0xFFFFFFFF:X}"
+
+
+@dataclass
+class LsnSession:
+    # Position the client has already seen written (from its header or cookie).
+    required: Optional[int] = None
+    # Position of the writes made while handling this request.
+    written: Optional[int] = None
+
+
+# Set per request by ReadYourWritesMiddleware. It holds a mutable object, so writes recorded in
+# nested contexts (dependencies, sub-tasks) are still visible to the middleware afterwards.
+_session: ContextVar[Optional[LsnSession]] = ContextVar("lsn_session", default=None)
+_last_written: Optional[int] = None
+
+
+def required_lsn() -> Optional[int]:
+    """The position a read has to see: the newer of the session's and this process's last write."""
+    session = _session.get()
+    candidates = [lsn for lsn in (_last_written, session and session.required, session and session.written) if lsn]
+    return max(candidates, default=None)
+
+
+async def record_write_lsn(conn: asyncpg.Connection) -> None:
+    """Remember the primary's WAL position after a write made on `conn`. A no-op without a replica."""
+    global _last_written
+    if not settings.database_replica_url:
+        return
+    lsn = parse_lsn(await conn.fetchval("SELECT pg_current_wal_lsn()::text"))
+    if lsn is None:
+        return
+    _last_written = max(_last_written or 0, lsn)
+    session = _session.get()
+    if session is not None:
+        session.written = max(session.written or 0, lsn)
+
+
+def _request_lsn(scope: Scope) -> Optional[int]:
+    headers = dict(scope["headers"])
+    if lsn := parse_lsn(headers.get(LSN_HEADER.encode(), b"").decode("latin-1")):
+        return lsn
+    try:
+        cookie = SimpleCookie(headers.get(b"cookie", b"").decode("latin-1"))
+    except CookieError:
+        return None
+    return parse_lsn(cookie[LSN_COOKIE].value) if LSN_COOKIE in cookie else None
+
+
+class ReadYourWritesMiddleware:
+    """Pure ASGI middleware carrying the client's last written LSN into the request and back out."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.database_replica_url:
+            await self.app(scope, receive, send)
+            return
+
+        session = LsnSession(required=_request_lsn(scope))
+
+        async def send_with_lsn(message: Message) -> None:
+            if message["type"] == "http.response.start" and session.written is not None:
+                lsn = format_lsn(session.written).encode()
+                cookie = b"%s=%s; Path=/; Max-Age=%d; HttpOnly; SameSite=Lax" % (
+                    LSN_COOKIE.encode(),
+                    lsn,
+                    settings.replica_lsn_cookie_max_age,
+                )
+                headers = [*message.get("headers", []), (LSN_HEADER.encode(), lsn), (b"set-cookie", cookie)]
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = _session.set(session)
+        try:
+            await self.app(scope, receive, send_with_lsn)
+        finally:
+            _session.reset(token)
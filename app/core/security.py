@@ -0,0 +1,131 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from argon2 import PasswordHasher
+
+from app.core.config import settings
+from app.core.metrics import PASSWORD_HASH_DURATION, PASSWORD_HASH_WAIT
+
+
+def _password_hasher(time_cost: int, memory_cost: int, parallelism: int) -> PasswordHasher:
+    return PasswordHasher(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+
+
+# Module-level so they can be sent to a process pool.
+def _hash_password(password: str, time_cost: int, memory_cost: int, parallelism: int) -> str:
+    return _password_hasher(time_cost, memory_cost, parallelism).hash(password)
+
+
+def _verify_password(hashed_password: str, password: str) -> bool:
+    # Verification reads the cost parameters from the hash itself.
+    return PasswordHasher().verify(hashed_password, password)
+
+
+class PasswordHashing:
+    """
+    Runs Argon2 hashing and verification in an executor so a login never blocks the event loop.
+    At most `max_concurrency` operations run at a time; further callers wait in line and are counted.
+    """
+
+    def __init__(
+        self,
+        time_cost: int,
+        memory_cost: int,
+        parallelism: int,
+        executor: str = "thread",
+        max_concurrency: int = 2,
+    ) -> None:
+        self.time_cost = time_cost
+        self.memory_cost = memory_cost
+        self.parallelism = parallelism
+        self.executor_kind = executor
+        self.max_concurrency = max_concurrency
+        self._hasher = _password_hasher(time_cost, memory_cost, parallelism)
+        self._executor: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.in_flight = 0
+        self.waiting = 0
+        self.max_waiting = 0
+        self.completed = 0
+        self.wait_seconds = 0.0
+        self.run_seconds = 0.0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_concurrency)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="argon2")
+        return self._executor
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def _run(self, operation: str, func: Callable[..., Any], *args: Any) -> Any:
+        queued_at = time.perf_counter()
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+        acquired = False
+        try:
+            async with self._get_semaphore():
+                acquired = True
+                self.waiting -= 1
+                started_at = time.perf_counter()
+                self.wait_seconds += started_at - queued_at
+                PASSWORD_HASH_WAIT.labels(operation).observe(started_at - queued_at)
+                self.in_flight += 1
+                try:
+                    return await asyncio.get_running_loop().run_in_executor(self._get_executor(), func, *args)
+                finally:
+                    self.in_flight -= 1
+                    self.completed += 1
+                    run_seconds = time.perf_counter() - started_at
+                    self.run_seconds += run_seconds
+                    PASSWORD_HASH_DURATION.labels(operation).observe(run_seconds)
+        finally:
+            if not acquired:
+                self.waiting -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", _hash_password, password, self.time_cost, self.memory_cost, self.parallelism)
+
+    async def verify(self, hashed_password: str, password: str) -> bool:
+        """Raises argon2.exceptions.VerifyMismatchError if the password does not match."""
+        return await self._run("verify", _verify_password, hashed_password, password)
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """Whether the hash was made with other Argon2 parameters than the configured ones."""
+        return self._hasher.check_needs_rehash(hashed_password)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "executor": self.executor_kind,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "max_waiting": self.max_waiting,
+            "completed": self.completed,
+            "wait_seconds": round(self.wait_seconds, 3),
+            "run_seconds": round(self.run_seconds, 3),
+        }
+
+
+password_hashing = PasswordHashing(
+    time_cost=settings.argon2_time_cost,
+    memory_cost=settings.argon2_memory_cost,
+    parallelism=settings.argon2_parallelism,
+    executor=settings.password_hash_executor,
+    max_concurrency=settings.password_hash_max_concurrency,
+)
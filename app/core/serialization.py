@@ -0,0 +1,27 @@
+from typing import Any
+
+import asyncpg
+import orjson
+
+
+def _encode_default(value: Any) -> Any:
+    if isinstance(value, asyncpg.Record):
+        return dict(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Encode JSON-compatible content straight to bytes with orjson. asyncpg Records (alone or in lists)
+    are encoded as objects without first building the intermediate dicts in Python code.
+    """
+    return orjson.dumps(content, default=_encode_default)
+
+
+def to_builtins(content: Any) -> Any:
+    """Convert asyncpg Records (alone or in a list) to dicts, for code that needs plain mappings."""
+    if isinstance(content, asyncpg.Record):
+        return dict(content)
+    if isinstance(content, list):
+        return [dict(item) if isinstance(item, asyncpg.Record) else item for item in content]
+    return content
@@ -0,0 +1,85 @@
+import time
+import weakref
+from typing import Any
+
+import asyncpg
+from asyncpg.prepared_stmt import PreparedStatement
+
+from app.core.metrics import (
+    DB_QUERY_DURATION,
+    DB_QUERY_ERRORS,
+    DB_QUERY_ROWS,
+    query_function_name,
+)
+
+
+class StatementRegistry:
+    """
+    Prepares each stored-function call once per pooled connection and reuses it afterwards,
+    so repeated calls skip the server-side parse/plan round trip.
+
+    Statements are tracked per physical connection in a weak mapping: when the pool closes or
+    recycles a connection, its prepared statements go away with it.
+    """
+
+    def __init__(self) -> None:
+        self._statements: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _raw_connection(conn: asyncpg.Connection) -> asyncpg.Connection:
+        # Pool.acquire() hands out a fresh proxy each time; key on the connection behind it.
+        return getattr(conn, "_con", None) or conn
+
+    async def prepare(self, conn: asyncpg.Connection, query: str) -> PreparedStatement:
+        statements = self._statements.setdefault(self._raw_connection(conn), {})
+        statement = statements.get(query)
+        if statement is not None:
+            self.hits += 1
+            return statement
+
+        self.misses += 1
+        statement = await conn.prepare(query)
+        statements[query] = statement
+        return statement
+
+    def discard(self, conn: asyncpg.Connection, query: str) -> None:
+        self._statements.get(self._raw_connection(conn), {}).pop(query, None)
+
+    async def fetch(self, conn: asyncpg.Connection, query: str, *args: Any) -> list[asyncpg.Record]:
+        """Run `query` as a prepared statement, recording its latency and row count per stored function."""
+        function = query_function_name(query)
+        started = time.perf_counter()
+        try:
+            rows = await self._fetch(conn, query, *args)
+        except Exception:
+            DB_QUERY_ERRORS.labels(function).inc()
+            raise
+        finally:
+            DB_QUERY_DURATION.labels(function).observe(time.perf_counter() - started)
+        DB_QUERY_ROWS.labels(function).observe(len(rows))
+        return rows
+
+    async def _fetch(self, conn: asyncpg.Connection, query: str, *args: Any) -> list[asyncpg.Record]:
+        statement = await self.prepare(conn, query)
+        try:
+            return await statement.fetch(*args)
+        except asyncpg.exceptions.InvalidCachedStatementError:
+            # The function was replaced (e.g. by a migration) since we prepared it.
+            self.discard(conn, query)
+            if conn.is_in_transaction():
+                raise
+            statement = await self.prepare(conn, query)
+            return await statement.fetch(*args)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "connections": len(self._statements),
+            "prepared": sum(len(statements) for statements in self._statements.values()),
+        }
+
+
+statements = StatementRegistry()
@@ -0,0 +1,34 @@
+import logging
+from typing import Optional
+
+import asyncpg
+
+from app.core.http_cache import response_cache
+from app.core.replication import record_write_lsn
+
+logger = logging.getLogger(__name__)
+
+
+async def catalog_written(conn: asyncpg.Connection) -> None:
+    """
+    Bookkeeping after a committed write to books or authors, made on `conn`: remember its WAL position for
+    read-your-writes and make the cached responses stale. The write itself has succeeded at this point, so
+    a failure here is logged instead of being reported to the client as a failed write.
+    """
+    try:
+        await record_write_lsn(conn)
+    except Exception:
+        logger.exception("Could not record the WAL position of a catalog write")
+    try:
+        await response_cache.bump_version()
+    except Exception:
+        logger.exception("Could not invalidate the response cache after a catalog write")
+
+
+async def catalog_changed(conn: asyncpg.Connection, payloads: Optional[set[str]]) -> None:
+    """
+    Change feed invalidation for the 'change_events' channel: some process committed catalog writes, or some
+    may have been missed while the listener reconnected. The bookkeeping runs on the listener's connection
+    to the primary, so the responses this process caches afterwards are read at least as new as those writes.
+    """
+    await catalog_written(conn)
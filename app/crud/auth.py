@@ -4,22 +4,32 @@ import jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 
-from app.constants import ACCESS_TOKEN_EXPIRE_MINUTES, ENCRYPTION_ALGORITHM, SECRET_KEY
+from app.constants import ACCESS_TOKEN_EXPIRE_MINUTES
+from app.core.config import settings
+from app.core.jwt_keys import load_key_ring
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/token")
 
+# Loaded from the settings, so every worker process signs and verifies with the same keys.
+key_ring = load_key_ring(
+    settings.jwt_signing_key,
+    settings.jwt_signing_key_file,
+    settings.jwt_signing_kid,
+    settings.jwt_verification_keys,
+)
+
 
 def create_jwt_token(user_email: str) -> str:
     expire = datetime.now(UTC) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     user_data = {"sub": user_email, "exp": expire}
-    return jwt.encode(user_data, SECRET_KEY, algorithm=ENCRYPTION_ALGORITHM)
+    return key_ring.sign(user_data)
 
 
 def decrypt_jwt(token: str = Depends(oauth2_scheme)) -> str:
     try:
-        decoded_data = jwt.decode(token, SECRET_KEY, algorithms=[ENCRYPTION_ALGORITHM])
+        decoded_data = key_ring.verify(token)
         return decoded_data["sub"]
-    except jwt.exceptions.DecodeError:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token expired")
+    except (jwt.InvalidTokenError, KeyError):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
@@ -1,57 +1,65 @@
 from typing import Any
 
+import asyncpg
 from fastapi import HTTPException
 
+from app.core.database import get_connection, get_read_connection
+from app.core.statements import statements
+from app.core.writes import catalog_written
 from app.schemas.author import AuthorCreate
-from app.utils import get_connection
 
 
-async def get_authors_crud(author_id: int = None, author_name: str = None) -> [dict[str, Any]]:
-    conn = await get_connection()
-    try:
+async def get_authors_crud(author_id: int = None, author_name: str = None) -> list[asyncpg.Record]:
+    async with get_read_connection() as conn:
         query = "SELECT * FROM get_authors_function($1, $2)"
-        result = await conn.fetch(query, author_id, author_name)
-        return [dict(record) for record in result]
-    finally:
-        await conn.close()
+        return await statements.fetch(conn, query, author_id, author_name)
+
+
+async def get_authors_by_names_crud(names: list[str]) -> list[dict[str, Any]]:
+    """
+    Resolve many author names (case-insensitive) with one query using the stored procedure
+    'get_authors_by_names_function'. Authors come back in the order of `names`; unknown names are skipped.
+    """
+    unique_names = list({name.lower(): name for name in names}.values())
+    async with get_read_connection() as conn:
+        try:
+            result = await statements.fetch(conn, "SELECT * FROM get_authors_by_names_function($1)", unique_names)
+            return [dict(record) for record in result]
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
 
 async def create_author_crud(author: AuthorCreate) -> dict[str, Any]:
-    conn = await get_connection()
-    try:
-        query = "SELECT * FROM create_author_function($1)"
-        result = await conn.fetch(query, author.name)
-        if result:
-            return dict(result[0])
-        else:
-            raise Exception("Author creation failed: no record returned.")
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Error creating author: {e}")
-    finally:
-        await conn.close()
+    async with get_connection() as conn:
+        try:
+            query = "SELECT * FROM create_author_function($1)"
+            result = await statements.fetch(conn, query, author.name)
+            if not result:
+                raise Exception("Author creation failed: no record returned.")
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Error creating author: {e}")
+        await catalog_written(conn)
+    return dict(result[0])
 
 
 async def update_author_crud(author_id: int, author: AuthorCreate) -> dict[str, Any]:
-    conn = await get_connection()
-    try:
-        query = "SELECT * FROM update_author_function($1, $2)"
-        result = await conn.fetch(query, author_id, author.name)
-        if result:
-            return dict(result[0])
-        else:
-            raise Exception("Author update failed: no record returned.")
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Error updating author: {e}")
-    finally:
-        await conn.close()
+    async with get_connection() as conn:
+        try:
+            query = "SELECT * FROM update_author_function($1, $2)"
+            result = await statements.fetch(conn, query, author_id, author.name)
+            if not result:
+                raise Exception("Author update failed: no record returned.")
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Error updating author: {e}")
+        await catalog_written(conn)
+    return dict(result[0])
 
 
 async def delete_author_crud(author_id: int) -> None:
-    conn = await get_connection()
-    try:
-        query = "SELECT * FROM delete_author_function($1)"
-        await conn.fetch(query, author_id)
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Error deleting author: {e}")
-    finally:
-        await conn.close()
+    async with get_connection() as conn:
+        try:
+            query = "SELECT * FROM delete_author_function($1)"
+            await statements.fetch(conn, query, author_id)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Error deleting author: {e}")
+        await catalog_written(conn)
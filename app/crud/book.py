@@ -1,9 +1,13 @@
-from typing import Any, Optional
+from typing import Any, AsyncIterator, Optional
 
+import asyncpg
 from fastapi import HTTPException
 
+from app.core.cursor import decode_cursor
+from app.core.database import get_connection, get_read_connection
+from app.core.statements import statements
+from app.core.writes import catalog_written
 from app.schemas.book import BookCreate, BookUpdate
-from app.utils import get_connection
 
 
 async def get_books_crud(
@@ -17,7 +21,7 @@ async def get_books_crud(
     sort_order: str = "asc",
     limit: int = 10,
     offset: int = 0,
-) -> list[dict[str, Any]]:
+) -> list[asyncpg.Record]:
     """
     Retrieve books using the stored procedure 'get_books' with support for filtering,
     sorting, and pagination.
@@ -35,29 +39,189 @@ async def get_books_crud(
         offset (int): Number of records to skip (for pagination).
 
     Returns:
-        List[Dict[str, Any]]: A list of dictionaries, each representing a book record.
+        List[asyncpg.Record]: The book records, passed on as-is so they can be encoded without copying.
+    """
+    async with get_read_connection() as conn:
+        try:
+            query = "SELECT * FROM get_books_function($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12)"
+            result = await statements.fetch(
+                conn,
+                query,
+                book_id,
+                title,
+                author,
+                genre,
+                year_from,
+                year_to,
+                sort_by,
+                sort_order,
+                limit,
+                offset,
+                None,
+                None,
+            )
+            return result
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+
+async def get_books_keyset_crud(
+    cursor: str,
+    title: Optional[str] = None,
+    author: Optional[str] = None,
+    genre: Optional[str] = None,
+    year_from: Optional[int] = None,
+    year_to: Optional[int] = None,
+    sort_by: str = "created_at",
+    sort_order: str = "asc",
+    limit: int = 10,
+) -> list[asyncpg.Record]:
+    """
+    Retrieve the page of books following `cursor` using the stored procedure 'get_books_function'.
+    Filtering and sorting work as in get_books_crud, but instead of skipping rows with OFFSET
+    the query seeks directly past the last (sort value, id) pair encoded in the cursor.
     """
-    conn = await get_connection()
     try:
-        query = "SELECT * FROM get_books_function($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)"
-        result = await conn.fetch(
-            query,
-            book_id,
-            title,
-            author,
-            genre,
-            year_from,
-            year_to,
-            sort_by,
-            sort_order,
-            limit,
-            offset,
-        )
-        return [dict(record) for record in result]
-    except Exception as e:
+        after_value, after_id = decode_cursor(cursor, sort_by, sort_order)
+    except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
-    finally:
-        await conn.close()
+
+    async with get_read_connection() as conn:
+        try:
+            query = "SELECT * FROM get_books_function($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12)"
+            result = await statements.fetch(
+                conn,
+                query,
+                None,
+                title,
+                author,
+                genre,
+                year_from,
+                year_to,
+                sort_by,
+                sort_order,
+                limit,
+                0,
+                str(after_value),
+                after_id,
+            )
+            return result
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+
+async def get_books_by_ids_crud(book_ids: list[int]) -> list[asyncpg.Record]:
+    """
+    Retrieve many books with one query using the stored procedure 'get_books_by_ids_function'.
+    Books come back in the order of `book_ids`; duplicate ids are returned once and unknown ids are skipped.
+    """
+    async with get_read_connection() as conn:
+        try:
+            query = "SELECT * FROM get_books_by_ids_function($1)"
+            result = await statements.fetch(conn, query, list(dict.fromkeys(book_ids)))
+            return result
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+
+async def get_author_books_crud(author_id: int, limit: int = 20, offset: int = 0) -> list[asyncpg.Record]:
+    """
+    Retrieve one page of an author's books, ordered by title, using the stored procedure
+    'get_author_books_function'.
+    """
+    async with get_read_connection() as conn:
+        try:
+            query = "SELECT * FROM get_author_books_function($1, $2, $3)"
+            result = await statements.fetch(conn, query, author_id, limit, offset)
+            return result
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+
+async def search_books_crud(
+    query: str, prefix: bool = False, limit: int = 10, offset: int = 0
+) -> list[dict[str, Any]]:
+    """
+    Full-text search over book titles and author names using the stored procedure 'search_books_function'.
+    Results are ordered by relevance; with `prefix` every word is matched as a prefix (typeahead).
+    """
+    async with get_read_connection() as conn:
+        try:
+            result = await statements.fetch(
+                conn,
+                "SELECT * FROM search_books_function($1, $2, $3, $4)",
+                query,
+                prefix,
+                limit,
+                offset,
+            )
+            return [dict(record) for record in result]
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+
+async def get_book_facets_crud(
+    title: Optional[str] = None,
+    author: Optional[str] = None,
+    genre: Optional[str] = None,
+    year_from: Optional[int] = None,
+    year_to: Optional[int] = None,
+    top_authors: int = 10,
+    estimate: bool = False,
+) -> dict[str, Any]:
+    """
+    Count the books matching the listing filters, per genre, per published year and for the top authors,
+    using the stored procedure 'get_book_facets_function'.
+    Without filters the counts come from counter tables maintained by triggers, so no books are scanned.
+    """
+    async with get_read_connection() as conn:
+        try:
+            result = await statements.fetch(
+                conn,
+                "SELECT * FROM get_book_facets_function($1, $2, $3, $4, $5, $6, $7)",
+                title,
+                author,
+                genre,
+                year_from,
+                year_to,
+                top_authors,
+                estimate,
+            )
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    facets: dict[str, Any] = {"total": 0, "total_is_estimate": False, "genres": [], "years": [], "authors": []}
+    for record in result:
+        if record["facet"] == "total":
+            facets["total"] = record["book_count"]
+            facets["total_is_estimate"] = record["label"] == "estimate"
+        elif record["facet"] == "genre":
+            facets["genres"].append({"genre": record["value"], "count": record["book_count"]})
+        elif record["facet"] == "year":
+            facets["years"].append({"year": int(record["value"]), "count": record["book_count"]})
+        elif record["facet"] == "author":
+            facets["authors"].append(
+                {"author_id": int(record["value"]), "author_name": record["label"], "count": record["book_count"]}
+            )
+    facets["genres"].sort(key=lambda item: (-item["count"], item["genre"]))
+    facets["years"].sort(key=lambda item: item["year"])
+    facets["authors"].sort(key=lambda item: (-item["count"], item["author_id"]))
+    return facets
+
+
+async def iter_books_crud(batch_size: int = 1000) -> AsyncIterator[list[dict[str, Any]]]:
+    """
+    Stream every book using the stored procedure 'export_books_function'.
+
+    The rows are read through a server-side cursor inside a read-only repeatable-read transaction,
+    so the export is a consistent snapshot and at most `batch_size` rows are held in memory at a time.
+    """
+    async with get_read_connection() as conn:
+        async with conn.transaction(isolation="repeatable_read", readonly=True):
+            statement = await statements.prepare(conn, "SELECT * FROM export_books_function()")
+            cursor = await statement.cursor()
+            while rows := await cursor.fetch(batch_size):
+                yield [dict(record) for record in rows]
 
 
 async def create_book_crud(book: BookCreate) -> [dict[str, Any]]:
@@ -65,54 +229,100 @@ async def create_book_crud(book: BookCreate) -> [dict[str, Any]]:
     Create a book using the stored procedure 'create_book_function'.
     Expects that the provided author already exists; otherwise, an exception is raised.
     """
-    conn = await get_connection()
-    try:
-        query = "SELECT * FROM create_book_function($1, $2, $3, $4, $5)"
-        result = await conn.fetch(
-            query,
-            book.title,
-            book.isbn,
-            book.published_year,
-            book.genre,
-            book.author_name,
-        )
+    async with get_connection() as conn:
+        try:
+            query = "SELECT * FROM create_book_function($1, $2, $3, $4, $5)"
+            result = await statements.fetch(
+                conn,
+                query,
+                book.title,
+                book.isbn,
+                book.published_year,
+                book.genre,
+                book.author_name,
+            )
+            if not result:
+                raise HTTPException(status_code=404, detail="Book creation failed: no record returned.")
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        await catalog_written(conn)
+    return dict(result[0])
+
+
+async def create_books_batch_crud(
+    books: list[BookCreate], upsert: bool = False
+) -> tuple[list[dict[str, Any]], set[str]]:
+    """
+    Create a batch of books in one transaction using the stored procedures 'get_authors_by_names_function'
+    and 'create_books_batch_function'.
+    Author names are resolved once for the whole batch (case-insensitive). Books whose author does not exist
+    are not inserted; books whose ISBN already exists are skipped by the database.
+
+    With `upsert`, 'upsert_books_batch_function' is used instead: books whose ISBN already exists are
+    updated when any of their columns differ. Only inserted and changed books are returned, each with
+    an `inserted` flag; unchanged books are neither written nor returned.
+
+    Returns:
+        The written books and the set of author names that could not be resolved.
+    """
+    names = list({book.author_name.lower(): book.author_name for book in books}.values())
+    async with get_connection() as conn:
+        try:
+            async with conn.transaction():
+                authors = await statements.fetch(conn, "SELECT * FROM get_authors_by_names_function($1)", names)
+                author_ids: dict[str, int] = {}
+                for author in authors:
+                    author_ids.setdefault(author["name"].lower(), author["id"])
+
+                resolved = [book for book in books if book.author_name.lower() in author_ids]
+                missing_authors = {book.author_name for book in books if book.author_name.lower() not in author_ids}
+                if not resolved:
+                    return [], missing_authors
+
+                function = "upsert_books_batch_function" if upsert else "create_books_batch_function"
+                result = await statements.fetch(
+                    conn,
+                    f"SELECT * FROM {function}($1, $2, $3, $4, $5)",
+                    [book.title for book in resolved],
+                    [book.isbn for book in resolved],
+                    [book.published_year for book in resolved],
+                    [book.genre for book in resolved],
+                    [author_ids[book.author_name.lower()] for book in resolved],
+                )
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=str(e))
         if result:
-            return dict(result[0])
-        else:
-            raise HTTPException(status_code=404, detail="Book creation failed: no record returned.")
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    finally:
-        await conn.close()
+            await catalog_written(conn)
+    return [dict(record) for record in result], missing_authors
 
 
 async def update_book_crud(book_id: int, book: BookUpdate) -> [dict[str, Any]]:
-    conn = await get_connection()
-    try:
-        query = "SELECT * FROM update_book_function($1, $2, $3, $4, $5, $6)"
-        result = await conn.fetch(
-            query,
-            book_id,
-            book.title,
-            book.isbn,
-            book.published_year,
-            book.genre,
-            book.author_name,
-        )
-        return dict(result[0])
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    finally:
-        await conn.close()
+    async with get_connection() as conn:
+        try:
+            query = "SELECT * FROM update_book_function($1, $2, $3, $4, $5, $6)"
+            result = await statements.fetch(
+                conn,
+                query,
+                book_id,
+                book.title,
+                book.isbn,
+                book.published_year,
+                book.genre,
+                book.author_name,
+            )
+            updated = dict(result[0])
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        await catalog_written(conn)
+    return updated
 
 
 async def delete_book_crud(book_id: int) -> None:
-    conn = await get_connection()
-    try:
-        query = "SELECT * FROM delete_book_function($1)"
-        result = await conn.fetch(query, book_id)
-        return result
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    finally:
-        await conn.close()
+    async with get_connection() as conn:
+        try:
+            query = "SELECT * FROM delete_book_function($1)"
+            result = await statements.fetch(conn, query, book_id)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        await catalog_written(conn)
+    return result
@@ -0,0 +1,217 @@
+from typing import Any, Awaitable, Callable, Optional
+
+import asyncpg
+from fastapi import HTTPException
+
+from app.core.database import get_connection
+from app.core.statements import statements
+from app.core.writes import catalog_written
+from app.schemas.book import BookBulkUpdateItem, BookCreate
+
+UPDATABLE_FIELDS = ("title", "isbn", "published_year", "genre", "author_name")
+
+
+class _BulkResults:
+    """Per-item outcomes of a bulk request, in request order."""
+
+    def __init__(self, size: int) -> None:
+        self.items: list[Optional[dict[str, Any]]] = [None] * size
+
+    def fail(self, index: int, error: str, item_id: Optional[int] = None) -> None:
+        self.items[index] = {"index": index, "id": item_id, "status": "failed", "error": error}
+
+    def succeed(self, index: int, status: str, item_id: int, book: Optional[asyncpg.Record] = None) -> None:
+        self.items[index] = {"index": index, "id": item_id, "status": status, "book": book and dict(book)}
+
+    def pending(self) -> list[int]:
+        return [index for index, item in enumerate(self.items) if item is None]
+
+    @property
+    def has_failures(self) -> bool:
+        return any(item is not None and item["status"] == "failed" for item in self.items)
+
+    @property
+    def has_successes(self) -> bool:
+        return any(item is not None and item["status"] != "failed" for item in self.items)
+
+    def finish(self, committed: bool) -> list[dict[str, Any]]:
+        """Items that were not committed (or never attempted) are reported as skipped."""
+        results = []
+        for index, item in enumerate(self.items):
+            if item is None or (not committed and item["status"] != "failed"):
+                item = {"index": index, "id": item and item["id"], "status": "skipped"}
+            results.append(item)
+        return results
+
+
+async def _run_bulk(
+    results: _BulkResults, atomic: bool, apply: Callable[[asyncpg.Connection], Awaitable[None]]
+) -> tuple[list[dict[str, Any]], bool]:
+    """
+    Run `apply` in one transaction. In atomic mode any failed item rolls the whole transaction back;
+    in best-effort mode the successful items are committed and the failed ones are only reported.
+    """
+    if atomic and results.has_failures:
+        return results.finish(committed=False), False
+
+    async with get_connection() as conn:
+        try:
+            transaction = conn.transaction()
+            await transaction.start()
+            try:
+                await apply(conn)
+            except BaseException:
+                await transaction.rollback()
+                raise
+            committed = not (atomic and results.has_failures) and results.has_successes
+            if committed:
+                await transaction.commit()
+            else:
+                await transaction.rollback()
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if committed:
+            await catalog_written(conn)
+    return results.finish(committed), committed
+
+
+async def _resolve_authors(conn: asyncpg.Connection, names: list[str]) -> dict[str, int]:
+    """Case-insensitive author name -> id for the given names, with one query."""
+    unique_names = list({name.lower(): name for name in names}.values())
+    authors = await statements.fetch(conn, "SELECT * FROM get_authors_by_names_function($1)", unique_names)
+    author_ids: dict[str, int] = {}
+    for author in authors:
+        author_ids.setdefault(author["name"].lower(), author["id"])
+    return author_ids
+
+
+def _fail_duplicates(results: _BulkResults, keys: list[Any], message: str) -> None:
+    seen = set()
+    for index, key in enumerate(keys):
+        if key is None:
+            continue
+        if key in seen:
+            results.fail(index, message)
+        seen.add(key)
+
+
+async def bulk_create_books_crud(books: list[BookCreate], atomic: bool = True) -> tuple[list[dict[str, Any]], bool]:
+    """
+    Create many books in one transaction using the stored procedures 'get_authors_by_names_function'
+    and 'create_books_batch_function'.
+
+    Returns:
+        The per-item results and whether the transaction was committed.
+    """
+    results = _BulkResults(len(books))
+    _fail_duplicates(results, [book.isbn for book in books], "Duplicate ISBN in the request.")
+
+    async def apply(conn: asyncpg.Connection) -> None:
+        author_ids = await _resolve_authors(conn, [books[index].author_name for index in results.pending()])
+        for index in results.pending():
+            if books[index].author_name.lower() not in author_ids:
+                results.fail(index, f'Author "{books[index].author_name}" does not exist.')
+        pending = results.pending()
+        if not pending or (atomic and results.has_failures):
+            return
+
+        created = await statements.fetch(
+            conn,
+            "SELECT * FROM create_books_batch_function($1, $2, $3, $4, $5)",
+            [books[index].title for index in pending],
+            [books[index].isbn for index in pending],
+            [books[index].published_year for index in pending],
+            [books[index].genre for index in pending],
+            [author_ids[books[index].author_name.lower()] for index in pending],
+        )
+        created_by_isbn = {book["isbn"]: book for book in created}
+        for index in pending:
+            book = created_by_isbn.get(books[index].isbn)
+            if book is None:
+                results.fail(index, "Book with this ISBN already exists.")
+            else:
+                results.succeed(index, "created", book["id"], book)
+
+    return await _run_bulk(results, atomic, apply)
+
+
+async def bulk_update_books_crud(
+    items: list[BookBulkUpdateItem], atomic: bool = True
+) -> tuple[list[dict[str, Any]], bool]:
+    """
+    Update many books in one transaction using the stored procedures 'get_authors_by_names_function',
+    'get_books_by_isbns_function' and 'update_books_batch_function'. Omitted fields are left unchanged.
+
+    Returns:
+        The per-item results and whether the transaction was committed.
+    """
+    results = _BulkResults(len(items))
+    for index, item in enumerate(items):
+        if all(getattr(item, field) is None for field in UPDATABLE_FIELDS):
+            results.fail(index, "No update parameters provided", item.id)
+    _fail_duplicates(results, [item.id for item in items], "Duplicate book ID in the request.")
+    _fail_duplicates(results, [item.isbn for item in items], "Duplicate ISBN in the request.")
+
+    async def apply(conn: asyncpg.Connection) -> None:
+        names = [items[index].author_name for index in results.pending() if items[index].author_name]
+        author_ids = await _resolve_authors(conn, names) if names else {}
+        isbns = [items[index].isbn for index in results.pending() if items[index].isbn]
+        isbn_owners = {}
+        if isbns:
+            owners = await statements.fetch(conn, "SELECT * FROM get_books_by_isbns_function($1)", isbns)
+            isbn_owners = {owner["isbn"]: owner["id"] for owner in owners}
+
+        for index in results.pending():
+            item = items[index]
+            if item.author_name and item.author_name.lower() not in author_ids:
+                results.fail(index, f'Author "{item.author_name}" does not exist.', item.id)
+            elif item.isbn and isbn_owners.get(item.isbn, item.id) != item.id:
+                results.fail(index, "Book with this ISBN already exists.", item.id)
+        pending = results.pending()
+        if not pending or (atomic and results.has_failures):
+            return
+
+        updated = await statements.fetch(
+            conn,
+            "SELECT * FROM update_books_batch_function($1, $2, $3, $4, $5, $6)",
+            [items[index].id for index in pending],
+            [items[index].title for index in pending],
+            [items[index].isbn for index in pending],
+            [items[index].published_year for index in pending],
+            [items[index].genre for index in pending],
+            [author_ids[items[index].author_name.lower()] if items[index].author_name else None for index in pending],
+        )
+        updated_by_id = {book["id"]: book for book in updated}
+        for index in pending:
+            book = updated_by_id.get(items[index].id)
+            if book is None:
+                results.fail(index, f"Book with ID {items[index].id} does not exist", items[index].id)
+            else:
+                results.succeed(index, "updated", book["id"], book)
+
+    return await _run_bulk(results, atomic, apply)
+
+
+async def bulk_delete_books_crud(book_ids: list[int], atomic: bool = True) -> tuple[list[dict[str, Any]], bool]:
+    """
+    Delete many books in one transaction using the stored procedure 'delete_books_batch_function'.
+
+    Returns:
+        The per-item results and whether the transaction was committed.
+    """
+    results = _BulkResults(len(book_ids))
+    _fail_duplicates(results, book_ids, "Duplicate book ID in the request.")
+
+    async def apply(conn: asyncpg.Connection) -> None:
+        pending = results.pending()
+        deleted = await statements.fetch(
+            conn, "SELECT * FROM delete_books_batch_function($1)", [book_ids[index] for index in pending]
+        )
+        deleted_ids = {record["id"] for record in deleted}
+        for index in pending:
+            if book_ids[index] in deleted_ids:
+                results.succeed(index, "deleted", book_ids[index])
+            else:
+                results.fail(index, f"Book with ID {book_ids[index]} does not exist", book_ids[index])
+
+    return await _run_bulk(results, atomic, apply)
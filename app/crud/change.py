@@ -0,0 +1,43 @@
+from typing import Any, Optional
+
+import asyncpg
+
+from app.core.database import get_connection
+from app.core.statements import statements
+
+# Change events are read from the primary: the feed follows notifications sent by the primary, which a
+# replica may not have replayed yet. Positions are (xid, seq) pairs, see 012_order_change_events_by_snapshot.sql.
+
+
+async def get_change_events_crud(
+    after: tuple[int, int],
+    until: Optional[tuple[int, int]] = None,
+    limit: int = 500,
+    entity: Optional[str] = None,
+    author_id: Optional[int] = None,
+) -> list[asyncpg.Record]:
+    until_xid, until_seq = until if until is not None else (None, None)
+    async with get_connection() as conn:
+        query = "SELECT * FROM get_change_events_function($1, $2, $3, $4, $5, $6, $7)"
+        return await statements.fetch(conn, query, *after, until_xid, until_seq, limit, entity, author_id)
+
+
+async def get_change_events_bounds_crud() -> dict[str, Any]:
+    """
+    The position of the newest deliverable event (`last`) and of the newest pruned one (`pruned`), None when
+    there is none, and whether committed events are still held back behind running transactions.
+    """
+    async with get_connection() as conn:
+        result = await statements.fetch(conn, "SELECT * FROM get_change_events_bounds_function()")
+        bounds = result[0]
+        return {
+            "last": None if bounds["last_xid"] is None else (bounds["last_xid"], bounds["last_seq"]),
+            "pruned": None if bounds["pruned_xid"] is None else (bounds["pruned_xid"], bounds["pruned_seq"]),
+            "held_back": bounds["held_back"],
+        }
+
+
+async def prune_change_events_crud(retention_seconds: float) -> int:
+    async with get_connection() as conn:
+        result = await statements.fetch(conn, "SELECT * FROM prune_change_events_function($1)", retention_seconds)
+        return result[0][0]
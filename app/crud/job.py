@@ -0,0 +1,80 @@
+import json
+from typing import Any, Optional
+from uuid import UUID
+
+import asyncpg
+from fastapi import HTTPException
+
+from app.core.database import get_connection
+from app.core.statements import statements
+
+# Jobs are always read from the primary: their state changes continuously and a replica may lag behind.
+
+
+def _job_from_record(record: asyncpg.Record) -> dict[str, Any]:
+    job = dict(record)
+    # asyncpg hands JSONB columns over as text.
+    job["params"] = json.loads(job["params"])
+    job["result"] = None if job["result"] is None else json.loads(job["result"])
+    return job
+
+
+async def create_job_crud(
+    job_id: UUID, kind: str, user_id: int, params: dict[str, Any], node_id: str
+) -> dict[str, Any]:
+    async with get_connection() as conn:
+        try:
+            query = "SELECT * FROM create_job_function($1, $2, $3, $4, $5)"
+            result = await statements.fetch(conn, query, job_id, kind, user_id, json.dumps(params), node_id)
+            return _job_from_record(result[0])
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Error creating job: {e}")
+
+
+async def get_job_crud(job_id: UUID, user_id: int) -> Optional[dict[str, Any]]:
+    async with get_connection() as conn:
+        result = await statements.fetch(conn, "SELECT * FROM get_job_function($1, $2)", job_id, user_id)
+        return _job_from_record(result[0]) if result else None
+
+
+async def cancel_job_crud(job_id: UUID, user_id: int) -> Optional[dict[str, Any]]:
+    async with get_connection() as conn:
+        result = await statements.fetch(conn, "SELECT * FROM cancel_job_function($1, $2)", job_id, user_id)
+        return _job_from_record(result[0]) if result else None
+
+
+async def claim_job_crud(node_id: str) -> Optional[dict[str, Any]]:
+    """Mark the oldest queued job of `node_id` as running and return it, or None when there is none."""
+    async with get_connection() as conn:
+        result = await statements.fetch(conn, "SELECT * FROM claim_job_function($1)", node_id)
+        return _job_from_record(result[0]) if result else None
+
+
+async def update_job_progress_crud(job_id: UUID, processed_rows: int, failed_rows: int) -> bool:
+    """Store the progress counters of a running job. Returns whether the job should stop (cancelled or gone)."""
+    async with get_connection() as conn:
+        query = "SELECT * FROM update_job_progress_function($1, $2, $3)"
+        result = await statements.fetch(conn, query, job_id, processed_rows, failed_rows)
+        return not result or result[0]["cancel_requested"]
+
+
+async def finish_job_crud(
+    job_id: UUID,
+    status: str,
+    result: Optional[dict[str, Any]] = None,
+    result_file: Optional[str] = None,
+    error: Optional[str] = None,
+) -> None:
+    async with get_connection() as conn:
+        query = "SELECT * FROM finish_job_function($1, $2, $3, $4, $5)"
+        await statements.fetch(
+            conn, query, job_id, status, None if result is None else json.dumps(result), result_file, error
+        )
+
+
+async def expire_jobs_crud(retention_seconds: float, stale_seconds: float) -> list[UUID]:
+    """Fail jobs whose worker stopped and delete expired jobs. Returns the ids of the deleted jobs."""
+    async with get_connection() as conn:
+        query = "SELECT * FROM expire_jobs_function($1, $2)"
+        result = await statements.fetch(conn, query, retention_seconds, stale_seconds)
+        return [record["id"] for record in result]
@@ -1,35 +1,67 @@
-from argon2 import PasswordHasher
+import logging
+from typing import Optional
+
+import asyncpg
 from argon2.exceptions import VerifyMismatchError
 from fastapi import Depends, HTTPException, status
 
+from app.constants import ACCESS_TOKEN_EXPIRE_MINUTES
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.database import get_connection
+from app.core.jwt_keys import KeyConfigurationError
+from app.core.security import password_hashing
+from app.core.statements import statements
 from app.crud.auth import create_jwt_token, decrypt_jwt, oauth2_scheme
 from app.schemas.user import UserCreate, UserLogin
-from app.utils import get_connection
 
-ph = PasswordHasher()
+logger = logging.getLogger(__name__)
+
+USER_CHANNEL = "user_changes"
+
+# Resolved principals keyed by token subject. A cached user never outlives the token that could carry it, and
+# is dropped in every process when the row changes (see users_changed).
+user_cache = TTLCache(
+    max_size=settings.user_cache_max_size,
+    ttl=min(settings.user_cache_ttl_seconds, ACCESS_TOKEN_EXPIRE_MINUTES * 60),
+)
+
+
+async def users_changed(conn: asyncpg.Connection, emails: Optional[set[str]]) -> None:
+    """
+    Change feed invalidation for the 'user_changes' channel (013_notify_user_changes.sql): forget the users
+    that were updated or deleted, or every user when notifications may have been missed.
+    """
+    if emails is None:
+        user_cache.clear()
+        return
+    for email in emails:
+        user_cache.invalidate(email)
 
 
 async def get_user_by_email_crud(email: str) -> dict:
-    conn = await get_connection()
-    try:
-        query = "SELECT * FROM get_user_by_email_function($1)"
-        result = await conn.fetch(
-            query,
-            email,
-        )
-        return dict(result[0]) if result else {}
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Error retrieving user: {e}")
-    finally:
-        await conn.close()
+    async with get_connection() as conn:
+        try:
+            query = "SELECT * FROM get_user_by_email_function($1)"
+            result = await statements.fetch(
+                conn,
+                query,
+                email,
+            )
+            return dict(result[0]) if result else {}
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Error retrieving user: {e}")
 
 
 async def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
     email = decrypt_jwt(token)
-    user = await get_user_by_email_crud(email)
+    user = user_cache.get(email)
     if user is None:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-    return user
+        user = await get_user_by_email_crud(email)
+        if not user:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+        user_cache.set(email, user)
+    return dict(user)
 
 
 async def create_user_crud(user_data: UserCreate) -> dict:
@@ -37,21 +69,31 @@ async def create_user_crud(user_data: UserCreate) -> dict:
     if user:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="User already exists")
 
-    hashed_password = ph.hash(user_data.password)
-    conn = await get_connection()
-    try:
-        query = "SELECT * FROM create_user_function($1, $2, $3)"
-        result = await conn.fetch(
-            query,
-            user_data.email,
-            hashed_password,
-            user_data.full_name,
-        )
-        return dict(result[0])
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Error creating user: {e}")
-    finally:
-        await conn.close()
+    hashed_password = await password_hashing.hash(user_data.password)
+    async with get_connection() as conn:
+        try:
+            query = "SELECT * FROM create_user_function($1, $2, $3)"
+            result = await statements.fetch(
+                conn,
+                query,
+                user_data.email,
+                hashed_password,
+                user_data.full_name,
+            )
+            user_cache.invalidate(user_data.email)
+            return dict(result[0])
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Error creating user: {e}")
+
+
+async def update_user_password_crud(email: str, hashed_password: str) -> None:
+    async with get_connection() as conn:
+        try:
+            query = "SELECT * FROM update_user_password_function($1, $2)"
+            await statements.fetch(conn, query, email, hashed_password)
+            user_cache.invalidate(email)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Error updating user: {e}")
 
 
 async def verify_user_and_create_jwt(user_data: UserLogin) -> str:
@@ -61,11 +103,22 @@ async def verify_user_and_create_jwt(user_data: UserLogin) -> str:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST, detail="User with these credentials not found."
             )
-        ph.verify(user["hashed_password"], user_data.password)
+        await password_hashing.verify(user["hashed_password"], user_data.password)
 
         token = create_jwt_token(user["email"])
 
     except VerifyMismatchError:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid user credentials!")
+    except KeyConfigurationError:
+        # A verification-only node (no JWT signing key) accepts tokens but cannot issue them.
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="This node cannot issue tokens")
+
+    # The password is known only now, so this is where hashes made with outdated Argon2 parameters get upgraded.
+    if password_hashing.needs_rehash(user["hashed_password"]):
+        try:
+            new_hash = await password_hashing.hash(user_data.password)
+            await update_user_password_crud(user["email"], new_hash)
+        except HTTPException as e:
+            logger.warning("Could not upgrade the password hash of %s: %s", user["email"], e.detail)
 
     return token
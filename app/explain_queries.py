@@ -0,0 +1,76 @@
+"""
+Print EXPLAIN (ANALYZE, BUFFERS) output for the queries behind the book and author endpoints.
+
+PL/pgSQL functions show up as a single opaque "Function Scan" in EXPLAIN, so the queries below are
+the statements those functions run, written out with representative arguments. Run it from the
+`app` directory against a database with realistic data, before and after a migration, and compare
+the plans and execution times.
+
+The plans printed here are custom plans, made for the given arguments. Inside a function, or for a
+statement prepared by asyncpg, PostgreSQL may switch to a generic plan after five executions. A generic
+plan keeps filter_books' `(p_x IS NULL OR col = p_x)` predicates as they are, and those cannot use the
+indexes. get_books_function and get_book_facets_function are therefore created with
+`SET plan_cache_mode = force_custom_plan`, and get_authors_function has one static query per filter.
+To see the plan a cached statement would fall back to, run `SET plan_cache_mode = force_generic_plan`,
+then `PREPARE` and `EXPLAIN EXECUTE` the query in psql.
+"""
+
+import asyncio
+import sys
+
+import asyncpg
+from core.config import settings
+
+QUERIES = {
+    "list books, default sort": (
+        "SELECT * FROM filter_books() b ORDER BY b.title, b.id LIMIT 20",
+        (),
+    ),
+    "list books, title filter": (
+        "SELECT * FROM filter_books(NULL, $1) b ORDER BY b.title, b.id LIMIT 20",
+        ("war",),
+    ),
+    "list books, author filter": (
+        "SELECT * FROM filter_books(NULL, NULL, $1) b ORDER BY b.title, b.id LIMIT 20",
+        ("tolst",),
+    ),
+    "list books, genre + years, newest first": (
+        "SELECT * FROM filter_books(NULL, NULL, NULL, $1, $2, $3) b "
+        "ORDER BY b.published_year DESC, b.id DESC LIMIT 20",
+        ("Fiction", 1900, 2000),
+    ),
+    "list books, keyset page": (
+        "SELECT * FROM filter_books() b WHERE (b.title, b.id) > ($1, $2) ORDER BY b.title, b.id LIMIT 20",
+        ("M", 0),
+    ),
+    "list books, deep offset page": (
+        "SELECT * FROM filter_books() b ORDER BY b.title, b.id LIMIT 20 OFFSET 100000",
+        (),
+    ),
+    "author lookup by name": (
+        "SELECT * FROM get_authors_function(NULL, $1)",
+        ("Leo Tolstoy",),
+    ),
+    "books of an author": (
+        "SELECT * FROM books WHERE author_id = $1",
+        (1,),
+    ),
+}
+
+
+async def explain_queries(names: list[str]):
+    conn = await asyncpg.connect(settings.db_url)
+    try:
+        for name, (query, args) in QUERIES.items():
+            if names and name not in names:
+                continue
+            plan = await conn.fetch(f"EXPLAIN (ANALYZE, BUFFERS) {query}", *args)
+            print(f"=== {name}")
+            print("\n".join(row[0] for row in plan))
+            print()
+    finally:
+        await conn.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(explain_queries(sys.argv[1:]))
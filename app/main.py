@@ -1,10 +1,61 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 
+from app.core.admission import AdmissionControlMiddleware, admission_controller
+from app.core.changes import change_feed
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
-from app.routers import author, book, user
+from app.core.database import close_pool, init_pool, init_replica_pool
+from app.core.jobs import job_workers
+from app.core.metrics import MetricsMiddleware, mark_process_dead
+from app.core.replication import ReadYourWritesMiddleware
+from app.core.security import password_hashing
+from app.routers import author, book, change, health, job, metrics, system, user
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await init_pool()
+    await init_replica_pool()
+    await job_workers.start()
+    await change_feed.start()
+    yield
+    await change_feed.stop()
+    await job_workers.stop()
+    await close_pool()
+    password_hashing.shutdown()
+    mark_process_dead()
+
 
-app = FastAPI(title=settings.app_name, version=settings.app_version)
+app = FastAPI(
+    title=settings.app_name,
+    version=settings.app_version,
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
+if settings.admission_control:
+    app.add_middleware(AdmissionControlMiddleware, controller=admission_controller)
+if settings.compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        encodings=settings.compression_encodings,
+        levels={
+            "gzip": settings.compression_gzip_level,
+            "zstd": settings.compression_zstd_level,
+            "br": settings.compression_brotli_level,
+        },
+        minimum_size=settings.compression_minimum_size,
+    )
+app.add_middleware(ReadYourWritesMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(book.router, prefix="/api")
 app.include_router(author.router, prefix="/api")
 app.include_router(user.router, prefix="/api")
+app.include_router(job.router, prefix="/api")
+app.include_router(change.router, prefix="/api")
+app.include_router(system.router, prefix="/api")
+app.include_router(metrics.router)
+app.include_router(health.router)
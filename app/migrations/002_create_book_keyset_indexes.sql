@@ -0,0 +1,7 @@
+-- Composite indexes backing keyset pagination: each one matches an
+-- ORDER BY b.<sort column>, b.id of get_books_function / get_books_keyset_function,
+-- so a page seeks straight to (value, id) instead of skipping OFFSET rows.
+CREATE INDEX IF NOT EXISTS idx_books_title_id ON books (title, id);
+CREATE INDEX IF NOT EXISTS idx_books_published_year_id ON books (published_year, id);
+CREATE INDEX IF NOT EXISTS idx_books_genre_id ON books (genre, id);
+CREATE INDEX IF NOT EXISTS idx_books_isbn_id ON books (isbn, id);
@@ -0,0 +1,6 @@
+-- Indexes for the static filter/lookup predicates of the book and author functions.
+-- books.genre and books.published_year are already the leading columns of
+-- idx_books_genre_id and idx_books_published_year_id (002), which serve equality and range filters too.
+CREATE INDEX IF NOT EXISTS idx_books_author_id ON books (author_id);
+CREATE INDEX IF NOT EXISTS idx_books_created_at ON books (created_at);
+CREATE INDEX IF NOT EXISTS idx_authors_lower_name ON authors (lower(name));
@@ -0,0 +1,5 @@
+-- migrate: no-transaction
+-- Serves an author's book list (get_author_books_function) in title order straight from the index,
+-- so a page costs LIMIT + OFFSET index entries instead of sorting all of the author's books.
+-- Built concurrently so writes to books are not blocked while the index is created.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_books_author_id_title_id ON books (author_id, title, id);
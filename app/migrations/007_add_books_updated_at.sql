@@ -0,0 +1,21 @@
+-- When a book's own data last changed. Maintained by a trigger, so every write path keeps it current;
+-- updates that leave the book's columns as they were (e.g. an unchanged upserted row) do not touch it.
+ALTER TABLE books ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP;
+
+CREATE OR REPLACE FUNCTION books_touch_updated_at_trigger()
+RETURNS trigger AS $$
+BEGIN
+    NEW.updated_at := CURRENT_TIMESTAMP;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS books_touch_updated_at ON books;
+CREATE TRIGGER books_touch_updated_at
+    BEFORE UPDATE ON books
+    FOR EACH ROW
+    WHEN (
+        (OLD.title, OLD.isbn, OLD.published_year, OLD.genre, OLD.author_id)
+        IS DISTINCT FROM (NEW.title, NEW.isbn, NEW.published_year, NEW.genre, NEW.author_id)
+    )
+    EXECUTE FUNCTION books_touch_updated_at_trigger();
@@ -0,0 +1,25 @@
+-- Background jobs (book imports and exports). Workers claim queued jobs with FOR UPDATE SKIP LOCKED,
+-- so any number of processes can share the queue; running jobs refresh heartbeat_at with every
+-- progress update, which lets a stopped worker's jobs be recognised and failed.
+CREATE TABLE IF NOT EXISTS jobs (
+    id UUID PRIMARY KEY,
+    kind VARCHAR(20) NOT NULL CHECK (kind IN ('import', 'export')),
+    status VARCHAR(20) NOT NULL DEFAULT 'queued'
+        CHECK (status IN ('queued', 'running', 'succeeded', 'failed', 'cancelled')),
+    user_id INT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    params JSONB NOT NULL DEFAULT '{}',
+    processed_rows BIGINT NOT NULL DEFAULT 0,
+    failed_rows BIGINT NOT NULL DEFAULT 0,
+    cancel_requested BOOLEAN NOT NULL DEFAULT FALSE,
+    result JSONB,
+    result_file TEXT,
+    error TEXT,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP WITH TIME ZONE,
+    heartbeat_at TIMESTAMP WITH TIME ZONE,
+    finished_at TIMESTAMP WITH TIME ZONE
+);
+
+CREATE INDEX IF NOT EXISTS idx_jobs_queued ON jobs (created_at) WHERE status = 'queued';
+CREATE INDEX IF NOT EXISTS idx_jobs_running ON jobs (heartbeat_at) WHERE status = 'running';
+CREATE INDEX IF NOT EXISTS idx_jobs_finished_at ON jobs (finished_at) WHERE finished_at IS NOT NULL;
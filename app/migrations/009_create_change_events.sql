@@ -0,0 +1,179 @@
+-- Change feed of book and author mutations. Statement-level triggers append one compact row per changed
+-- book or author to change_events and send a notification on the 'change_events' channel once per statement,
+-- carrying the last sequence number written; the rows themselves are the source of truth.
+--
+-- seq doubles as the clients' resume token, so it has to grow in commit order: otherwise a transaction that
+-- took a lower number could commit after a client already saw a higher one and the client would skip it on
+-- resume. A BEFORE STATEMENT trigger therefore takes a transaction-level advisory lock, which orders the
+-- transactions writing books or authors from their first such statement until they commit. Taking it before
+-- the statement locks any rows keeps it from deadlocking with the row locks of another writer.
+CREATE TABLE IF NOT EXISTS change_events (
+    seq BIGSERIAL PRIMARY KEY,
+    entity VARCHAR(10) NOT NULL CHECK (entity IN ('book', 'author')),
+    op VARCHAR(10) NOT NULL CHECK (op IN ('insert', 'update', 'delete')),
+    entity_id INT NOT NULL,
+    -- The book's author (the author itself for author events), and the previous one when a book moved.
+    author_id INT,
+    previous_author_id INT,
+    changed_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_change_events_changed_at ON change_events (changed_at);
+
+-- Arbitrary application-wide key for pg_advisory_xact_lock.
+CREATE OR REPLACE FUNCTION change_events_lock_key()
+RETURNS BIGINT AS $$
+    SELECT 7203417339100517::BIGINT;
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION lock_change_events_trigger()
+RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_advisory_xact_lock(change_events_lock_key());
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION notify_change_events(p_last_seq BIGINT)
+RETURNS void AS $$
+BEGIN
+    IF p_last_seq IS NOT NULL THEN
+        PERFORM pg_notify('change_events', p_last_seq::text);
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION books_change_events_insert_trigger()
+RETURNS trigger AS $$
+DECLARE
+    v_last_seq BIGINT;
+BEGIN
+    WITH written AS (
+        INSERT INTO change_events (entity, op, entity_id, author_id)
+        SELECT 'book', 'insert', n.id, n.author_id FROM new_rows n ORDER BY n.id
+        RETURNING seq
+    )
+    SELECT max(seq) INTO v_last_seq FROM written;
+    PERFORM notify_change_events(v_last_seq);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION books_change_events_update_trigger()
+RETURNS trigger AS $$
+DECLARE
+    v_last_seq BIGINT;
+BEGIN
+    WITH written AS (
+        INSERT INTO change_events (entity, op, entity_id, author_id, previous_author_id)
+        SELECT 'book', 'update', n.id, n.author_id, NULLIF(o.author_id, n.author_id)
+        FROM new_rows n
+        JOIN old_rows o ON o.id = n.id
+        WHERE (o.title, o.isbn, o.published_year, o.genre, o.author_id)
+            IS DISTINCT FROM (n.title, n.isbn, n.published_year, n.genre, n.author_id)
+        ORDER BY n.id
+        RETURNING seq
+    )
+    SELECT max(seq) INTO v_last_seq FROM written;
+    PERFORM notify_change_events(v_last_seq);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION books_change_events_delete_trigger()
+RETURNS trigger AS $$
+DECLARE
+    v_last_seq BIGINT;
+BEGIN
+    WITH written AS (
+        INSERT INTO change_events (entity, op, entity_id, author_id)
+        SELECT 'book', 'delete', o.id, o.author_id FROM old_rows o ORDER BY o.id
+        RETURNING seq
+    )
+    SELECT max(seq) INTO v_last_seq FROM written;
+    PERFORM notify_change_events(v_last_seq);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION authors_change_events_trigger()
+RETURNS trigger AS $$
+DECLARE
+    v_last_seq BIGINT;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        WITH written AS (
+            INSERT INTO change_events (entity, op, entity_id, author_id)
+            SELECT 'author', 'insert', n.id, n.id FROM new_rows n ORDER BY n.id
+            RETURNING seq
+        )
+        SELECT max(seq) INTO v_last_seq FROM written;
+    ELSIF TG_OP = 'UPDATE' THEN
+        WITH written AS (
+            INSERT INTO change_events (entity, op, entity_id, author_id)
+            SELECT 'author', 'update', n.id, n.id
+            FROM new_rows n
+            JOIN old_rows o ON o.id = n.id
+            WHERE o.name IS DISTINCT FROM n.name
+            ORDER BY n.id
+            RETURNING seq
+        )
+        SELECT max(seq) INTO v_last_seq FROM written;
+    ELSE
+        WITH written AS (
+            INSERT INTO change_events (entity, op, entity_id, author_id)
+            SELECT 'author', 'delete', o.id, o.id FROM old_rows o ORDER BY o.id
+            RETURNING seq
+        )
+        SELECT max(seq) INTO v_last_seq FROM written;
+    END IF;
+    PERFORM notify_change_events(v_last_seq);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS books_change_events_lock ON books;
+CREATE TRIGGER books_change_events_lock
+    BEFORE INSERT OR UPDATE OR DELETE ON books
+    FOR EACH STATEMENT EXECUTE FUNCTION lock_change_events_trigger();
+
+DROP TRIGGER IF EXISTS authors_change_events_lock ON authors;
+CREATE TRIGGER authors_change_events_lock
+    BEFORE INSERT OR UPDATE OR DELETE ON authors
+    FOR EACH STATEMENT EXECUTE FUNCTION lock_change_events_trigger();
+
+DROP TRIGGER IF EXISTS books_change_events_insert ON books;
+CREATE TRIGGER books_change_events_insert
+    AFTER INSERT ON books
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION books_change_events_insert_trigger();
+
+DROP TRIGGER IF EXISTS books_change_events_update ON books;
+CREATE TRIGGER books_change_events_update
+    AFTER UPDATE ON books
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION books_change_events_update_trigger();
+
+DROP TRIGGER IF EXISTS books_change_events_delete ON books;
+CREATE TRIGGER books_change_events_delete
+    AFTER DELETE ON books
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION books_change_events_delete_trigger();
+
+DROP TRIGGER IF EXISTS authors_change_events_insert ON authors;
+CREATE TRIGGER authors_change_events_insert
+    AFTER INSERT ON authors
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION authors_change_events_trigger();
+
+DROP TRIGGER IF EXISTS authors_change_events_update ON authors;
+CREATE TRIGGER authors_change_events_update
+    AFTER UPDATE ON authors
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION authors_change_events_trigger();
+
+DROP TRIGGER IF EXISTS authors_change_events_delete ON authors;
+CREATE TRIGGER authors_change_events_delete
+    AFTER DELETE ON authors
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION authors_change_events_trigger();
@@ -0,0 +1,6 @@
+-- The node whose JOB_DIRECTORY holds a job's upload and result file. Workers only claim the queued jobs of
+-- their own node; jobs queued before this column existed have none and can be claimed by any node.
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS node_id TEXT;
+
+DROP INDEX IF EXISTS idx_jobs_queued;
+CREATE INDEX IF NOT EXISTS idx_jobs_queued_by_node ON jobs (node_id, created_at) WHERE status = 'queued';
@@ -0,0 +1,5 @@
+-- migrate: no-transaction
+-- idx_books_created_at (004) was meant for sort_by=created_at, but the listing functions only sort by
+-- title, published_year, genre and isbn (created_at falls back to title), so the index was never used
+-- and only slowed down writes to books.
+DROP INDEX CONCURRENTLY IF EXISTS idx_books_created_at;
@@ -0,0 +1,24 @@
+-- Order the change feed by transaction instead of serialising the writers.
+--
+-- 009 made seq follow commit order by taking one advisory lock in every transaction writing books or
+-- authors, which queued all catalog writers behind each other. Instead, every event now records the id of
+-- the transaction that wrote it, and readers only see events whose transaction is older than the xmin of
+-- their snapshot: every transaction before that horizon has ended, so no event can still appear below it.
+-- As the horizon only moves forward, delivering the events below it in (xid, seq) order never has to go
+-- back, and (xid, seq) is a stable resume token. Events of transactions that are still running when
+-- others commit after them are delivered once those transactions have ended.
+ALTER TABLE change_events ADD COLUMN IF NOT EXISTS xid BIGINT NOT NULL DEFAULT (pg_current_xact_id()::text)::BIGINT;
+
+CREATE INDEX IF NOT EXISTS idx_change_events_xid_seq ON change_events (xid, seq);
+
+-- The newest position pruning removed, so a client resuming from before it knows it missed events.
+CREATE TABLE IF NOT EXISTS change_events_pruned (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    xid BIGINT NOT NULL,
+    seq BIGINT NOT NULL
+);
+
+DROP TRIGGER IF EXISTS books_change_events_lock ON books;
+DROP TRIGGER IF EXISTS authors_change_events_lock ON authors;
+DROP FUNCTION IF EXISTS lock_change_events_trigger();
+DROP FUNCTION IF EXISTS change_events_lock_key();
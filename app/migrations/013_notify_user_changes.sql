@@ -0,0 +1,15 @@
+-- Every worker process caches the users it resolved from tokens. A notification on the 'user_changes'
+-- channel, carrying the email of the changed or deleted user, lets the change feed listener of every process
+-- drop that user right away (see app/core/changes.py) instead of honouring it until the entry expires.
+CREATE OR REPLACE FUNCTION notify_user_changes_trigger()
+RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('user_changes', OLD.email);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS users_notify_changes ON users;
+CREATE TRIGGER users_notify_changes
+AFTER UPDATE OR DELETE ON users
+FOR EACH ROW EXECUTE FUNCTION notify_user_changes_trigger();
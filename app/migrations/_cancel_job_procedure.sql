@@ -0,0 +1,11 @@
+-- A queued job is cancelled right away; a running job is flagged and stops at its next progress update.
+-- Finished jobs are returned unchanged.
+CREATE OR REPLACE FUNCTION cancel_job_function(p_id UUID, p_user_id INT)
+RETURNS SETOF jobs AS $$
+    UPDATE jobs
+    SET status = CASE WHEN jobs.status = 'queued' THEN 'cancelled' ELSE jobs.status END,
+        finished_at = CASE WHEN jobs.status = 'queued' THEN CURRENT_TIMESTAMP ELSE jobs.finished_at END,
+        cancel_requested = jobs.cancel_requested OR jobs.status IN ('queued', 'running')
+    WHERE jobs.id = p_id AND jobs.user_id = p_user_id
+    RETURNING *;
+$$ LANGUAGE sql;
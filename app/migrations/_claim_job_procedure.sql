@@ -0,0 +1,19 @@
+-- Replaces the older signature without arguments.
+DROP FUNCTION IF EXISTS claim_job_function();
+
+-- Take the oldest queued job of a node. SKIP LOCKED lets concurrent workers claim different jobs without waiting.
+CREATE OR REPLACE FUNCTION claim_job_function(p_node_id TEXT)
+RETURNS SETOF jobs AS $$
+    UPDATE jobs
+    SET status = 'running', started_at = CURRENT_TIMESTAMP, heartbeat_at = CURRENT_TIMESTAMP
+    WHERE jobs.id = (
+        SELECT queued.id
+        FROM jobs queued
+        WHERE queued.status = 'queued'
+          AND (queued.node_id = p_node_id OR queued.node_id IS NULL)
+        ORDER BY queued.created_at
+        LIMIT 1
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING *;
+$$ LANGUAGE sql;
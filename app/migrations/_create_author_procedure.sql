@@ -5,19 +5,14 @@ RETURNS TABLE(
     id INT,
     name VARCHAR(255)
 ) AS $$
-DECLARE
-    v_author_id INT;
-    v_query TEXT;
 BEGIN
-    -- Check if the author already exists.
-    v_query := format('SELECT id FROM authors WHERE name ILIKE %L', p_name);
-    EXECUTE v_query INTO v_author_id;
-
-    IF v_author_id IS NOT NULL THEN
+    -- Check if the author already exists (case-insensitive, backed by the index on lower(name)).
+    IF EXISTS (SELECT 1 FROM authors WHERE lower(authors.name) = lower(p_name)) THEN
         RAISE EXCEPTION 'Author with name "%" already exists.', p_name;
     END IF;
 
-    v_query := format('INSERT INTO authors (name) VALUES (%L) RETURNING id, name', p_name);
-    RETURN QUERY EXECUTE v_query;
+    RETURN QUERY
+    INSERT INTO authors (name) VALUES (p_name)
+    RETURNING authors.id, authors.name;
 END;
 $$ LANGUAGE plpgsql;
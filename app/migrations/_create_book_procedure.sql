@@ -17,26 +17,26 @@ RETURNS TABLE(
 DECLARE
     v_author_id INT;
     v_new_book_id INT;
-    v_query TEXT;
 BEGIN
-    v_query := format('SELECT id FROM authors WHERE name ILIKE %L', p_author_name);
-    EXECUTE v_query INTO v_author_id;
+    -- Case-insensitive author lookup backed by the index on lower(authors.name).
+    SELECT authors.id INTO v_author_id
+    FROM authors
+    WHERE lower(authors.name) = lower(p_author_name)
+    ORDER BY authors.id
+    LIMIT 1;
 
     IF v_author_id IS NULL THEN
         RAISE EXCEPTION 'Author "%" does not exist', p_author_name;
     END IF;
 
-    v_query := format(
-        'INSERT INTO books (title, isbn, published_year, genre, author_id) VALUES (%L, %L, %s, %L, %L) RETURNING id',
-        p_title, p_isbn, p_published_year, p_genre, v_author_id
-    );
-    EXECUTE v_query INTO v_new_book_id;
+    INSERT INTO books (title, isbn, published_year, genre, author_id)
+    VALUES (p_title, p_isbn, p_published_year, p_genre, v_author_id)
+    RETURNING books.id INTO v_new_book_id;
 
-    v_query := format(
-        'SELECT b.id, b.title, b.isbn, b.published_year, b.genre, b.author_id, a.name AS author_name ' ||
-        'FROM books b JOIN authors a ON b.author_id = a.id WHERE b.id = %L',
-        v_new_book_id
-    );
-    RETURN QUERY EXECUTE v_query;
+    RETURN QUERY
+    SELECT b.id, b.title, b.isbn, b.published_year, b.genre, b.author_id, a.name AS author_name
+    FROM books b
+    JOIN authors a ON b.author_id = a.id
+    WHERE b.id = v_new_book_id;
 END;
 $$ LANGUAGE plpgsql;
@@ -0,0 +1,29 @@
+-- Insert a whole batch of books with a single set-based statement.
+-- Rows whose ISBN already exists are skipped and simply not returned, so the caller
+-- can report them per row instead of failing the whole batch.
+CREATE OR REPLACE FUNCTION create_books_batch_function(
+    p_titles TEXT[],
+    p_isbns TEXT[],
+    p_published_years INT[],
+    p_genres TEXT[],
+    p_author_ids INT[]
+)
+RETURNS TABLE(
+    id INT,
+    title VARCHAR(255),
+    isbn VARCHAR(13),
+    published_year INT,
+    genre VARCHAR(50),
+    author_id INT,
+    author_name VARCHAR(255)
+) AS $$
+    WITH inserted AS (
+        INSERT INTO books (title, isbn, published_year, genre, author_id)
+        SELECT * FROM unnest(p_titles, p_isbns, p_published_years, p_genres, p_author_ids)
+        ON CONFLICT (isbn) DO NOTHING
+        RETURNING books.id, books.title, books.isbn, books.published_year, books.genre, books.author_id
+    )
+    SELECT i.id, i.title, i.isbn, i.published_year, i.genre, i.author_id, a.name AS author_name
+    FROM inserted i
+    JOIN authors a ON a.id = i.author_id;
+$$ LANGUAGE sql;
@@ -0,0 +1,15 @@
+-- Replaces the older 4-argument signature; the node id was added at the end.
+DROP FUNCTION IF EXISTS create_job_function(UUID, TEXT, INT, JSONB);
+
+CREATE OR REPLACE FUNCTION create_job_function(
+    p_id UUID,
+    p_kind TEXT,
+    p_user_id INT,
+    p_params JSONB,
+    p_node_id TEXT
+)
+RETURNS SETOF jobs AS $$
+    INSERT INTO jobs (id, kind, user_id, params, node_id)
+    VALUES (p_id, p_kind, p_user_id, p_params, p_node_id)
+    RETURNING *;
+$$ LANGUAGE sql;
@@ -0,0 +1,16 @@
+-- Delete a batch of books with a single statement, locking them in id order first.
+-- Returns the ids that were deleted; ids that do not exist are not returned.
+CREATE OR REPLACE FUNCTION delete_books_batch_function(
+    p_ids INT[]
+)
+RETURNS TABLE(
+    id INT
+) AS $$
+    WITH locked AS (
+        SELECT b.id FROM books b WHERE b.id = ANY(p_ids) ORDER BY b.id FOR UPDATE
+    )
+    DELETE FROM books b
+    USING locked l
+    WHERE b.id = l.id
+    RETURNING b.id;
+$$ LANGUAGE sql;
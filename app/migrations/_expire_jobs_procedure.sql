@@ -0,0 +1,18 @@
+-- Housekeeping: fail running jobs whose worker stopped sending heartbeats, then delete jobs that
+-- finished more than p_retention_seconds ago. Returns the deleted job ids so their files can be removed.
+CREATE OR REPLACE FUNCTION expire_jobs_function(p_retention_seconds DOUBLE PRECISION, p_stale_seconds DOUBLE PRECISION)
+RETURNS TABLE(id UUID) AS $$
+BEGIN
+    UPDATE jobs
+    SET status = 'failed',
+        error = 'The worker running this job stopped before it finished.',
+        finished_at = CURRENT_TIMESTAMP
+    WHERE jobs.status = 'running'
+      AND jobs.heartbeat_at < CURRENT_TIMESTAMP - make_interval(secs => p_stale_seconds);
+
+    RETURN QUERY
+    DELETE FROM jobs
+    WHERE jobs.finished_at < CURRENT_TIMESTAMP - make_interval(secs => p_retention_seconds)
+    RETURNING jobs.id;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,17 @@
+-- A plain SQL function, so the planner inlines it into the caller's query and a
+-- server-side cursor over it streams rows instead of materialising the whole result.
+CREATE OR REPLACE FUNCTION export_books_function()
+RETURNS TABLE(
+    id INT,
+    title VARCHAR(255),
+    isbn VARCHAR(13),
+    published_year INT,
+    genre VARCHAR(50),
+    author_id INT,
+    author_name VARCHAR(255)
+) AS $$
+    SELECT b.id, b.title, b.isbn, b.published_year, b.genre, b.author_id, a.name AS author_name
+    FROM books b
+    JOIN authors a ON b.author_id = a.id
+    ORDER BY b.id;
+$$ LANGUAGE sql STABLE;
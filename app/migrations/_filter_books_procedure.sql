@@ -0,0 +1,32 @@
+-- Static, parameterised book filter shared by the book listing functions.
+-- As a plain SQL function it is inlined into the calling query, so its predicates are planned
+-- together with the caller's ORDER BY / LIMIT and can use the indexes on books and authors.
+-- The (p_x IS NULL OR ...) predicates only reduce to index conditions in a plan made for the actual
+-- arguments; the calling functions therefore run with plan_cache_mode = force_custom_plan.
+CREATE OR REPLACE FUNCTION filter_books(
+    p_id INT DEFAULT NULL,
+    p_title TEXT DEFAULT NULL,
+    p_author TEXT DEFAULT NULL,
+    p_genre TEXT DEFAULT NULL,
+    p_year_from INT DEFAULT NULL,
+    p_year_to INT DEFAULT NULL
+)
+RETURNS TABLE(
+    id INT,
+    title VARCHAR(255),
+    isbn VARCHAR(13),
+    published_year INT,
+    genre VARCHAR(50),
+    author_id INT,
+    author_name VARCHAR(255)
+) AS $$
+    SELECT b.id, b.title, b.isbn, b.published_year, b.genre, b.author_id, a.name AS author_name
+    FROM books b
+    JOIN authors a ON b.author_id = a.id
+    WHERE (p_id IS NULL OR b.id = p_id)
+      AND (p_title IS NULL OR b.title ILIKE '%' || p_title || '%')
+      AND (p_author IS NULL OR a.name ILIKE '%' || p_author || '%')
+      AND (p_genre IS NULL OR b.genre = p_genre)
+      AND (p_year_from IS NULL OR b.published_year >= p_year_from)
+      AND (p_year_to IS NULL OR b.published_year <= p_year_to);
+$$ LANGUAGE sql STABLE;
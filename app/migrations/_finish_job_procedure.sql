@@ -0,0 +1,18 @@
+-- Only a running job can be finished; a job failed in the meantime (stale heartbeat) stays failed.
+CREATE OR REPLACE FUNCTION finish_job_function(
+    p_id UUID,
+    p_status TEXT,
+    p_result JSONB,
+    p_result_file TEXT,
+    p_error TEXT
+)
+RETURNS SETOF jobs AS $$
+    UPDATE jobs
+    SET status = p_status,
+        result = p_result,
+        result_file = p_result_file,
+        error = p_error,
+        finished_at = CURRENT_TIMESTAMP
+    WHERE jobs.id = p_id AND jobs.status = 'running'
+    RETURNING *;
+$$ LANGUAGE sql;
@@ -0,0 +1,22 @@
+-- One page of an author's books, ordered by title (served by idx_books_author_id_title_id, 006).
+CREATE OR REPLACE FUNCTION get_author_books_function(
+    p_author_id INT,
+    p_limit INT DEFAULT 20,
+    p_offset INT DEFAULT 0
+)
+RETURNS TABLE(
+    id INT,
+    title VARCHAR(255),
+    isbn VARCHAR(13),
+    published_year INT,
+    genre VARCHAR(50),
+    author_id INT,
+    author_name VARCHAR(255)
+) AS $$
+    SELECT b.id, b.title, b.isbn, b.published_year, b.genre, b.author_id, a.name AS author_name
+    FROM books b
+    JOIN authors a ON b.author_id = a.id
+    WHERE b.author_id = p_author_id
+    ORDER BY b.title, b.id
+    LIMIT p_limit OFFSET p_offset;
+$$ LANGUAGE sql STABLE;
@@ -0,0 +1,13 @@
+-- Resolve many author names at once (case-insensitive), in the order the names were given.
+CREATE OR REPLACE FUNCTION get_authors_by_names_function(
+    p_names TEXT[]
+)
+RETURNS TABLE(
+    id INT,
+    name VARCHAR(255)
+) AS $$
+    SELECT a.id, a.name
+    FROM unnest(p_names) WITH ORDINALITY AS n(name, position)
+    JOIN authors a ON lower(a.name) = lower(n.name)
+    ORDER BY n.position;
+$$ LANGUAGE sql STABLE;
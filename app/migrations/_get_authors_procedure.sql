@@ -6,23 +6,27 @@ RETURNS TABLE(
     id INT,
     name VARCHAR(255)
 ) AS $$
-DECLARE
-    base_query TEXT := 'SELECT id, name FROM authors';
-    conditions TEXT := '';
-    query TEXT;
 BEGIN
+    -- One static query per filter, so the cached plan of each is the index lookup it needs; a single
+    -- (p_x IS NULL OR ...) query would get a generic plan after a few calls that uses neither index.
+    -- Names match case-insensitively (as the former ILIKE did), backed by the index on lower(name).
     IF p_id IS NOT NULL THEN
-        conditions := conditions || format('id = %L', p_id) || ' AND ';
+        RETURN QUERY
+        SELECT a.id, a.name
+        FROM authors a
+        WHERE a.id = p_id
+          AND (p_name IS NULL OR lower(a.name) = lower(p_name));
+    ELSIF p_name IS NOT NULL THEN
+        RETURN QUERY
+        SELECT a.id, a.name
+        FROM authors a
+        WHERE lower(a.name) = lower(p_name)
+        ORDER BY a.id;
+    ELSE
+        RETURN QUERY
+        SELECT a.id, a.name
+        FROM authors a
+        ORDER BY a.id;
     END IF;
-    IF p_name IS NOT NULL THEN
-        conditions := conditions || format('name ILIKE %L', p_name) || ' AND ';
-    END IF;
-
-    IF conditions <> '' THEN
-        conditions := ' WHERE ' || left(conditions, length(conditions) - 5);
-    END IF;
-
-    query := base_query || conditions;
-    RETURN QUERY EXECUTE query;
 END;
-$$ LANGUAGE plpgsql;
+$$ LANGUAGE plpgsql STABLE;
@@ -0,0 +1,93 @@
+-- Facet counts for the books matching the listing filters, one row per facet value:
+--   ('total', NULL, 'exact' | 'estimate', n), ('genre', genre, NULL, n), ('year', year, NULL, n)
+--   and ('author', author id, author name, n) for the p_top_authors authors with the most books.
+CREATE OR REPLACE FUNCTION get_book_facets_function(
+    p_title TEXT DEFAULT NULL,
+    p_author TEXT DEFAULT NULL,
+    p_genre TEXT DEFAULT NULL,
+    p_year_from INT DEFAULT NULL,
+    p_year_to INT DEFAULT NULL,
+    p_top_authors INT DEFAULT 10,
+    p_estimate BOOLEAN DEFAULT FALSE
+)
+RETURNS TABLE(
+    facet TEXT,
+    value TEXT,
+    label TEXT,
+    book_count BIGINT
+) AS $$
+DECLARE
+    v_estimate BIGINT;
+BEGIN
+    IF p_title IS NULL AND p_author IS NULL AND p_genre IS NULL AND p_year_from IS NULL AND p_year_to IS NULL THEN
+        -- Unfiltered: read the trigger-maintained counters (migration 005) instead of scanning books.
+        IF p_estimate THEN
+            -- reltuples is -1 (or 0) until the table has been analysed; fall back to the exact count then.
+            SELECT c.reltuples::BIGINT INTO v_estimate FROM pg_class c WHERE c.oid = 'books'::regclass;
+        END IF;
+        IF v_estimate > 0 THEN
+            RETURN QUERY SELECT 'total'::TEXT, NULL::TEXT, 'estimate'::TEXT, v_estimate;
+        ELSE
+            RETURN QUERY
+            SELECT 'total'::TEXT, NULL::TEXT, 'exact'::TEXT, coalesce(sum(c.book_count), 0)::BIGINT
+            FROM book_genre_counts c;
+        END IF;
+
+        RETURN QUERY
+        SELECT 'genre'::TEXT, c.genre::TEXT, NULL::TEXT, c.book_count
+        FROM book_genre_counts c
+        WHERE c.book_count > 0;
+
+        RETURN QUERY
+        SELECT 'year'::TEXT, c.published_year::TEXT, NULL::TEXT, c.book_count
+        FROM book_year_counts c
+        WHERE c.book_count > 0;
+
+        RETURN QUERY
+        SELECT 'author'::TEXT, c.author_id::TEXT, a.name::TEXT, c.book_count
+        FROM book_author_counts c
+        JOIN authors a ON a.id = c.author_id
+        WHERE c.book_count > 0
+        ORDER BY c.book_count DESC, c.author_id
+        LIMIT p_top_authors;
+        RETURN;
+    END IF;
+
+    -- Filtered: count every facet in a single pass over the matching books.
+    -- GROUPING() is a bit mask over (genre, published_year, author_id, author_name); a set bit means
+    -- the column is aggregated away: 15 = total, 7 = per genre, 11 = per year, 12 = per author.
+    -- The empty grouping set always yields the total row, even when nothing matches.
+    RETURN QUERY
+    WITH grouped AS (
+        SELECT
+            m.genre,
+            m.published_year,
+            m.author_id,
+            m.author_name,
+            GROUPING(m.genre, m.published_year, m.author_id, m.author_name) AS grouping_id,
+            count(*) AS book_count
+        FROM filter_books(NULL, p_title, p_author, p_genre, p_year_from, p_year_to) m
+        GROUP BY GROUPING SETS ((), (m.genre), (m.published_year), (m.author_id, m.author_name))
+    ), ranked AS (
+        SELECT
+            g.*,
+            row_number() OVER (PARTITION BY g.grouping_id ORDER BY g.book_count DESC, g.author_id) AS author_rank
+        FROM grouped g
+    )
+    SELECT
+        CASE r.grouping_id WHEN 15 THEN 'total' WHEN 7 THEN 'genre' WHEN 11 THEN 'year' ELSE 'author' END,
+        CASE r.grouping_id
+            WHEN 7 THEN r.genre::TEXT
+            WHEN 11 THEN r.published_year::TEXT
+            WHEN 12 THEN r.author_id::TEXT
+        END,
+        CASE r.grouping_id WHEN 15 THEN 'exact' WHEN 12 THEN r.author_name::TEXT END,
+        r.book_count
+    FROM ranked r
+    WHERE (r.grouping_id <> 12 OR r.author_rank <= p_top_authors)
+      AND (r.grouping_id <> 11 OR r.published_year IS NOT NULL);
+END;
+$$ LANGUAGE plpgsql STABLE
+-- Plan every call for its arguments: a cached generic plan keeps filter_books' (p_x IS NULL OR ...)
+-- predicates and cannot use the indexes behind them.
+SET plan_cache_mode = force_custom_plan;
@@ -0,0 +1,19 @@
+-- Fetch many books by id in one query, in the order the ids were given. Unknown ids are skipped.
+CREATE OR REPLACE FUNCTION get_books_by_ids_function(
+    p_ids INT[]
+)
+RETURNS TABLE(
+    id INT,
+    title VARCHAR(255),
+    isbn VARCHAR(13),
+    published_year INT,
+    genre VARCHAR(50),
+    author_id INT,
+    author_name VARCHAR(255)
+) AS $$
+    SELECT b.id, b.title, b.isbn, b.published_year, b.genre, b.author_id, a.name AS author_name
+    FROM unnest(p_ids) WITH ORDINALITY AS i(id, position)
+    JOIN books b ON b.id = i.id
+    JOIN authors a ON b.author_id = a.id
+    ORDER BY i.position;
+$$ LANGUAGE sql STABLE;
@@ -0,0 +1,12 @@
+-- Ids of the books holding any of the given ISBNs, to report ISBN conflicts per item.
+CREATE OR REPLACE FUNCTION get_books_by_isbns_function(
+    p_isbns TEXT[]
+)
+RETURNS TABLE(
+    id INT,
+    isbn VARCHAR(13)
+) AS $$
+    SELECT b.id, b.isbn
+    FROM books b
+    WHERE b.isbn = ANY(p_isbns);
+$$ LANGUAGE sql STABLE;
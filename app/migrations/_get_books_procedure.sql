@@ -1,3 +1,7 @@
+-- Replaces the older 10-argument signature; the keyset arguments were added at the end.
+DROP FUNCTION IF EXISTS get_books_function(INT, TEXT, TEXT, TEXT, INT, INT, TEXT, TEXT, INT, INT);
+DROP FUNCTION IF EXISTS get_books_keyset_function(TEXT, TEXT, TEXT, INT, INT, TEXT, TEXT, INT, TEXT, INT);
+
 CREATE OR REPLACE FUNCTION get_books_function(
     p_id INT DEFAULT NULL,
     p_title TEXT DEFAULT NULL,
@@ -8,7 +12,9 @@ CREATE OR REPLACE FUNCTION get_books_function(
     p_sort_by TEXT DEFAULT 'title',
     p_sort_order TEXT DEFAULT 'asc',
     p_limit INT DEFAULT 10,
-    p_offset INT DEFAULT 0
+    p_offset INT DEFAULT 0,
+    p_after_value TEXT DEFAULT NULL,
+    p_after_id INT DEFAULT NULL
 )
 RETURNS TABLE(
     id INT,
@@ -20,47 +26,64 @@ RETURNS TABLE(
     author_name VARCHAR(255)
 ) AS $$
 DECLARE
-    base_query TEXT := 'SELECT b.id, b.title, b.isbn, b.published_year, b.genre, b.author_id, a.name AS author_name FROM books b JOIN authors a ON b.author_id = a.id';
-    conditions TEXT := '';
-    query TEXT;
+    v_desc BOOLEAN := lower(p_sort_order) = 'desc';
 BEGIN
-    IF p_id IS NOT NULL THEN
-        conditions := conditions || format('b.id = %L', p_id) || ' AND ';
-    END IF;
-    IF p_title IS NOT NULL THEN
-        conditions := conditions || format('b.title ILIKE %L', '%' || p_title || '%') || ' AND ';
-    END IF;
-    IF p_author IS NOT NULL THEN
-        conditions := conditions || format('a.name ILIKE %L', '%' || p_author || '%') || ' AND ';
-    END IF;
-    IF p_genre IS NOT NULL THEN
-        conditions := conditions || format('b.genre = %L', p_genre) || ' AND ';
-    END IF;
-    IF p_year_from IS NOT NULL THEN
-        conditions := conditions || format('b.published_year >= %s', p_year_from) || ' AND ';
-    END IF;
-    IF p_year_to IS NOT NULL THEN
-        conditions := conditions || format('b.published_year <= %s', p_year_to) || ' AND ';
-    END IF;
-
-    IF conditions <> '' THEN
-        conditions := ' WHERE ' || left(conditions, length(conditions) - 5);
-    END IF;
-
-    query := base_query || conditions;
-
-    -- Validate sorting parameters against a whitelist.
-    IF p_sort_by NOT IN ('title', 'published_year', 'genre', 'isbn') THEN
-        p_sort_by := 'title';
+    -- Every sort column and direction has its own static query, so each one gets a cached plan
+    -- whose ORDER BY matches a (column, id) index. When p_after_id is set, the query seeks past
+    -- the (value, id) pair of the previous page's last row (keyset pagination) instead of using OFFSET.
+    -- Unknown sort columns fall back to title, like the whitelist of the previous implementation.
+    IF p_sort_by = 'published_year' AND NOT v_desc THEN
+        RETURN QUERY
+        SELECT * FROM filter_books(p_id, p_title, p_author, p_genre, p_year_from, p_year_to) b
+        WHERE p_after_id IS NULL OR (b.published_year, b.id) > (p_after_value::INT, p_after_id)
+        ORDER BY b.published_year, b.id
+        LIMIT p_limit OFFSET p_offset;
+    ELSIF p_sort_by = 'published_year' AND v_desc THEN
+        RETURN QUERY
+        SELECT * FROM filter_books(p_id, p_title, p_author, p_genre, p_year_from, p_year_to) b
+        WHERE p_after_id IS NULL OR (b.published_year, b.id) < (p_after_value::INT, p_after_id)
+        ORDER BY b.published_year DESC, b.id DESC
+        LIMIT p_limit OFFSET p_offset;
+    ELSIF p_sort_by = 'genre' AND NOT v_desc THEN
+        RETURN QUERY
+        SELECT * FROM filter_books(p_id, p_title, p_author, p_genre, p_year_from, p_year_to) b
+        WHERE p_after_id IS NULL OR (b.genre, b.id) > (p_after_value, p_after_id)
+        ORDER BY b.genre, b.id
+        LIMIT p_limit OFFSET p_offset;
+    ELSIF p_sort_by = 'genre' AND v_desc THEN
+        RETURN QUERY
+        SELECT * FROM filter_books(p_id, p_title, p_author, p_genre, p_year_from, p_year_to) b
+        WHERE p_after_id IS NULL OR (b.genre, b.id) < (p_after_value, p_after_id)
+        ORDER BY b.genre DESC, b.id DESC
+        LIMIT p_limit OFFSET p_offset;
+    ELSIF p_sort_by = 'isbn' AND NOT v_desc THEN
+        RETURN QUERY
+        SELECT * FROM filter_books(p_id, p_title, p_author, p_genre, p_year_from, p_year_to) b
+        WHERE p_after_id IS NULL OR (b.isbn, b.id) > (p_after_value, p_after_id)
+        ORDER BY b.isbn, b.id
+        LIMIT p_limit OFFSET p_offset;
+    ELSIF p_sort_by = 'isbn' AND v_desc THEN
+        RETURN QUERY
+        SELECT * FROM filter_books(p_id, p_title, p_author, p_genre, p_year_from, p_year_to) b
+        WHERE p_after_id IS NULL OR (b.isbn, b.id) < (p_after_value, p_after_id)
+        ORDER BY b.isbn DESC, b.id DESC
+        LIMIT p_limit OFFSET p_offset;
+    ELSIF v_desc THEN
+        RETURN QUERY
+        SELECT * FROM filter_books(p_id, p_title, p_author, p_genre, p_year_from, p_year_to) b
+        WHERE p_after_id IS NULL OR (b.title, b.id) < (p_after_value, p_after_id)
+        ORDER BY b.title DESC, b.id DESC
+        LIMIT p_limit OFFSET p_offset;
+    ELSE
+        RETURN QUERY
+        SELECT * FROM filter_books(p_id, p_title, p_author, p_genre, p_year_from, p_year_to) b
+        WHERE p_after_id IS NULL OR (b.title, b.id) > (p_after_value, p_after_id)
+        ORDER BY b.title, b.id
+        LIMIT p_limit OFFSET p_offset;
     END IF;
-    IF lower(p_sort_order) NOT IN ('asc', 'desc') THEN
-        p_sort_order := 'asc';
-    END IF;
-
-    -- Append ORDER BY, LIMIT, and OFFSET to the query.
-    query := query || format(' ORDER BY b.%I %s', p_sort_by, p_sort_order);
-    query := query || format(' LIMIT %s OFFSET %s', p_limit, p_offset);
-
-    RETURN QUERY EXECUTE query;
 END;
-$$ LANGUAGE plpgsql;
+$$ LANGUAGE plpgsql
+-- Each branch is planned for the call's arguments, so filter_books' (p_x IS NULL OR ...) predicates of
+-- unset filters fold away and the set ones can use their indexes. A generic plan, which PL/pgSQL would
+-- otherwise switch to after a few calls, has to keep every predicate and tends to scan instead.
+SET plan_cache_mode = force_custom_plan;
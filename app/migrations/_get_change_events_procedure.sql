@@ -0,0 +1,57 @@
+-- Replaces the older sequence-only signature; events are now addressed by (xid, seq).
+DROP FUNCTION IF EXISTS get_change_events_function(BIGINT, BIGINT, INT, TEXT, INT);
+DROP FUNCTION IF EXISTS get_change_events_bounds_function();
+
+-- The transaction id below which every transaction has ended (see 012_order_change_events_by_snapshot.sql).
+CREATE OR REPLACE FUNCTION change_events_horizon()
+RETURNS BIGINT AS $$
+    SELECT (pg_snapshot_xmin(pg_current_snapshot())::text)::BIGINT;
+$$ LANGUAGE sql STABLE;
+
+-- Settled change events after (p_after_xid, p_after_seq) up to and including (p_until_xid, p_until_seq),
+-- in (xid, seq) order, optionally limited to one entity type and to the events concerning one author
+-- (including books that moved away from it).
+CREATE OR REPLACE FUNCTION get_change_events_function(
+    p_after_xid BIGINT,
+    p_after_seq BIGINT,
+    p_until_xid BIGINT,
+    p_until_seq BIGINT,
+    p_limit INT,
+    p_entity TEXT DEFAULT NULL,
+    p_author_id INT DEFAULT NULL
+)
+RETURNS SETOF change_events AS $$
+    SELECT *
+    FROM change_events e
+    WHERE (e.xid, e.seq) > (p_after_xid, p_after_seq)
+      AND e.xid < change_events_horizon()
+      AND (p_until_xid IS NULL OR (e.xid, e.seq) <= (p_until_xid, p_until_seq))
+      AND (p_entity IS NULL OR e.entity = p_entity)
+      AND (p_author_id IS NULL OR e.author_id = p_author_id OR e.previous_author_id = p_author_id)
+    ORDER BY e.xid, e.seq
+    LIMIT p_limit;
+$$ LANGUAGE sql STABLE;
+
+-- The newest settled event, the newest pruned one (NULLs when there is none) and whether committed events
+-- are waiting for older transactions to end before they can be delivered.
+CREATE OR REPLACE FUNCTION get_change_events_bounds_function()
+RETURNS TABLE(last_xid BIGINT, last_seq BIGINT, pruned_xid BIGINT, pruned_seq BIGINT, held_back BOOLEAN) AS $$
+    WITH horizon AS (
+        SELECT change_events_horizon() AS xid
+    ),
+    last_settled AS (
+        SELECT e.xid, e.seq
+        FROM change_events e, horizon h
+        WHERE e.xid < h.xid
+        ORDER BY e.xid DESC, e.seq DESC
+        LIMIT 1
+    )
+    SELECT
+        (SELECT xid FROM last_settled),
+        (SELECT seq FROM last_settled),
+        p.xid,
+        p.seq,
+        EXISTS (SELECT 1 FROM change_events e, horizon h WHERE e.xid >= h.xid)
+    FROM (SELECT 1) one
+    LEFT JOIN change_events_pruned p ON TRUE;
+$$ LANGUAGE sql STABLE;
@@ -0,0 +1,5 @@
+-- A job is only visible to the user who submitted it.
+CREATE OR REPLACE FUNCTION get_job_function(p_id UUID, p_user_id INT)
+RETURNS SETOF jobs AS $$
+    SELECT * FROM jobs WHERE jobs.id = p_id AND jobs.user_id = p_user_id;
+$$ LANGUAGE sql STABLE;
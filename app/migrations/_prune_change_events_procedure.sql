@@ -0,0 +1,36 @@
+-- Delete events older than the retention period and remember the newest position deleted; the newest event
+-- is always kept. Returns the number of deleted events.
+CREATE OR REPLACE FUNCTION prune_change_events_function(p_retention_seconds DOUBLE PRECISION)
+RETURNS BIGINT AS $$
+DECLARE
+    v_deleted BIGINT;
+    v_xid BIGINT;
+    v_seq BIGINT;
+BEGIN
+    WITH deleted AS (
+        DELETE FROM change_events e
+        WHERE e.changed_at < CURRENT_TIMESTAMP - make_interval(secs => p_retention_seconds)
+          AND e.xid < change_events_horizon()
+          AND (e.xid, e.seq) < (
+              SELECT latest.xid, latest.seq FROM change_events latest ORDER BY latest.xid DESC, latest.seq DESC LIMIT 1
+          )
+        RETURNING e.xid, e.seq
+    ),
+    newest AS (
+        SELECT d.xid, d.seq FROM deleted d ORDER BY d.xid DESC, d.seq DESC LIMIT 1
+    )
+    SELECT (SELECT count(*) FROM deleted), newest.xid, newest.seq
+    INTO v_deleted, v_xid, v_seq
+    FROM (SELECT 1) one
+    LEFT JOIN newest ON TRUE;
+
+    IF v_xid IS NOT NULL THEN
+        INSERT INTO change_events_pruned AS p (id, xid, seq)
+        VALUES (TRUE, v_xid, v_seq)
+        ON CONFLICT (id) DO UPDATE
+        SET xid = EXCLUDED.xid, seq = EXCLUDED.seq
+        WHERE (p.xid, p.seq) < (EXCLUDED.xid, EXCLUDED.seq);
+    END IF;
+    RETURN v_deleted;
+END;
+$$ LANGUAGE plpgsql;
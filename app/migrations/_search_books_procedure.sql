@@ -0,0 +1,50 @@
+CREATE OR REPLACE FUNCTION search_books_function(
+    p_query TEXT,
+    p_prefix BOOLEAN DEFAULT FALSE,
+    p_limit INT DEFAULT 10,
+    p_offset INT DEFAULT 0
+)
+RETURNS TABLE(
+    id INT,
+    title VARCHAR(255),
+    isbn VARCHAR(13),
+    published_year INT,
+    genre VARCHAR(50),
+    author_id INT,
+    author_name VARCHAR(255),
+    rank REAL
+) AS $$
+DECLARE
+    v_query tsquery;
+BEGIN
+    IF p_prefix THEN
+        -- Typeahead: every word has to match, and the words may be incomplete ("tolk lor" -> tolk:* & lor:*).
+        SELECT to_tsquery('simple', string_agg(word || ':*', ' & '))
+        INTO v_query
+        FROM regexp_split_to_table(lower(p_query), '[^[:alnum:]]+') AS word
+        WHERE word <> '';
+    ELSE
+        v_query := websearch_to_tsquery('simple', p_query);
+    END IF;
+
+    IF v_query IS NULL THEN
+        RETURN;
+    END IF;
+
+    RETURN QUERY
+    SELECT
+        b.id,
+        b.title,
+        b.isbn,
+        b.published_year,
+        b.genre,
+        b.author_id,
+        a.name AS author_name,
+        ts_rank_cd(b.search_vector, v_query) AS rank
+    FROM books b
+    JOIN authors a ON b.author_id = a.id
+    WHERE b.search_vector @@ v_query
+    ORDER BY 8 DESC, b.id
+    LIMIT p_limit OFFSET p_offset;
+END;
+$$ LANGUAGE plpgsql;
@@ -27,8 +27,11 @@ BEGIN
 
     -- Check if author exists and get author_id if author_name is provided
     IF p_author_name IS NOT NULL THEN
-        v_query := format('SELECT authors.id FROM authors WHERE authors.name ILIKE %L', p_author_name);
-        EXECUTE v_query INTO v_author_id;
+        SELECT authors.id INTO v_author_id
+        FROM authors
+        WHERE lower(authors.name) = lower(p_author_name)
+        ORDER BY authors.id
+        LIMIT 1;
 
         IF v_author_id IS NULL THEN
             RAISE EXCEPTION 'Author "%" does not exist', p_author_name;
@@ -0,0 +1,42 @@
+-- Update a batch of books with a single set-based statement. NULL leaves a column unchanged.
+-- The rows are locked in id order first, so concurrent batches touching the same books cannot deadlock.
+-- Ids that do not exist are simply not returned.
+CREATE OR REPLACE FUNCTION update_books_batch_function(
+    p_ids INT[],
+    p_titles TEXT[],
+    p_isbns TEXT[],
+    p_published_years INT[],
+    p_genres TEXT[],
+    p_author_ids INT[]
+)
+RETURNS TABLE(
+    id INT,
+    title VARCHAR(255),
+    isbn VARCHAR(13),
+    published_year INT,
+    genre VARCHAR(50),
+    author_id INT,
+    author_name VARCHAR(255)
+) AS $$
+    WITH changes AS (
+        SELECT *
+        FROM unnest(p_ids, p_titles, p_isbns, p_published_years, p_genres, p_author_ids)
+            AS c(id, title, isbn, published_year, genre, author_id)
+    ), locked AS (
+        SELECT b.id FROM books b WHERE b.id = ANY(p_ids) ORDER BY b.id FOR UPDATE
+    ), updated AS (
+        UPDATE books b
+        SET title = coalesce(c.title, b.title),
+            isbn = coalesce(c.isbn, b.isbn),
+            published_year = coalesce(c.published_year, b.published_year),
+            genre = coalesce(c.genre, b.genre),
+            author_id = coalesce(c.author_id, b.author_id)
+        FROM changes c
+        JOIN locked l ON l.id = c.id
+        WHERE b.id = c.id
+        RETURNING b.id, b.title, b.isbn, b.published_year, b.genre, b.author_id
+    )
+    SELECT u.id, u.title, u.isbn, u.published_year, u.genre, u.author_id, a.name AS author_name
+    FROM updated u
+    JOIN authors a ON a.id = u.author_id;
+$$ LANGUAGE sql;
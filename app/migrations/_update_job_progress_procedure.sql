@@ -0,0 +1,8 @@
+-- Record progress of a running job and return whether its cancellation was requested.
+CREATE OR REPLACE FUNCTION update_job_progress_function(p_id UUID, p_processed_rows BIGINT, p_failed_rows BIGINT)
+RETURNS TABLE(cancel_requested BOOLEAN) AS $$
+    UPDATE jobs
+    SET processed_rows = p_processed_rows, failed_rows = p_failed_rows, heartbeat_at = CURRENT_TIMESTAMP
+    WHERE jobs.id = p_id
+    RETURNING jobs.cancel_requested;
+$$ LANGUAGE sql;
@@ -0,0 +1,15 @@
+CREATE OR REPLACE FUNCTION update_user_password_function(
+    p_email TEXT,
+    p_hashed_password TEXT
+)
+RETURNS VOID AS $$
+BEGIN
+    IF p_hashed_password IS NULL OR p_hashed_password = '' THEN
+        RAISE EXCEPTION 'Password cannot be empty';
+    END IF;
+
+    UPDATE users
+    SET hashed_password = p_hashed_password
+    WHERE users.email = p_email;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,37 @@
+-- Insert or update a batch of books keyed on ISBN with a single set-based statement.
+-- Existing rows are only rewritten when one of their columns actually changes, so re-applying an
+-- unchanged feed writes nothing; unchanged rows are not returned. `inserted` tells new rows
+-- (xmax = 0) from updated ones.
+CREATE OR REPLACE FUNCTION upsert_books_batch_function(
+    p_titles TEXT[],
+    p_isbns TEXT[],
+    p_published_years INT[],
+    p_genres TEXT[],
+    p_author_ids INT[]
+)
+RETURNS TABLE(
+    id INT,
+    title VARCHAR(255),
+    isbn VARCHAR(13),
+    published_year INT,
+    genre VARCHAR(50),
+    author_id INT,
+    author_name VARCHAR(255),
+    inserted BOOLEAN
+) AS $$
+    WITH upserted AS (
+        INSERT INTO books AS b (title, isbn, published_year, genre, author_id)
+        SELECT * FROM unnest(p_titles, p_isbns, p_published_years, p_genres, p_author_ids)
+        ON CONFLICT (isbn) DO UPDATE
+        SET title = EXCLUDED.title,
+            published_year = EXCLUDED.published_year,
+            genre = EXCLUDED.genre,
+            author_id = EXCLUDED.author_id
+        WHERE (b.title, b.published_year, b.genre, b.author_id)
+            IS DISTINCT FROM (EXCLUDED.title, EXCLUDED.published_year, EXCLUDED.genre, EXCLUDED.author_id)
+        RETURNING b.id, b.title, b.isbn, b.published_year, b.genre, b.author_id, (b.xmax = 0) AS inserted
+    )
+    SELECT u.id, u.title, u.isbn, u.published_year, u.genre, u.author_id, a.name AS author_name, u.inserted
+    FROM upserted u
+    JOIN authors a ON a.id = u.author_id;
+$$ LANGUAGE sql;
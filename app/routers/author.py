@@ -1,36 +1,86 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request
 from fastapi.params import Depends
+from pydantic import TypeAdapter
 
+from app.core.http_cache import response_cache
 from app.crud.author import (
     create_author_crud,
     delete_author_crud,
+    get_authors_by_names_crud,
     get_authors_crud,
     update_author_crud,
 )
+from app.crud.book import get_author_books_crud
 from app.crud.user import get_current_user
-from app.schemas.author import AuthorCreate, AuthorDetail
+from app.schemas.author import AuthorCreate, AuthorDetail, AuthorLookup
+from app.schemas.book import BookDetail
 
 router = APIRouter(prefix="/authors")
 
+author_list_adapter = TypeAdapter(list[AuthorDetail])
+author_detail_adapter = TypeAdapter(AuthorDetail)
+book_list_adapter = TypeAdapter(list[BookDetail])
+
 
 @router.get("/", response_model=list[AuthorDetail])
-async def list_authors():
-    try:
-        authors = await get_authors_crud()
-        return authors
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Error retrieving authors: {e}")
+async def list_authors(request: Request):
+    async def load_authors():
+        try:
+            return await get_authors_crud(), {}
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Error retrieving authors: {e}")
+
+    return await response_cache.respond(request, load_authors, author_list_adapter)
 
 
 @router.get("/{author_id}/", response_model=AuthorDetail)
-async def get_author(author_id: int):
+async def get_author(request: Request, author_id: int):
+    async def load_author():
+        try:
+            author = await get_authors_crud(author_id=author_id)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Error retrieving author: {e}")
+        if not author:
+            raise HTTPException(status_code=404, detail="Author not found.")
+        return author[0], {}
+
+    return await response_cache.respond(request, load_author, author_detail_adapter)
+
+
+@router.get("/{author_id}/books/", response_model=list[BookDetail])
+async def list_author_books(
+    request: Request,
+    author_id: int,
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of records to return"),
+    offset: int = Query(0, ge=0, description="Offset for pagination"),
+):
+    """Retrieve an author's books ordered by title, with pagination."""
+
+    async def load_books():
+        try:
+            books = await get_author_books_crud(author_id, limit=limit, offset=offset)
+            if not books and not await get_authors_crud(author_id=author_id):
+                raise HTTPException(status_code=404, detail="Author not found.")
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Error retrieving books: {e}")
+        return books, {}
+
+    params = {"limit": limit, "offset": offset}
+    return await response_cache.respond(request, load_books, book_list_adapter, params=params)
+
+
+@router.post("/lookup/", response_model=list[AuthorDetail])
+async def lookup_authors(lookup: AuthorLookup):
+    """
+    Resolve many author names at once (case-insensitive) with a single query.
+    Authors are returned in the order of the given names; unknown names are left out.
+    """
     try:
-        author = await get_authors_crud(author_id=author_id)
+        return await get_authors_by_names_crud(lookup.names)
     except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Error retrieving author: {e}")
-    if not author:
-        raise HTTPException(status_code=404, detail="Author not found.")
-    return author[0]
+        raise HTTPException(status_code=400, detail=f"Error looking up authors: {e}")
 
 
 @router.post("/", status_code=201, response_model=AuthorDetail)
@@ -1,26 +1,60 @@
-import csv
-import io
-import json
 from typing import Optional
 
-from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile
 from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import TypeAdapter
 
+from app.core.book_import import get_import_format, iter_upload_chunks, run_book_import
+from app.core.config import settings
+from app.core.cursor import next_book_cursor
+from app.core.export import EXPORT_MEDIA_TYPES, export_chunks
+from app.core.http_cache import response_cache
 from app.crud.author import get_authors_crud
 from app.crud.book import (
     create_book_crud,
     delete_book_crud,
+    get_book_facets_crud,
+    get_books_by_ids_crud,
     get_books_crud,
+    get_books_keyset_crud,
+    iter_books_crud,
+    search_books_crud,
     update_book_crud,
 )
+from app.crud.book_bulk import (
+    bulk_create_books_crud,
+    bulk_delete_books_crud,
+    bulk_update_books_crud,
+)
 from app.crud.user import get_current_user
-from app.schemas.book import BookCreate, BookDetail, BookQueryParams, BookUpdate
+from app.schemas.book import (
+    BookBulkCreate,
+    BookBulkDelete,
+    BookBulkResult,
+    BookBulkUpdate,
+    BookCreate,
+    BookDetail,
+    BookFacetParams,
+    BookFacets,
+    BookImportReport,
+    BookQueryParams,
+    BookSearchParams,
+    BookSearchResult,
+    BookUpdate,
+    BulkMode,
+    ImportMode,
+)
 
 router = APIRouter(prefix="/books")
 
+book_list_adapter = TypeAdapter(list[BookDetail])
+book_detail_adapter = TypeAdapter(BookDetail)
+book_facets_adapter = TypeAdapter(BookFacets)
+
 
 @router.get("/", response_model=list[BookDetail])
 async def list_books(
+    request: Request,
     query: BookQueryParams = Depends(),
     # TODO: add after implementing authentication
     # current_user: dict = Depends(get_current_user)  # Only authenticated users can access
@@ -28,22 +62,79 @@ async def list_books(
     """
     Retrieve a list of books with filtering, sorting, and pagination.
     The query parameters are validated and parsed using the BookQueryParams model.
+    When more rows follow, the cursor of the next page is returned in the X-Next-Cursor header.
+    Responses are cached until the catalog changes and carry an ETag for conditional requests.
+    """
+
+    async def load_books():
+        try:
+            filters = dict(
+                title=query.title,
+                author=query.author,
+                genre=query.genre,
+                year_from=query.year_from,
+                year_to=query.year_to,
+                sort_by=query.sort_by,
+                sort_order=query.sort_order,
+                limit=query.limit,
+            )
+            if query.cursor is not None:
+                books = await get_books_keyset_crud(query.cursor, **filters)
+            else:
+                books = await get_books_crud(offset=query.offset, **filters)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Error retrieving books: {e}")
+        next_cursor = next_book_cursor(books, query.sort_by, query.sort_order, query.limit)
+        return books, {"X-Next-Cursor": next_cursor} if next_cursor is not None else {}
+
+    return await response_cache.respond(request, load_books, book_list_adapter, params=query.model_dump())
+
+
+@router.get("/search/", response_model=list[BookSearchResult])
+async def search_books(query: BookSearchParams = Depends()):
+    """
+    Search books by title and author name, ordered by relevance.
+    Set `prefix` for typeahead suggestions while the user is still typing.
     """
     try:
-        books = await get_books_crud(
-            title=query.title,
-            author=query.author,
-            genre=query.genre,
-            year_from=query.year_from,
-            year_to=query.year_to,
-            sort_by=query.sort_by,
-            sort_order=query.sort_order,
-            limit=query.limit,
-            offset=query.offset,
-        )
-        return books
+        return await search_books_crud(query.q, prefix=query.prefix, limit=query.limit, offset=query.offset)
     except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Error retrieving books: {e}")
+        raise HTTPException(status_code=400, detail=f"Error searching books: {e}")
+
+
+@router.get("/batch/", response_model=list[BookDetail])
+async def get_books_batch(
+    request: Request,
+    ids: list[int] = Query(..., min_length=1, max_length=settings.batch_max_ids, description="Book IDs to fetch"),
+):
+    """
+    Retrieve many books by ID with a single query, e.g. `?ids=3&ids=1&ids=2`.
+    Books are returned in the requested order; unknown IDs are left out.
+    """
+
+    async def load_books():
+        try:
+            return await get_books_by_ids_crud(ids), {}
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Error retrieving books: {e}")
+
+    return await response_cache.respond(request, load_books, book_list_adapter, params={"ids": ids})
+
+
+@router.get("/facets/", response_model=BookFacets)
+async def get_book_facets(request: Request, query: BookFacetParams = Depends()):
+    """
+    Count the books matching the listing filters: the total, per genre, per published year
+    and for the authors with the most books. Responses are cached until the catalog changes.
+    """
+
+    async def load_facets():
+        try:
+            return await get_book_facets_crud(**query.model_dump()), {}
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Error counting books: {e}")
+
+    return await response_cache.respond(request, load_facets, book_facets_adapter, params=query.model_dump())
 
 
 @router.post("/", response_model=BookDetail)
@@ -55,82 +146,120 @@ async def create_book(book: BookCreate, current_user: dict = Depends(get_current
     return new_book
 
 
-@router.post("/import/", response_model=list[BookDetail])
-async def import_books(file: UploadFile = File(...), current_user: dict = Depends(get_current_user)):
+@router.post("/import/", response_model=BookImportReport)
+async def import_books(
+    file: UploadFile = File(...),
+    mode: ImportMode = Query(
+        "insert", description="'insert': existing ISBNs fail; 'upsert': existing ISBNs are updated when changed"
+    ),
+    current_user: dict = Depends(get_current_user),
+):
     """
-    Import books from a JSON or CSV file.
-    JSON file must contain a list of objects matching the BookCreate schema.
+    Import books from a JSON, NDJSON or CSV file.
+    JSON file must contain a list of objects matching the BookCreate schema; NDJSON has one such object per line.
     CSV file must have a header with columns: title, isbn, published_year, genre, author_name.
+    The upload is processed incrementally in batches; the response reports failures per row.
+    In upsert mode books are matched on ISBN and only rewritten when their data changed.
     """
-    imported_books = []
-
-    content = await file.read()
-    if file.filename.lower().endswith(".json"):
-        try:
-            data = json.loads(content.decode("utf-8"))
-            if not isinstance(data, list):
-                raise HTTPException(status_code=400, detail="JSON file must contain a list of books.")
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Error parsing JSON file: {e}")
-    elif file.filename.lower().endswith(".csv"):
-        try:
-            decoded = content.decode("utf-8").splitlines()
-            reader = csv.DictReader(decoded)
-            data = list(reader)
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Error parsing CSV file: {e}")
-    else:
-        raise HTTPException(status_code=400, detail="Unsupported file type. Only JSON and CSV are accepted.")
+    import_format = get_import_format(file.filename)
+    if import_format is None:
+        raise HTTPException(status_code=400, detail="Unsupported file type. Only JSON, NDJSON and CSV are accepted.")
 
-    for record in data:
-        try:
-            book_data = BookCreate(**record)
-            book_record = await create_book_crud(book_data)
-            imported_books.append(book_record)
-        except Exception as e:
-            print(f"Failed to import record: {record} \nError: {e}")
-            continue
-
-    return JSONResponse(status_code=200, content=imported_books)
+    return await run_book_import(
+        iter_upload_chunks(file, settings.import_read_chunk_size),
+        import_format,
+        batch_size=settings.import_batch_size,
+        max_reported_errors=settings.import_max_reported_errors,
+        mode=mode,
+    )
 
 
 @router.get(
     "/export/",
     responses={
         200: {
-            "description": "Successful file export. Returns a CSV or JSON file.",
-            "content": {"text/csv": {}, "application/json": {}},
+            "description": "Successful file export. Streams the whole catalog as a CSV, JSON or NDJSON file.",
+            "content": {media_type: {} for media_type in EXPORT_MEDIA_TYPES.values()},
         },
-        400: {"description": "Invalid file extension. Use 'json' or 'csv'."},
+        400: {"description": "Invalid file extension. Use 'json', 'ndjson' or 'csv'."},
     },
 )
 async def export_books(
-    export_file_ext: Optional[str] = Query("json", pattern="^(json|csv)$"),
+    export_file_ext: Optional[str] = Query("json", pattern="^(json|ndjson|csv)$"),
 ):
     """
-    Export books in JSON or CSV format.
+    Export all books in JSON, NDJSON or CSV format.
+    Rows are read through a server-side cursor and written to the client batch by batch,
+    so memory use does not depend on the size of the catalog.
     """
-    books = await get_books_crud()
+    if export_file_ext not in EXPORT_MEDIA_TYPES:
+        return JSONResponse(
+            status_code=400, content={"message": "Invalid file extension. Use 'json', 'ndjson' or 'csv'."}
+        )
 
-    if export_file_ext == "csv":
-        output = io.StringIO()
-        fieldnames = ["id", "title", "isbn", "published_year", "genre", "author_id", "author_name"]
-        writer = csv.DictWriter(output, fieldnames=fieldnames)
-        writer.writeheader()
+    batches = iter_books_crud(settings.export_fetch_batch_size)
+    headers = {"Content-Disposition": f"attachment; filename=books.{export_file_ext}"}
+    return StreamingResponse(
+        export_chunks(batches, export_file_ext),
+        media_type=EXPORT_MEDIA_TYPES[export_file_ext],
+        headers=headers,
+    )
 
-        for book in books:
-            writer.writerow(book)
-        output.seek(0)
-        headers = {"Content-Disposition": "attachment; filename=books.csv"}
-        return StreamingResponse(output, media_type="text/csv", headers=headers)
-    elif export_file_ext == "json":
-        output = io.StringIO()
-        json.dump(books, output)
-        output.seek(0)
-        headers = {"Content-Disposition": "attachment; filename=books.json"}
-        return StreamingResponse(output, media_type="application/json", headers=headers)
 
-    return JSONResponse(status_code=400, content={"message": "Invalid file extension. Use 'json' or 'csv'."})
+BULK_RESPONSES = {
+    409: {"model": BookBulkResult, "description": "An item failed in atomic mode; nothing was applied."},
+}
+BULK_MODE_QUERY = Query(
+    "atomic",
+    description="'atomic': apply all items or none; 'best_effort': apply the valid items and report the others",
+)
+
+
+def bulk_response(mode: str, results: list[dict], committed: bool) -> JSONResponse:
+    failed = sum(1 for result in results if result["status"] == "failed")
+    report = BookBulkResult(
+        mode=mode,
+        committed=committed,
+        succeeded=sum(1 for result in results if result["status"] not in ("failed", "skipped")),
+        failed=failed,
+        results=results,
+    )
+    status_code = 409 if mode == "atomic" and failed else 200
+    return JSONResponse(status_code=status_code, content=report.model_dump(mode="json"))
+
+
+@router.post("/bulk/", response_model=BookBulkResult, responses=BULK_RESPONSES)
+async def bulk_create_books(
+    bulk: BookBulkCreate, mode: BulkMode = BULK_MODE_QUERY, current_user: dict = Depends(get_current_user)
+):
+    """
+    Create up to BULK_MAX_ITEMS books in one transaction. Results are reported per item, in request order.
+    """
+    results, committed = await bulk_create_books_crud(bulk.items, atomic=mode == "atomic")
+    return bulk_response(mode, results, committed)
+
+
+@router.patch("/bulk/", response_model=BookBulkResult, responses=BULK_RESPONSES)
+async def bulk_update_books(
+    bulk: BookBulkUpdate, mode: BulkMode = BULK_MODE_QUERY, current_user: dict = Depends(get_current_user)
+):
+    """
+    Update up to BULK_MAX_ITEMS books in one transaction; fields left out of an item are not changed.
+    Results are reported per item, in request order.
+    """
+    results, committed = await bulk_update_books_crud(bulk.items, atomic=mode == "atomic")
+    return bulk_response(mode, results, committed)
+
+
+@router.delete("/bulk/", response_model=BookBulkResult, responses=BULK_RESPONSES)
+async def bulk_delete_books(
+    bulk: BookBulkDelete, mode: BulkMode = BULK_MODE_QUERY, current_user: dict = Depends(get_current_user)
+):
+    """
+    Delete up to BULK_MAX_ITEMS books in one transaction. Results are reported per item, in request order.
+    """
+    results, committed = await bulk_delete_books_crud(bulk.ids, atomic=mode == "atomic")
+    return bulk_response(mode, results, committed)
 
 
 @router.put("/{book_id}/", response_model=BookDetail)
@@ -161,11 +290,14 @@ async def delete_book(book_id: int, current_user: dict = Depends(get_current_use
 
 
 @router.get("/{book_id}/", response_model=BookDetail)
-async def get_book(book_id: int):
-    try:
-        book = await get_books_crud(book_id)
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Error retrieving book: {e}")
-    if not book:
-        raise HTTPException(status_code=404, detail="Book not found.")
-    return book[0]
+async def get_book(request: Request, book_id: int):
+    async def load_book():
+        try:
+            book = await get_books_crud(book_id)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Error retrieving book: {e}")
+        if not book:
+            raise HTTPException(status_code=404, detail="Book not found.")
+        return book[0], {}
+
+    return await response_cache.respond(request, load_book, book_detail_adapter)
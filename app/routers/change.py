@@ -0,0 +1,53 @@
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from app.core.changes import (
+    ChangeFilter,
+    TooManySubscribers,
+    change_feed,
+    parse_position,
+)
+
+router = APIRouter(prefix="/changes")
+
+
+@router.get(
+    "/stream/",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "description": "Server-Sent Events: one event per changed book or author, named after the entity. "
+            "The event id is the change's position, an opaque resume token.",
+            "content": {"text/event-stream": {}},
+        },
+        503: {"description": "Too many clients are connected."},
+    },
+)
+async def stream_changes(
+    entity: Optional[Literal["book", "author"]] = Query(None, description="Only changes of this entity type"),
+    author_id: Optional[int] = Query(None, description="Only changes of this author and of its books"),
+    after: Optional[str] = Query(None, description="Resume after the event with this id"),
+    last_event_id: Optional[str] = Header(None, description="Set by EventSource clients when reconnecting"),
+):
+    """
+    Stream book and author changes as they are committed, instead of polling the list endpoints.
+    Each event carries its sequence number, entity, operation (insert/update/delete), entity id and author id;
+    fetch the entity itself if its data is needed. Reconnecting with `Last-Event-ID` (or `after`) first
+    replays the changes that were missed, so no change is lost between two connections.
+    """
+    resume_token = last_event_id if last_event_id is not None else after
+    try:
+        resume_after = None if resume_token is None else parse_position(resume_token)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        change_feed.check_capacity()
+    except TooManySubscribers:
+        raise HTTPException(status_code=503, detail="Too many change stream clients.", headers={"Retry-After": "5"})
+    return StreamingResponse(
+        change_feed.stream(ChangeFilter(entity=entity, author_id=author_id), resume_after),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,27 @@
+import asyncio
+
+from fastapi import APIRouter
+from fastapi.responses import ORJSONResponse
+
+from app.core.config import settings
+from app.core.database import get_connection
+
+router = APIRouter(prefix="/health")
+
+
+@router.get("/live", include_in_schema=False)
+async def live():
+    """Liveness: the worker's event loop answers. Never touches the database."""
+    return {"status": "ok"}
+
+
+@router.get("/ready", include_in_schema=False)
+async def ready():
+    """Readiness: the worker can get a connection to the primary and run a query within the check timeout."""
+    try:
+        async with asyncio.timeout(settings.health_check_timeout):
+            async with get_connection() as conn:
+                await conn.fetchval("SELECT 1")
+    except Exception as e:
+        return ORJSONResponse(status_code=503, content={"status": "unavailable", "detail": str(e) or type(e).__name__})
+    return {"status": "ok"}
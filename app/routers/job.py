@@ -0,0 +1,117 @@
+import uuid
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from fastapi.responses import FileResponse, JSONResponse
+
+from app.core.book_import import get_import_format, iter_upload_chunks
+from app.core.config import settings
+from app.core.export import EXPORT_MEDIA_TYPES
+from app.core.jobs import job_workers, save_upload
+from app.crud.job import cancel_job_crud, create_job_crud, get_job_crud
+from app.crud.user import get_current_user
+from app.schemas.book import ImportMode
+from app.schemas.job import JobDetail
+
+router = APIRouter(prefix="/jobs")
+
+
+async def get_own_job(job_id: UUID, current_user: dict = Depends(get_current_user)) -> dict:
+    job = await get_job_crud(job_id, current_user["id"])
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.post("/import/", response_model=JobDetail, status_code=status.HTTP_202_ACCEPTED)
+async def submit_import_job(
+    file: UploadFile = File(...),
+    mode: ImportMode = Query(
+        "insert", description="'insert': existing ISBNs fail; 'upsert': existing ISBNs are updated when changed"
+    ),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Queue an import of books from a JSON, NDJSON or CSV file (same formats as POST /books/import/).
+    The upload is stored and the job id returned right away; poll GET /jobs/{id}/ for progress and
+    fetch the import report from GET /jobs/{id}/result/.
+    """
+    import_format = get_import_format(file.filename)
+    if import_format is None:
+        raise HTTPException(status_code=400, detail="Unsupported file type. Only JSON, NDJSON and CSV are accepted.")
+
+    job_id = uuid.uuid4()
+    params = {"format": import_format, "mode": mode, "filename": file.filename}
+    try:
+        await save_upload(iter_upload_chunks(file, settings.import_read_chunk_size), job_workers.job_directory(job_id))
+        job = await create_job_crud(job_id, "import", current_user["id"], params, job_workers.node_id)
+    except BaseException:
+        # Without a job row the cleanup never finds this directory; remove the upload right away.
+        await job_workers.remove_job_directory(job_id)
+        raise
+    job_workers.notify()
+    return job
+
+
+@router.post("/export/", response_model=JobDetail, status_code=status.HTTP_202_ACCEPTED)
+async def submit_export_job(
+    export_file_ext: Optional[str] = Query("json", pattern="^(json|ndjson|csv)$"),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Queue an export of all books in JSON, NDJSON or CSV format.
+    Download the file from GET /jobs/{id}/result/ once the job succeeded.
+    """
+    params = {"format": export_file_ext}
+    job = await create_job_crud(uuid.uuid4(), "export", current_user["id"], params, job_workers.node_id)
+    job_workers.notify()
+    return job
+
+
+@router.get("/{job_id}/", response_model=JobDetail)
+async def get_job(job: dict = Depends(get_own_job)):
+    return job
+
+
+@router.get(
+    "/{job_id}/result/",
+    responses={
+        200: {
+            "description": "The import report (JSON) or the exported file.",
+            "content": {media_type: {} for media_type in EXPORT_MEDIA_TYPES.values()},
+        },
+        409: {"description": "The job has no result (yet)."},
+        421: {"description": "The result file is stored on another node (see `node_id`)."},
+    },
+)
+async def get_job_result(job: dict = Depends(get_own_job)):
+    """
+    Return the result of a finished job: the import report, or the exported file as an attachment.
+    Results are deleted together with the job once its retention period is over.
+    """
+    if job["result_file"] is not None:
+        if job["node_id"] not in (None, job_workers.node_id):
+            raise HTTPException(
+                status_code=421, detail=f"The result file is stored on node '{job['node_id']}'; request it there."
+            )
+        path = job_workers.job_directory(job["id"]) / job["result_file"]
+        if not path.is_file():
+            raise HTTPException(status_code=410, detail="The result file is no longer available.")
+        export_format = job["params"]["format"]
+        return FileResponse(path, media_type=EXPORT_MEDIA_TYPES[export_format], filename=job["result_file"])
+    if job["result"] is not None:
+        return JSONResponse(content=job["result"])
+    raise HTTPException(status_code=409, detail=f"Job is {job['status']} and has no result.")
+
+
+@router.post("/{job_id}/cancel/", response_model=JobDetail)
+async def cancel_job(job_id: UUID, current_user: dict = Depends(get_current_user)):
+    """
+    Cancel a job. A queued job is cancelled immediately; a running job stops after its current batch.
+    Finished jobs are returned unchanged.
+    """
+    job = await cancel_job_crud(job_id, current_user["id"])
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from app.core.admission import admission_controller
+from app.core.changes import change_feed
+from app.core.database import pool_stats, replica_pool_stats
+from app.core.http_cache import response_cache
+from app.core.jobs import job_workers
+from app.core.metrics import metrics_registry, register_stats_collector
+from app.core.statements import statements
+from app.crud.user import user_cache
+
+router = APIRouter()
+
+register_stats_collector("db_pool", pool_stats, "Connection pool")
+register_stats_collector("db_replica_pool", replica_pool_stats, "Replica connection pool")
+register_stats_collector("db_prepared_statements", statements.stats, "Prepared statement registry")
+register_stats_collector("user_cache", user_cache.stats, "Resolved user cache")
+register_stats_collector("response_cache", response_cache.backend.stats, "HTTP response cache")
+register_stats_collector("admission", admission_controller.stats, "Admission control lanes")
+register_stats_collector("change_feed", change_feed.stats, "Change feed")
+register_stats_collector("job_workers", job_workers.stats, "Background job workers")
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics in the text exposition format."""
+    return Response(content=generate_latest(metrics_registry()), media_type=CONTENT_TYPE_LATEST)
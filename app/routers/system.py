@@ -0,0 +1,27 @@
+from fastapi import APIRouter
+
+from app.core.admission import admission_controller
+from app.core.changes import change_feed
+from app.core.http_cache import response_cache
+from app.core.jobs import job_workers
+from app.core.security import password_hashing
+from app.core.statements import statements
+from app.crud.user import user_cache
+
+router = APIRouter()
+
+
+@router.get("/stats/")
+async def get_stats():
+    """
+    Runtime counters of the in-process caches, useful for checking cache effectiveness.
+    """
+    return {
+        "statements": statements.stats(),
+        "user_cache": user_cache.stats(),
+        "password_hashing": password_hashing.stats(),
+        "response_cache": response_cache.backend.stats(),
+        "job_workers": job_workers.stats(),
+        "change_feed": change_feed.stats(),
+        "admission": {name: lane.stats() for name, lane in admission_controller.lanes.items()},
+    }
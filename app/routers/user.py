@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends
 
 from app.crud.user import create_user_crud, get_current_user, verify_user_and_create_jwt
 from app.schemas.author import TokenDetail
@@ -14,9 +14,6 @@ async def register(user: UserCreate):
 
 @router.post("/login/", response_model=TokenDetail)
 async def login(login_data: UserLogin):
-    user = get_current_user()
-    if not user:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Incorrect email or password")
     access_token = await verify_user_and_create_jwt(login_data)
     return {"access_token": access_token, "token_type": "bearer"}
 
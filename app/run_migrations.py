@@ -1,27 +1,52 @@
+import argparse
 import asyncio
-import glob
-import os
+import logging
+import sys
+from pathlib import Path
 
 import asyncpg
 from core.config import settings
+from core.migrations import MigrationError, migrate, migration_status
 
+MIGRATIONS_DIR = Path(__file__).parent / "migrations"
+
+logger = logging.getLogger("migrations")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Apply pending database migrations.")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--status", action="store_true", help="List every migration with its state and exit")
+    mode.add_argument("--dry-run", action="store_true", help="List the migrations that would be applied and exit")
+    parser.add_argument(
+        "--lock-timeout", type=float, default=None, help="Seconds to wait for another instance's migrations"
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
 
-async def run_migrations():
-    conn = await asyncpg.connect(settings.db_url)
     try:
-        migration_files = sorted(glob.glob(os.path.join("", "migrations", "*.sql")))
-        for migration in migration_files:
-            with open(migration, "r") as file:
-                migration_sql = file.read()
-                await conn.execute(migration_sql)
-                # TODO: Log the migration in the database.(PROLLY ADD TO README)
-                # TODO: use logger instead of print
-                print(f"✅ Executed migration: {migration}")
-    except Exception as e:
-        print("❌ Error running migrations:", e)
-    finally:
-        await conn.close()
+        if args.status or args.dry_run:
+            states = asyncio.run(migration_status(settings.db_url, MIGRATIONS_DIR))
+            for state in states:
+                if args.status or state.status != "applied":
+                    print(f"{state.status:<8} {state.migration.filename}")
+            if args.dry_run and all(state.status == "applied" for state in states):
+                logger.info("Database is up to date")
+            return 0
+
+        applied = asyncio.run(migrate(settings.db_url, MIGRATIONS_DIR, lock_timeout=args.lock_timeout))
+        if applied:
+            logger.info("Applied %s migration(s)", len(applied))
+        else:
+            logger.info("Database is up to date")
+        return 0
+    except MigrationError as e:
+        logger.error("Migration failed: %s", e)
+        return 1
+    except (OSError, asyncpg.PostgresError) as e:
+        logger.error("Could not connect to the database: %s", e)
+        return 1
 
 
 if __name__ == "__main__":
-    asyncio.run(run_migrations())
+    sys.exit(main())
@@ -1,4 +1,6 @@
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, Field, field_validator
+
+from app.core.config import settings
 
 
 class AuthorDetail(BaseModel):
@@ -16,6 +18,15 @@ class AuthorCreate(BaseModel):
         return value
 
 
+class AuthorLookup(BaseModel):
+    names: list[str] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.batch_max_ids,
+        description="Author names to resolve (case-insensitive); the result keeps this order",
+    )
+
+
 class TokenDetail(BaseModel):
     access_token: str
     token_type: str
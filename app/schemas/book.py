@@ -1,7 +1,8 @@
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic import BaseModel, Field, field_validator
 
+from app.core.config import settings
 from app.core.validators import validate_genre, validate_published_year
 
 
@@ -29,6 +30,10 @@ class BookDetail(BaseModel):
         from_attributes = True
 
 
+class BookSearchResult(BookDetail):
+    rank: float
+
+
 class BookCreate(BookBase):
     title: str
     isbn: str
@@ -51,3 +56,109 @@ class BookQueryParams(BaseModel):
     sort_order: str = Field("desc", description="Sort order: 'asc' or 'desc'")
     limit: int = Field(20, description="Maximum number of records to return")
     offset: int = Field(0, description="Offset for pagination")
+    cursor: Optional[str] = Field(
+        None,
+        description="Opaque cursor from the X-Next-Cursor header of the previous page; takes precedence over offset",
+    )
+
+
+class BookSearchParams(BaseModel):
+    q: str = Field(..., min_length=1, max_length=255, description="Words to search for in titles and author names")
+    prefix: bool = Field(False, description="Typeahead mode: match words that start with the given terms")
+    limit: int = Field(20, ge=1, le=100, description="Maximum number of records to return")
+    offset: int = Field(0, ge=0, description="Offset for pagination")
+
+
+class BookImportError(BaseModel):
+    row: int = Field(..., description="1-based position of the record in the uploaded file (header excluded)")
+    isbn: Optional[str] = None
+    error: str
+
+
+ImportMode = Literal["insert", "upsert"]
+
+
+class BookImportReport(BaseModel):
+    total_rows: int
+    imported: int = Field(..., description="Rows applied successfully: inserted + updated + unchanged")
+    inserted: int = 0
+    updated: int = Field(0, description="Existing books (same ISBN) whose data changed; upsert mode only")
+    unchanged: int = Field(0, description="Existing books that already matched the row; upsert mode only")
+    failed: int
+    errors: list[BookImportError]
+    errors_truncated: bool = Field(False, description="Whether more errors occurred than are listed")
+    elapsed_seconds: float
+    rows_per_second: float
+
+
+class BookFacetParams(BaseModel):
+    title: Optional[str] = Field(None, description="Filter books by title (partial match)")
+    author: Optional[str] = Field(None, description="Filter books by author name (partial match)")
+    genre: Optional[str] = Field(None, description="Filter books by genre (exact match)")
+    year_from: Optional[int] = Field(None, description="Filter books published from this year onward")
+    year_to: Optional[int] = Field(None, description="Filter books published up to this year")
+    top_authors: int = Field(10, ge=1, le=100, description="Number of authors with the most books to count")
+    estimate: bool = Field(
+        False, description="Without filters, return the planner's row estimate as total instead of an exact count"
+    )
+
+
+class GenreFacet(BaseModel):
+    genre: str
+    count: int
+
+
+class YearFacet(BaseModel):
+    year: int
+    count: int
+
+
+class AuthorFacet(BaseModel):
+    author_id: int
+    author_name: str
+    count: int
+
+
+class BookFacets(BaseModel):
+    total: int = Field(..., description="Number of books matching the filters")
+    total_is_estimate: bool = Field(False, description="Whether total is a planner estimate")
+    genres: list[GenreFacet] = Field(..., description="Matching books per genre, most frequent first")
+    years: list[YearFacet] = Field(..., description="Matching books per published year, in year order")
+    authors: list[AuthorFacet] = Field(..., description="Authors with the most matching books")
+
+
+BulkMode = Literal["atomic", "best_effort"]
+
+
+class BookBulkUpdateItem(BookUpdate):
+    id: int = Field(..., description="ID of the book to update")
+
+
+class BookBulkCreate(BaseModel):
+    items: list[BookCreate] = Field(..., min_length=1, max_length=settings.bulk_max_items)
+
+
+class BookBulkUpdate(BaseModel):
+    items: list[BookBulkUpdateItem] = Field(..., min_length=1, max_length=settings.bulk_max_items)
+
+
+class BookBulkDelete(BaseModel):
+    ids: list[int] = Field(..., min_length=1, max_length=settings.bulk_max_items)
+
+
+class BookBulkItemResult(BaseModel):
+    index: int = Field(..., description="0-based position of the item in the request")
+    id: Optional[int] = None
+    status: Literal["created", "updated", "deleted", "failed", "skipped"] = Field(
+        ..., description="'skipped': not applied because the atomic request was rolled back"
+    )
+    error: Optional[str] = None
+    book: Optional[BookDetail] = None
+
+
+class BookBulkResult(BaseModel):
+    mode: BulkMode
+    committed: bool = Field(..., description="Whether the successful items were committed")
+    succeeded: int
+    failed: int
+    results: list[BookBulkItemResult]
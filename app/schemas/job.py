@@ -0,0 +1,30 @@
+from datetime import datetime
+from typing import Any, Literal, Optional
+from uuid import UUID
+
+from pydantic import BaseModel, Field, computed_field
+
+JobKind = Literal["import", "export"]
+JobStatus = Literal["queued", "running", "succeeded", "failed", "cancelled"]
+
+
+class JobDetail(BaseModel):
+    id: UUID
+    kind: JobKind
+    status: JobStatus
+    params: dict[str, Any] = Field(..., description="Parameters the job was submitted with")
+    processed_rows: int = Field(..., description="Rows read (import) or written (export) so far")
+    failed_rows: int = Field(..., description="Rows that could not be imported so far")
+    cancel_requested: bool
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    node_id: Optional[str] = Field(None, description="Node that stores the job's files and runs it")
+    result: Optional[dict[str, Any]] = Field(None, exclude=True)
+    result_file: Optional[str] = Field(None, exclude=True)
+
+    @computed_field(description="Whether GET /jobs/{id}/result/ has something to return")
+    @property
+    def has_result(self) -> bool:
+        return self.result is not None or self.result_file is not None
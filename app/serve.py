@@ -0,0 +1,123 @@
+import argparse
+import glob
+import logging
+import os
+import shutil
+import sys
+import tempfile
+from typing import Optional
+
+import uvicorn
+
+from app.core.changes import DEDICATED_CONNECTIONS
+from app.core.config import settings
+from app.core.metrics import MULTIPROC_DIR_ENV
+
+logger = logging.getLogger("serve")
+
+
+def worker_pool_sizes(
+    budget: Optional[int], workers: int, min_size: int, max_size: int, dedicated: int = DEDICATED_CONNECTIONS
+) -> tuple[int, int]:
+    """
+    The (min, max) pool size of each worker process. With a connection budget, every worker gets an equal
+    share of it, less the `dedicated` connections it opens outside its pool, so all workers together never
+    open more connections than the budget allows.
+    """
+    if budget is None:
+        return min(min_size, max_size), max_size
+    share = budget // workers - dedicated
+    if share < 1:
+        raise ValueError(
+            f"A budget of {budget} connections cannot give each of {workers} workers a pooled connection "
+            f"besides its {dedicated} dedicated one(s)."
+        )
+    return min(min_size, share), share
+
+
+def prepare_metrics_directory(workers: int) -> Optional[str]:
+    """
+    With several workers, point every worker's metrics at a shared directory (PROMETHEUS_MULTIPROC_DIR, or a
+    temporary one) and clear the files a previous run left there. Returns the temporary directory to remove
+    after the server stopped, if one was created.
+    """
+    if workers <= 1:
+        return None
+    directory = os.environ.get(MULTIPROC_DIR_ENV)
+    created = None
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        for path in glob.glob(os.path.join(directory, "*.db")):
+            os.remove(path)
+    else:
+        directory = created = tempfile.mkdtemp(prefix="prometheus-")
+    # Read by the worker processes when they import prometheus_client.
+    os.environ[MULTIPROC_DIR_ENV] = directory
+    return created
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the API with several worker processes.")
+    parser.add_argument("--host", default=settings.server_host)
+    parser.add_argument("--port", type=int, default=settings.server_port)
+    parser.add_argument("--workers", type=int, default=settings.server_workers, help="Worker processes")
+    parser.add_argument("--loop", choices=["auto", "asyncio", "uvloop"], default=settings.server_loop)
+    parser.add_argument("--http", choices=["auto", "h11", "httptools"], default=settings.server_http)
+    parser.add_argument(
+        "--db-connection-budget",
+        type=int,
+        default=settings.db_connection_budget,
+        help="Connections to the primary all workers may open together",
+    )
+    parser.add_argument(
+        "--graceful-shutdown",
+        type=int,
+        default=settings.server_graceful_shutdown_seconds,
+        help="Seconds to let in-flight requests finish after a shutdown signal",
+    )
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    try:
+        min_size, max_size = worker_pool_sizes(
+            args.db_connection_budget, args.workers, settings.db_pool_min_size, settings.db_pool_max_size
+        )
+    except ValueError as e:
+        logger.error("%s", e)
+        return 2
+    # Worker processes read their settings from the environment; a single worker runs in this process.
+    os.environ["DB_POOL_MIN_SIZE"] = str(min_size)
+    os.environ["DB_POOL_MAX_SIZE"] = str(max_size)
+    settings.db_pool_min_size, settings.db_pool_max_size = min_size, max_size
+    logger.info(
+        "Starting %s worker(s), each with a pool of %s-%s connections and %s dedicated one(s)",
+        args.workers,
+        min_size,
+        max_size,
+        DEDICATED_CONNECTIONS,
+    )
+
+    metrics_directory = prepare_metrics_directory(args.workers)
+
+    # On SIGTERM/SIGINT uvicorn stops accepting connections, closes idle keep-alive connections and waits up
+    # to --graceful-shutdown seconds for in-flight requests before the lifespan shutdown closes the pools.
+    try:
+        uvicorn.run(
+            "app.main:app",
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            loop=args.loop,
+            http=args.http,
+            timeout_graceful_shutdown=args.graceful_shutdown,
+            timeout_keep_alive=settings.server_keep_alive_seconds,
+            proxy_headers=True,
+        )
+    finally:
+        if metrics_directory is not None:
+            shutil.rmtree(metrics_directory, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+import importlib
+import pkgutil
+from contextlib import asynccontextmanager
+
+import pytest
+
+import app.crud
+
+
+class FakeTransaction:
+    def __init__(self, conn):
+        self.conn = conn
+
+    async def start(self):
+        self.conn.events.append("begin")
+
+    async def commit(self):
+        self.conn.events.append("commit")
+
+    async def rollback(self):
+        self.conn.events.append("rollback")
+
+
+class FakeStatement:
+    def __init__(self, conn, query):
+        self.conn = conn
+        self.query = query
+
+    async def fetch(self, *args):
+        self.conn.calls.append((self.query, args))
+        self.conn.events.append(self.query.split("FROM ")[1].split("(")[0])
+        return self.conn.respond(self.query, args)
+
+
+class FakeConnection:
+    """
+    Stands in for a pooled asyncpg connection. Every statement call is recorded in `calls` as (query, args)
+    and, with the transaction steps, by stored function name in `events`. Tests set `respond(query, args)`
+    to return the rows of a call; by default every call returns none.
+    """
+
+    def __init__(self):
+        self.prepared = []
+        self.calls = []
+        self.events = []
+
+    def respond(self, query, args):
+        return []
+
+    def transaction(self):
+        return FakeTransaction(self)
+
+    async def prepare(self, query):
+        self.prepared.append(query)
+        return FakeStatement(self, query)
+
+
+@pytest.fixture
+def fake_connection_factory():
+    return FakeConnection
+
+
+@pytest.fixture
+def fake_connection(monkeypatch):
+    """A FakeConnection handed out by get_connection and get_read_connection in every app.crud module."""
+    conn = FakeConnection()
+
+    @asynccontextmanager
+    async def fake_get_connection():
+        yield conn
+
+    for module_info in pkgutil.iter_modules(app.crud.__path__):
+        module = importlib.import_module(f"app.crud.{module_info.name}")
+        for name in ("get_connection", "get_read_connection"):
+            if hasattr(module, name):
+                monkeypatch.setattr(module, name, fake_get_connection)
+    return conn
@@ -0,0 +1,109 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.core.admission import (
+    AdmissionController,
+    AdmissionControlMiddleware,
+    Lane,
+    classify,
+)
+from app.core.config import LaneLimits
+
+
+@pytest.mark.parametrize(
+    "method, path, lane",
+    [
+        ("GET", "/api/books/", "read"),
+        ("GET", "/api/authors/1/books/", "read"),
+        ("POST", "/api/authors/lookup/", "read"),
+        ("POST", "/api/books/", "write"),
+        ("DELETE", "/api/books/bulk/", "write"),
+        ("POST", "/api/books/import/", "import"),
+        ("GET", "/api/books/export/", "export"),
+        ("POST", "/api/login/", "login"),
+        ("GET", "/metrics", None),
+        ("GET", "/api/jobs/1/", None),
+    ],
+)
+def test_classify(method, path, lane):
+    assert classify(method, path) == lane
+
+
+@pytest.mark.asyncio
+async def test_lane_hands_slots_to_waiters_in_order():
+    lane = Lane("read", concurrency=1, queue=2, queue_timeout=1.0)
+    order = []
+
+    async def request(name):
+        assert await lane.acquire()
+        order.append(name)
+        await asyncio.sleep(0)
+        lane.release()
+
+    assert await lane.acquire()
+    waiters = [asyncio.create_task(request(name)) for name in ("first", "second")]
+    await asyncio.sleep(0)
+    assert lane.queued == 2
+    # The queue is full: a third request is shed right away.
+    assert not await lane.acquire()
+
+    lane.release()
+    await asyncio.gather(*waiters)
+    assert order == ["first", "second"]
+    assert lane.stats() == {
+        "concurrency": 1,
+        "active": 0,
+        "queued": 0,
+        "max_queued": 2,
+        "admitted": 3,
+        "shed_queue_full": 1,
+        "shed_timeout": 0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_lane_sheds_after_queue_timeout():
+    lane = Lane("export", concurrency=1, queue=4, queue_timeout=0.01)
+    assert await lane.acquire()
+
+    assert not await lane.acquire()
+    assert lane.shed_timeout == 1
+    assert lane.queued == 0
+    lane.release()
+    assert lane.active == 0
+
+
+@pytest.mark.asyncio
+async def test_middleware_answers_503_with_retry_after():
+    release = asyncio.Event()
+    controller = AdmissionController({"read": LaneLimits(concurrency=1, queue=0, queue_timeout=1.0)}, retry_after=3)
+    app = FastAPI()
+    app.add_middleware(AdmissionControlMiddleware, controller=controller)
+
+    @app.get("/api/books/")
+    async def list_books():
+        await release.wait()
+        return []
+
+    @app.get("/metrics")
+    async def metrics():
+        return "ok"
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        slow = asyncio.create_task(client.get("/api/books/"))
+        while controller.lanes["read"].active == 0:
+            await asyncio.sleep(0.001)
+
+        shed = await client.get("/api/books/")
+        unlimited = await client.get("/metrics")
+        release.set()
+        assert (await slow).status_code == 200
+
+    assert shed.status_code == 503
+    assert shed.headers["retry-after"] == "3"
+    assert unlimited.status_code == 200
+    assert controller.stats()["read_shed_queue_full"] == 1
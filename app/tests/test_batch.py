@@ -0,0 +1,39 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import app.crud.author
+import app.crud.book
+import app.routers.book
+from app.core.config import settings
+from app.main import app as fastapi_app
+
+
+@pytest.mark.asyncio
+async def test_books_by_ids_use_one_query_without_duplicates(fake_connection):
+    await app.crud.book.get_books_by_ids_crud([3, 1, 3, 2, 1])
+    assert fake_connection.calls == [("SELECT * FROM get_books_by_ids_function($1)", ([3, 1, 2],))]
+
+
+@pytest.mark.asyncio
+async def test_author_lookup_uses_one_query_without_duplicates(fake_connection):
+    await app.crud.author.get_authors_by_names_crud(["Mary Beard", "Homer", "mary beard"])
+    assert fake_connection.calls == [("SELECT * FROM get_authors_by_names_function($1)", (["mary beard", "Homer"],))]
+
+
+def test_batch_route_is_not_taken_for_a_book_id(monkeypatch):
+    requested = []
+
+    async def fake_get_books_by_ids_crud(book_ids):
+        requested.append(book_ids)
+        return []
+
+    monkeypatch.setattr(app.routers.book, "get_books_by_ids_crud", fake_get_books_by_ids_crud)
+    client = TestClient(fastapi_app)
+
+    response = client.get("/api/books/batch/?ids=5&ids=4")
+    assert response.status_code == 200
+    assert response.json() == []
+    assert requested == [[5, 4]]
+
+    too_many = "&".join(f"ids={i}" for i in range(settings.batch_max_ids + 1))
+    assert client.get(f"/api/books/batch/?{too_many}").status_code == 422
@@ -0,0 +1,100 @@
+import json
+import random
+import sys
+from collections import Counter
+
+import httpx
+import pytest
+
+from benchmarks.__main__ import main
+from benchmarks.catalog import CatalogSize
+from benchmarks.compression import compression_report
+from benchmarks.runner import run_scenario
+from benchmarks.scenarios import BenchContext, Scenario, until_first_event
+from benchmarks.stats import compare, percentile, summarize
+
+
+def test_percentile_uses_nearest_rank():
+    values = [float(value) for value in range(1, 101)]
+    assert percentile(values, 0.50) == 50
+    assert percentile(values, 0.99) == 99
+    assert percentile([], 0.99) == 0.0
+
+
+def test_summary_counts_error_statuses():
+    result = summarize([0.01, 0.02, 0.03, 0.04], Counter({"200": 2, "404": 1, "ConnectError": 1}), 2.0, 2.0)
+    assert result["requests"] == 4
+    assert result["errors"] == 2
+    assert result["error_rate"] == 0.5
+    assert result["rps"] == 2.0
+    assert result["p50_ms"] == 20.0
+
+
+def test_compare_flags_latency_and_error_regressions():
+    endpoint = {"p50_ms": 10.0, "p95_ms": 20.0, "p99_ms": 30.0, "error_rate": 0.0, "rps": 50.0}
+    baseline = {"endpoints": {"books.list": endpoint, "books.get": endpoint}}
+    current = {
+        "endpoints": {
+            "books.list": {**endpoint, "p95_ms": 25.0},
+            "books.get": {**endpoint, "p99_ms": 32.0, "error_rate": 0.05},
+            "books.new": {**endpoint, "p99_ms": 500.0},
+        }
+    }
+    regressions = compare(baseline, current)
+    assert regressions == ["books.list: p95_ms 20.0 -> 25.0 (+25%)", "books.get: error_rate 0.0 -> 0.05"]
+
+
+def test_compare_needs_a_recorded_baseline(monkeypatch, tmp_path):
+    endpoint = {"p50_ms": 10.0, "p95_ms": 20.0, "p99_ms": 30.0, "error_rate": 0.0, "rps": 50.0}
+    results, baseline = tmp_path / "current.json", tmp_path / "baseline.json"
+    results.write_text(json.dumps({"meta": {"commit": "abc"}, "endpoints": {"books.list": endpoint}}))
+
+    def run_compare(*options):
+        monkeypatch.setattr(
+            sys, "argv", ["benchmarks", "compare", str(results), "--baseline", str(baseline), *options]
+        )
+        return main()
+
+    assert run_compare() == 2
+    assert run_compare("--record-baseline") == 0
+    assert json.loads(baseline.read_text()) == json.loads(results.read_text())
+    assert run_compare() == 0
+
+
+@pytest.mark.asyncio
+async def test_run_scenario_records_only_after_warmup():
+    transport = httpx.MockTransport(lambda request: httpx.Response(200 if request.url.path == "/ok/" else 500))
+    scenario = Scenario("ok", lambda rng, ctx: {"method": "GET", "url": "/ok/"})
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        result = await run_scenario(
+            client, scenario, BenchContext(author_count=1, user_count=1), random.Random(0), 100, 0.2, warmup=0.1
+        )
+    assert result["requests"] == 20
+    assert result["statuses"] == {"200": 20}
+    assert result["errors"] == 0
+
+
+@pytest.mark.asyncio
+async def test_event_stream_scenario_stops_reading_at_the_first_event():
+    async def endless_stream():
+        yield b"retry: 1000\n\n"
+        yield b"id: 101-1\nevent: book\ndata: {}\n\n"
+        while True:
+            yield b": keep-alive\n\n"
+
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, content=endless_stream()))
+    scenario = Scenario("stream", lambda rng, ctx: {"method": "GET", "url": "/stream/"}, send=until_first_event)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        result = await run_scenario(
+            client, scenario, BenchContext(author_count=1, user_count=1), random.Random(0), 50, 0.1
+        )
+    assert result["statuses"] == {"200": 5}
+
+
+def test_compression_report_trades_cpu_for_bytes():
+    report = compression_report(CatalogSize(authors=10, books=500), ["csv"], {"gzip": (1, 9)}, batch_size=100)
+
+    fast, small = report["csv"]
+    assert (fast["level"], small["level"]) == (1, 9)
+    assert fast["input_bytes"] == small["input_bytes"]
+    assert small["output_bytes"] <= fast["output_bytes"] < fast["input_bytes"]
@@ -0,0 +1,112 @@
+import pytest
+
+from app.crud.book_bulk import (
+    bulk_create_books_crud,
+    bulk_delete_books_crud,
+    bulk_update_books_crud,
+)
+from app.schemas.book import BookBulkUpdateItem, BookCreate
+
+
+def respond(query, args):
+    if "get_authors_by_names_function" in query:
+        return [{"id": 1, "name": "Mary Beard"}]
+    if "create_books_batch_function" in query:
+        titles, isbns, years, genres, author_ids = args
+        # ISBN 9780000000002 already exists in the database.
+        return [
+            {"id": 100 + i, "title": t, "isbn": isbn, "published_year": y, "genre": g, "author_id": a}
+            | {"author_name": "Mary Beard"}
+            for i, (t, isbn, y, g, a) in enumerate(zip(*args))
+            if isbn != "9780000000002"
+        ]
+    if "get_books_by_isbns_function" in query:
+        return [{"id": 7, "isbn": "9780000000007"}]
+    if "update_books_batch_function" in query:
+        return [
+            {"id": book_id, "title": title or "Old", "isbn": isbn or "9780000000001", "published_year": 2000}
+            | {"genre": "History", "author_id": 1, "author_name": "Mary Beard"}
+            for book_id, title, isbn in zip(args[0], args[1], args[2])
+            if book_id != 404
+        ]
+    if "delete_books_batch_function" in query:
+        return [{"id": book_id} for book_id in args[0] if book_id != 404]
+    return []
+
+
+@pytest.fixture
+def conn(fake_connection):
+    fake_connection.respond = respond
+    return fake_connection
+
+
+def book(isbn, author_name="Mary Beard"):
+    return BookCreate(title="SPQR", isbn=isbn, published_year=2015, genre="History", author_name=author_name)
+
+
+@pytest.mark.asyncio
+async def test_best_effort_create_commits_valid_items(conn):
+    books = [
+        book("9780000000001"),
+        book("9780000000001"),
+        book("9780000000002"),
+        book("9780000000003", author_name="Nobody"),
+        book("9780000000004"),
+    ]
+    results, committed = await bulk_create_books_crud(books, atomic=False)
+
+    assert committed
+    assert [result["status"] for result in results] == ["created", "failed", "failed", "failed", "created"]
+    assert results[1]["error"] == "Duplicate ISBN in the request."
+    assert results[2]["error"] == "Book with this ISBN already exists."
+    assert results[3]["error"] == 'Author "Nobody" does not exist.'
+    assert results[4]["book"]["isbn"] == "9780000000004"
+    assert conn.events == [
+        "begin",
+        "get_authors_by_names_function",
+        "create_books_batch_function",
+        "commit",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_atomic_create_rolls_back_on_any_failure(conn):
+    results, committed = await bulk_create_books_crud([book("9780000000001"), book("9780000000002")])
+
+    assert not committed
+    assert [result["status"] for result in results] == ["skipped", "failed"]
+    assert conn.events[-1] == "rollback"
+
+
+@pytest.mark.asyncio
+async def test_atomic_request_with_invalid_items_does_not_touch_the_database(conn):
+    results, committed = await bulk_delete_books_crud([1, 1])
+    assert not committed
+    assert [result["status"] for result in results] == ["skipped", "failed"]
+    assert conn.events == []
+
+
+@pytest.mark.asyncio
+async def test_best_effort_update_reports_conflicts_and_missing_books(conn):
+    items = [
+        BookBulkUpdateItem(id=1, title="New"),
+        BookBulkUpdateItem(id=2, isbn="9780000000007"),
+        BookBulkUpdateItem(id=3),
+        BookBulkUpdateItem(id=404, title="Gone"),
+    ]
+    results, committed = await bulk_update_books_crud(items, atomic=False)
+
+    assert committed
+    assert [result["status"] for result in results] == ["updated", "failed", "failed", "failed"]
+    assert results[0]["book"]["title"] == "New"
+    assert results[1]["error"] == "Book with this ISBN already exists."
+    assert results[2]["error"] == "No update parameters provided"
+    assert results[3]["error"] == "Book with ID 404 does not exist"
+
+
+@pytest.mark.asyncio
+async def test_atomic_delete_of_missing_book_rolls_back(conn):
+    results, committed = await bulk_delete_books_crud([1, 404])
+    assert not committed
+    assert [result["status"] for result in results] == ["skipped", "failed"]
+    assert conn.events == ["begin", "delete_books_batch_function", "rollback"]
@@ -0,0 +1,47 @@
+import pytest
+
+from app.crud.book import get_book_facets_crud
+from app.schemas.book import BookFacets
+
+
+def use_rows(conn, rows):
+    conn.respond = lambda query, args: rows if "get_book_facets_function" in query else []
+
+
+def row(facet, value, label, book_count):
+    return {"facet": facet, "value": value, "label": label, "book_count": book_count}
+
+
+@pytest.mark.asyncio
+async def test_facet_rows_are_grouped_and_ordered(fake_connection):
+    use_rows(
+        fake_connection,
+        [
+            row("year", "2001", None, 1),
+            row("genre", "Science", None, 2),
+            row("total", None, "exact", 5),
+            row("author", "7", "Mary Beard", 1),
+            row("genre", "Fiction", None, 3),
+            row("year", "1999", None, 4),
+            row("author", "3", "Ursula K. Le Guin", 4),
+        ],
+    )
+    facets = BookFacets.model_validate(await get_book_facets_crud(genre="Fiction"))
+
+    assert facets.total == 5
+    assert not facets.total_is_estimate
+    assert [(item.genre, item.count) for item in facets.genres] == [("Fiction", 3), ("Science", 2)]
+    assert [(item.year, item.count) for item in facets.years] == [(1999, 4), (2001, 1)]
+    assert [(item.author_id, item.author_name) for item in facets.authors] == [
+        (3, "Ursula K. Le Guin"),
+        (7, "Mary Beard"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_estimated_total_is_flagged(fake_connection):
+    use_rows(fake_connection, [row("total", None, "estimate", 120000)])
+    facets = await get_book_facets_crud(estimate=True)
+    assert facets["total"] == 120000
+    assert facets["total_is_estimate"]
+    assert facets["genres"] == facets["years"] == facets["authors"] == []
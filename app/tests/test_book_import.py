@@ -0,0 +1,139 @@
+import json
+
+import pytest
+
+import app.core.book_import
+from app.core.book_import import (
+    UnparsableRecord,
+    iter_csv_records,
+    iter_json_records,
+    iter_ndjson_records,
+    run_book_import,
+)
+
+
+def book(isbn, author_name="Frank Herbert", **fields):
+    return {
+        "title": "Dune",
+        "isbn": isbn,
+        "published_year": 1965,
+        "genre": "Fiction",
+        "author_name": author_name,
+        **fields,
+    }
+
+
+async def chunked(data: bytes, size: int = 7):
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+async def collect(records):
+    return [record async for record in records]
+
+
+@pytest.mark.asyncio
+async def test_json_records_are_parsed_across_chunk_boundaries():
+    books = [book("9780441013593"), book("9780441013594", published_year=1966)]
+    data = json.dumps(books, indent=2).encode()
+    assert await collect(iter_json_records(chunked(data))) == books
+
+
+@pytest.mark.asyncio
+async def test_json_records_require_a_list():
+    with pytest.raises(ValueError):
+        await collect(iter_json_records(chunked(b'{"title": "Dune"}')))
+
+
+@pytest.mark.asyncio
+async def test_ndjson_records():
+    books = [book("9780441013593"), book("9780441013594")]
+    data = "\n".join(json.dumps(b) for b in books).encode()
+    assert await collect(iter_ndjson_records(chunked(data))) == books
+
+
+@pytest.mark.asyncio
+async def test_ndjson_records_continue_after_a_malformed_line():
+    data = f'{json.dumps(book("9780441013593"))}\n{{"title": "Dune",\n{json.dumps(book("9780441013594"))}'.encode()
+    records = await collect(iter_ndjson_records(chunked(data)))
+    assert records[0] == book("9780441013593")
+    assert isinstance(records[1], UnparsableRecord)
+    assert records[2] == book("9780441013594")
+
+
+@pytest.mark.asyncio
+async def test_csv_records_keep_quoted_line_breaks():
+    data = (
+        "\ufefftitle,isbn,published_year,genre,author_name\r\n"
+        '"Dune, part\r\none",9780441013593,1965,Fiction,Frank Herbert\r\n'
+        'Cosmos,9780345539434,1980,Science,"Carl ""Cosmos"" Sagan"\r\n'
+    ).encode()
+    records = await collect(iter_csv_records(chunked(data, size=5)))
+    assert [record["title"] for record in records] == ["Dune, part\r\none", "Cosmos"]
+    assert records[1]["author_name"] == 'Carl "Cosmos" Sagan'
+
+
+@pytest.mark.asyncio
+async def test_run_book_import_reports_per_row(monkeypatch):
+    batches = []
+
+    async def fake_create_books_batch_crud(books, upsert=False):
+        batches.append([b.isbn for b in books])
+        inserted = [{"isbn": b.isbn} for b in books if b.author_name != "Nobody" and b.isbn != "9780000000001"]
+        return inserted, {"Nobody"}
+
+    monkeypatch.setattr(app.core.book_import, "create_books_batch_crud", fake_create_books_batch_crud)
+    records = [
+        book("9780441013593"),
+        book("9780441013593"),  # duplicate in the upload
+        book("9780000000001"),  # already in the database
+        book("9780441013595", genre="Drama"),  # invalid
+        book("9780441013596", author_name="Nobody"),
+        book("9780441013597"),
+    ]
+    report = await run_book_import(chunked(json.dumps(records).encode()), "json", batch_size=4)
+
+    assert batches == [["9780441013593", "9780000000001"], ["9780441013596", "9780441013597"]]
+    assert report.total_rows == 6
+    assert report.imported == 2
+    assert report.failed == 4
+    assert [error.row for error in report.errors] == [4, 2, 3, 5]
+
+
+@pytest.mark.asyncio
+async def test_run_book_import_upsert_counts(monkeypatch):
+    async def fake_create_books_batch_crud(books, upsert=False):
+        assert upsert
+        # ...593 is new, ...594 changed, ...595 already up to date; "Nobody" is unknown.
+        written = [{"isbn": "9780441013593", "inserted": True}, {"isbn": "9780441013594", "inserted": False}]
+        return written, {"Nobody"}
+
+    monkeypatch.setattr(app.core.book_import, "create_books_batch_crud", fake_create_books_batch_crud)
+    records = [
+        book("9780441013593"),
+        book("9780441013594"),
+        book("9780441013595"),
+        book("9780441013596", author_name="Nobody"),
+    ]
+    report = await run_book_import(chunked(json.dumps(records).encode()), "json", mode="upsert")
+
+    assert (report.inserted, report.updated, report.unchanged) == (1, 1, 1)
+    assert report.imported == 3
+    assert report.failed == 1
+    assert [error.row for error in report.errors] == [4]
+
+
+@pytest.mark.asyncio
+async def test_run_book_import_reports_a_malformed_ndjson_line_and_keeps_reading(monkeypatch):
+    async def fake_create_books_batch_crud(books, upsert=False):
+        return [{"isbn": b.isbn} for b in books], set()
+
+    monkeypatch.setattr(app.core.book_import, "create_books_batch_crud", fake_create_books_batch_crud)
+    lines = [json.dumps(book("9780441013593")), '{"title": "Dune", "isbn": ', json.dumps(book("9780441013594"))]
+    report = await run_book_import(chunked("\n".join(lines).encode()), "ndjson", batch_size=1)
+
+    assert report.total_rows == 3
+    assert report.imported == 2
+    assert report.failed == 1
+    assert report.errors[0].row == 2
+    assert report.errors[0].error.startswith("Invalid JSON")
@@ -0,0 +1,56 @@
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from app.crud.book import search_books_crud
+from app.main import app as fastapi_app
+from app.schemas.book import BookSearchParams
+
+
+@pytest.mark.asyncio
+async def test_search_passes_parameters_in_order(fake_connection):
+    fake_connection.respond = lambda query, args: [{"id": 1, "title": "Dune", "rank": 0.5}]
+
+    result = await search_books_crud("dune herbert", limit=5, offset=10)
+
+    assert fake_connection.calls == [
+        ("SELECT * FROM search_books_function($1, $2, $3, $4)", ("dune herbert", False, 5, 10))
+    ]
+    assert result == [{"id": 1, "title": "Dune", "rank": 0.5}]
+
+
+@pytest.mark.asyncio
+async def test_search_prefix_flag_reaches_the_query(fake_connection):
+    await search_books_crud("dun", prefix=True)
+    assert fake_connection.calls[0][1] == ("dun", True, 10, 0)
+
+
+@pytest.mark.asyncio
+async def test_search_database_error_is_a_bad_request(fake_connection):
+    def fail(query, args):
+        raise RuntimeError("syntax error in tsquery")
+
+    fake_connection.respond = fail
+    with pytest.raises(HTTPException) as e:
+        await search_books_crud("dune")
+    assert e.value.status_code == 400
+    assert "syntax error in tsquery" in e.value.detail
+
+
+@pytest.mark.parametrize("params", [{"q": ""}, {"q": "dune", "limit": 0}, {"q": "dune", "limit": 101}])
+def test_search_params_reject_empty_query_and_out_of_range_limits(params):
+    with pytest.raises(ValidationError):
+        BookSearchParams(**params)
+
+
+def test_search_route_validates_and_forwards_the_query(fake_connection):
+    client = TestClient(fastapi_app)
+
+    assert client.get("/api/books/search/?q=").status_code == 422
+    assert client.get("/api/books/search/?q=dune&limit=500").status_code == 422
+
+    response = client.get("/api/books/search/?q=dune&prefix=true&limit=3")
+    assert response.status_code == 200
+    assert response.json() == []
+    assert fake_connection.calls[0][1] == ("dune", True, 3, 0)
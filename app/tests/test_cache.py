@@ -0,0 +1,46 @@
+import pytest
+
+import app.core.cache
+from app.core.cache import TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(app.core.cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_ttl_cache_hit_and_miss(clock):
+    cache = TTLCache(max_size=2, ttl=10)
+    assert cache.get("a@example.com") is None
+    cache.set("a@example.com", {"id": 1})
+    assert cache.get("a@example.com") == {"id": 1}
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_ttl_cache_entries_expire(clock):
+    cache = TTLCache(max_size=2, ttl=10)
+    cache.set("a@example.com", {"id": 1})
+    clock[0] += 10
+    assert cache.get("a@example.com") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_ttl_cache_evicts_least_recently_used(clock):
+    cache = TTLCache(max_size=2, ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_cache_invalidate(clock):
+    cache = TTLCache(max_size=2, ttl=10)
+    cache.set("a", 1)
+    cache.invalidate("a")
+    assert cache.get("a") is None
@@ -0,0 +1,210 @@
+import asyncio
+
+import pytest
+
+import app.core.changes
+from app.core.changes import (
+    ChangeFeed,
+    ChangeFilter,
+    TooManySubscribers,
+    parse_position,
+    position,
+)
+
+
+def event(seq, entity="book", author_id=1, previous_author_id=None, xid=None):
+    return {
+        "xid": 100 + seq if xid is None else xid,
+        "seq": seq,
+        "entity": entity,
+        "op": "update",
+        "entity_id": seq,
+        "author_id": author_id,
+        "previous_author_id": previous_author_id,
+    }
+
+
+class FakeEventTable:
+    """The committed events; those of transactions at or above `horizon` are not settled yet."""
+
+    def __init__(self, events, horizon=10**9, pruned=None):
+        self.events = events
+        self.horizon = horizon
+        self.pruned = pruned
+
+    def settled(self):
+        return sorted((e for e in self.events if e["xid"] < self.horizon), key=position)
+
+    async def get_change_events_crud(self, after, until=None, limit=500, entity=None, author_id=None):
+        change_filter = ChangeFilter(entity, author_id)
+        return [
+            e
+            for e in self.settled()
+            if position(e) > after and (until is None or position(e) <= until) and change_filter.matches(e)
+        ][:limit]
+
+    async def get_change_events_bounds_crud(self):
+        settled = self.settled()
+        return {
+            "last": position(settled[-1]) if settled else None,
+            "pruned": self.pruned,
+            "held_back": any(e["xid"] >= self.horizon for e in self.events),
+        }
+
+
+@pytest.fixture
+def table(monkeypatch):
+    table = FakeEventTable([event(seq) for seq in range(3, 8)], pruned=(102, 2))
+    monkeypatch.setattr(app.core.changes, "get_change_events_crud", table.get_change_events_crud)
+    monkeypatch.setattr(app.core.changes, "get_change_events_bounds_crud", table.get_change_events_bounds_crud)
+    return table
+
+
+def event_ids(chunks):
+    return [line[4:] for chunk in chunks for line in chunk.splitlines() if line.startswith("id: ")]
+
+
+async def take(stream, count):
+    return [await anext(stream) for _ in range(count)]
+
+
+def test_filter_matches_entity_and_old_or_new_author():
+    assert ChangeFilter(entity="book").matches(event(1))
+    assert not ChangeFilter(entity="author").matches(event(1))
+    assert ChangeFilter(author_id=2).matches(event(1, author_id=3, previous_author_id=2))
+    assert not ChangeFilter(author_id=2).matches(event(1, author_id=3))
+
+
+@pytest.mark.asyncio
+async def test_stream_replays_missed_events_then_continues_live(table):
+    feed = ChangeFeed("postgresql://unused", batch_size=2)
+    feed.last = (106, 6)
+    stream = feed.stream(ChangeFilter(), after=(103, 3))
+
+    chunks = await take(stream, 4)  # retry hint + events 4, 5, 6 from the table
+    feed.publish(event(6))  # already replayed: not sent twice
+    feed.publish(event(7))
+    chunks.append(await anext(stream))
+
+    assert chunks[0] == "retry: 1000\n\n"
+    assert event_ids(chunks) == ["104-4", "105-5", "106-6", "107-7"]
+    assert chunks[-1].startswith("id: 107-7\nevent: book\ndata: {")
+    assert '"seq":7,' in chunks[-1]
+    await stream.aclose()
+    assert feed.stats()["subscribers"] == 0
+
+
+@pytest.mark.asyncio
+async def test_stream_announces_reset_when_missed_events_were_pruned(table):
+    feed = ChangeFeed("postgresql://unused")
+    feed.last = (107, 7)
+    stream = feed.stream(ChangeFilter(entity="book"), after=(101, 1))
+
+    chunks = await take(stream, 3)
+
+    assert chunks[1] == 'event: reset\ndata: {"pruned":"102-2"}\n\n'
+    assert event_ids(chunks) == ["103-3"]
+    await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_is_dropped_and_its_stream_ends(table):
+    feed = ChangeFeed("postgresql://unused", max_pending=1, heartbeat_seconds=0.01)
+    feed.last = (107, 7)
+    stream = feed.stream(ChangeFilter())
+    await anext(stream)
+
+    feed.publish(event(8))
+    feed.publish(event(9))  # The queue is full: the subscription is cut off.
+
+    assert feed.stats()["dropped_subscribers"] == 1
+    chunks = [chunk async for chunk in stream]
+    assert event_ids(chunks) == ["108-8"]
+
+
+@pytest.mark.asyncio
+async def test_stream_sends_heartbeats_and_limits_clients(table):
+    feed = ChangeFeed("postgresql://unused", max_clients=1, heartbeat_seconds=0.01)
+    feed.last = (107, 7)
+    stream = feed.stream(ChangeFilter())
+
+    assert await asyncio.wait_for(take(stream, 2), 1) == ["retry: 1000\n\n", ": keep-alive\n\n"]
+    with pytest.raises(TooManySubscribers):
+        feed.check_capacity()
+    # A stream started after the check lost the race for the last place: it only asks the client to retry.
+    assert [chunk async for chunk in feed.stream(ChangeFilter())] == ["retry: 1000\n\n"]
+    await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_stream_subscribes_only_while_its_body_is_iterated(table):
+    feed = ChangeFeed("postgresql://unused", heartbeat_seconds=0.01)
+    feed.last = (107, 7)
+    stream = feed.stream(ChangeFilter())
+    assert feed.stats()["subscribers"] == 0  # A response that is never sent registers nothing.
+
+    await take(stream, 2)
+    assert feed.stats()["subscribers"] == 1
+    await stream.aclose()
+    assert feed.stats()["subscribers"] == 0
+
+
+@pytest.mark.asyncio
+async def test_events_of_a_running_transaction_hold_back_later_commits(table):
+    # Transaction 200 wrote seq 8 and is still running; transaction 201 wrote seq 9 and committed.
+    table.events.append(event(9, xid=201))
+    table.horizon = 200
+    feed = ChangeFeed("postgresql://unused")
+    feed.last = (107, 7)
+    subscription = feed.subscribe(ChangeFilter())
+
+    await feed.catch_up()
+    assert subscription.queue.empty()
+    assert feed.stats()["held_back"] == 1
+
+    table.events.append(event(8, xid=200))
+    table.horizon = 202
+    await feed.catch_up()
+
+    delivered = [position(subscription.queue.get_nowait()) for _ in range(2)]
+    assert delivered == [(200, 8), (201, 9)]
+    assert feed.last == (201, 9)
+    assert feed.stats()["held_back"] == 0
+
+
+@pytest.mark.asyncio
+async def test_notifications_are_handed_to_the_invalidation_of_their_channel():
+    calls = []
+
+    async def invalidate_users(conn, emails):
+        calls.append(("users", emails))
+
+    async def failing_invalidation(conn, payloads):
+        raise RuntimeError("cache unavailable")
+
+    feed = ChangeFeed(
+        "postgresql://unused",
+        invalidations={"change_events": failing_invalidation, "user_changes": invalidate_users},
+    )
+    feed._wakeup = asyncio.Event()
+    # After a (re)connect anything may have changed.
+    feed._notified = dict.fromkeys(feed.invalidations)
+    feed._notify(None, 1, "user_changes", "a@example.com")
+    await feed._invalidate(None)
+    assert calls == [("users", None)]
+
+    feed._notify(None, 1, "user_changes", "a@example.com")
+    feed._notify(None, 1, "user_changes", "b@example.com")
+    feed._notify(None, 1, "change_events", "8")
+    feed._notify(None, 1, "other", "x")
+    assert feed._wakeup.is_set()
+    await feed._invalidate(None)
+    assert calls[1] == ("users", {"a@example.com", "b@example.com"})
+    assert feed._notified == {}
+
+
+def test_parse_position():
+    assert parse_position("201-9") == (201, 9)
+    for token in ("9", "a-b", "-1-2", ""):
+        with pytest.raises(ValueError):
+            parse_position(token)
@@ -0,0 +1,111 @@
+import gzip
+import zlib
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+
+from app.core.compression import CompressionMiddleware, negotiate
+
+ROW = '{"id": 1, "title": "Dune", "isbn": "9780441013593"}\n'
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        ("gzip, deflate, br", "br"),
+        ("gzip;q=0.5, br;q=0.8", "br"),
+        ("gzip", "gzip"),
+        ("br;q=0, gzip;q=0", None),
+        ("*", "br"),
+        ("identity", None),
+        (None, None),
+    ],
+)
+def test_negotiate(accept_encoding, expected):
+    assert negotiate(accept_encoding, ["br", "gzip"]) == expected
+
+
+def make_app(minimum_size=100):
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, encodings=["gzip"], minimum_size=minimum_size)
+
+    @app.get("/small")
+    async def small():
+        return PlainTextResponse("ok", headers={"ETag": '"abc"'})
+
+    @app.get("/large")
+    async def large():
+        return PlainTextResponse(ROW * 50, headers={"ETag": '"abc"'})
+
+    @app.get("/events")
+    async def events():
+        return StreamingResponse(iter([ROW * 50]), media_type="text/event-stream")
+
+    return app
+
+
+async def raw_get(app, path, accept_encoding="gzip"):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        async with client.stream("GET", path, headers={"Accept-Encoding": accept_encoding}) as response:
+            chunks = [chunk async for chunk in response.aiter_raw()]
+    return response, chunks
+
+
+@pytest.mark.asyncio
+async def test_streaming_response_is_compressed_chunk_by_chunk():
+    sent = []
+
+    async def streaming_app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/csv")]})
+        for _ in range(3):
+            await send({"type": "http.response.body", "body": (ROW * 50).encode(), "more_body": True})
+            # The compressed chunk went out before the next one is produced.
+            assert sent[-1]["type"] == "http.response.body" and sent[-1]["body"]
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/export", "headers": [(b"accept-encoding", b"gzip")]}
+    await CompressionMiddleware(streaming_app, encodings=["gzip"], minimum_size=100)(scope, None, send)
+
+    start, *bodies = sent
+    headers = dict(start["headers"])
+    assert headers[b"content-encoding"] == b"gzip"
+    assert headers[b"vary"] == b"Accept-Encoding"
+    # Every chunk is flushed as it passes, so the client can decode each one without waiting for the rest.
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    assert [decompressor.decompress(body["body"]).decode() for body in bodies] == [ROW * 50] * 3 + [""]
+    assert [body["more_body"] for body in bodies] == [True, True, True, False]
+    assert gzip.decompress(b"".join(body["body"] for body in bodies)).decode() == ROW * 150
+
+
+@pytest.mark.asyncio
+async def test_small_bodies_and_event_streams_are_not_compressed():
+    small, chunks = await raw_get(make_app(), "/small")
+    assert "content-encoding" not in small.headers
+    assert b"".join(chunks) == b"ok"
+    assert small.headers["etag"] == '"abc"'
+
+    events, _ = await raw_get(make_app(), "/events")
+    assert "content-encoding" not in events.headers
+
+
+@pytest.mark.asyncio
+async def test_compressed_response_gets_weak_etag():
+    response, chunks = await raw_get(make_app(), "/large")
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == 'W/"abc"'
+    assert gzip.decompress(b"".join(chunks)).decode() == ROW * 50
+
+
+@pytest.mark.asyncio
+async def test_client_without_supported_encoding_gets_identity():
+    response, chunks = await raw_get(make_app(), "/large", accept_encoding="br")
+
+    assert "content-encoding" not in response.headers
+    assert b"".join(chunks).decode() == ROW * 50
@@ -0,0 +1,39 @@
+import pytest
+
+from app.core.cursor import (
+    decode_cursor,
+    encode_cursor,
+    next_book_cursor,
+    normalize_book_sort,
+)
+
+
+def test_normalize_book_sort_falls_back_like_stored_function():
+    assert normalize_book_sort("created_at", "DESC") == ("title", "desc")
+    assert normalize_book_sort("published_year", "sideways") == ("published_year", "asc")
+
+
+@pytest.mark.parametrize("value", ["Dune", 1965, "978014044913"])
+def test_cursor_round_trip(value):
+    cursor = encode_cursor("title", "asc", value, 42)
+    assert decode_cursor(cursor, "title", "asc") == (value, 42)
+
+
+def test_decode_cursor_rejects_other_sorting():
+    cursor = encode_cursor("title", "asc", "Dune", 42)
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, "published_year", "asc")
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", "e30"])
+def test_decode_cursor_rejects_garbage(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, "title", "asc")
+
+
+def test_next_book_cursor_only_for_full_pages():
+    books = [{"id": 1, "title": "A"}, {"id": 2, "title": "B"}]
+    assert next_book_cursor(books, "title", "asc", limit=3) is None
+
+    cursor = next_book_cursor(books, "title", "asc", limit=2)
+    assert decode_cursor(cursor, "title", "asc") == ("B", 2)
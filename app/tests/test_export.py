@@ -0,0 +1,68 @@
+import csv
+import io
+import json
+
+import pytest
+
+from app.core.export import export_chunks
+
+BOOKS = [
+    {
+        "id": 1,
+        "title": "Dune",
+        "isbn": "9780441013593",
+        "published_year": 1965,
+        "genre": "Fiction",
+        "author_id": 1,
+        "author_name": "Frank Herbert",
+    },
+    {
+        "id": 2,
+        "title": "Cosmos",
+        "isbn": "9780345539434",
+        "published_year": 1980,
+        "genre": "Science",
+        "author_id": 2,
+        "author_name": "Carl Sagan",
+    },
+    {
+        "id": 3,
+        "title": "SPQR",
+        "isbn": "9781631492228",
+        "published_year": 2015,
+        "genre": "History",
+        "author_id": 3,
+        "author_name": "Mary Beard",
+    },
+]
+
+
+async def fake_batches():
+    yield BOOKS[:2]
+    yield []
+    yield BOOKS[2:]
+
+
+async def collect(export_format):
+    return [chunk async for chunk in export_chunks(fake_batches(), export_format)]
+
+
+@pytest.mark.asyncio
+async def test_json_export_is_a_valid_array():
+    chunks = await collect("json")
+    assert chunks[0] == "["
+    assert json.loads("".join(chunks)) == BOOKS
+
+
+@pytest.mark.asyncio
+async def test_ndjson_export_has_one_book_per_line():
+    chunks = await collect("ndjson")
+    assert [json.loads(line) for line in "".join(chunks).splitlines()] == BOOKS
+
+
+@pytest.mark.asyncio
+async def test_csv_export_writes_header_first():
+    chunks = await collect("csv")
+    assert chunks[0].startswith("id,title,isbn")
+    rows = list(csv.DictReader(io.StringIO("".join(chunks))))
+    assert [row["title"] for row in rows] == ["Dune", "Cosmos", "SPQR"]
@@ -0,0 +1,75 @@
+import pytest
+from fastapi import Request
+from pydantic import TypeAdapter
+
+from app.core.http_cache import InMemoryCacheBackend, ResponseCache
+from app.schemas.author import AuthorDetail
+
+adapter = TypeAdapter(list[AuthorDetail])
+
+
+def make_request(if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/api/authors/", "query_string": b"", "headers": headers})
+
+
+@pytest.fixture
+def cache():
+    return ResponseCache(InMemoryCacheBackend(max_size=16, ttl=60))
+
+
+@pytest.fixture
+def loads():
+    return []
+
+
+@pytest.fixture
+def load(loads):
+    async def load_authors():
+        loads.append(1)
+        return [{"id": len(loads), "name": "Mary Beard"}], {}
+
+    return load_authors
+
+
+@pytest.mark.asyncio
+async def test_response_is_cached_until_version_bump(cache, load, loads):
+    first = await cache.respond(make_request(), load, adapter)
+    second = await cache.respond(make_request(), load, adapter)
+    assert first.body == second.body == b'[{"id":1,"name":"Mary Beard"}]'
+    assert len(loads) == 1
+
+    await cache.bump_version()
+    third = await cache.respond(make_request(), load, adapter)
+    assert third.body == b'[{"id":2,"name":"Mary Beard"}]'
+    assert third.headers["etag"] != first.headers["etag"]
+
+
+@pytest.mark.asyncio
+async def test_matching_etag_returns_not_modified(cache, load):
+    first = await cache.respond(make_request(), load, adapter)
+    etag = first.headers["etag"]
+
+    assert (await cache.respond(make_request(etag), load, adapter)).status_code == 304
+    assert (await cache.respond(make_request(f'"other", W/{etag}'), load, adapter)).status_code == 304
+    assert (await cache.respond(make_request('"other"'), load, adapter)).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_params_are_part_of_the_key(cache, load, loads):
+    await cache.respond(make_request(), load, adapter, params={"limit": 10})
+    await cache.respond(make_request(), load, adapter, params={"limit": 20})
+    assert len(loads) == 2
+
+
+@pytest.mark.asyncio
+async def test_trusted_mode_encodes_without_changing_the_body():
+    async def load():
+        return [{"id": 1, "name": "Mary Beard"}], {}
+
+    validated = await ResponseCache(InMemoryCacheBackend(max_size=16, ttl=60)).respond(make_request(), load, adapter)
+    trusted = await ResponseCache(InMemoryCacheBackend(max_size=16, ttl=60), trusted=True).respond(
+        make_request(), load, adapter
+    )
+    assert trusted.body == validated.body
+    assert trusted.headers["etag"] == validated.headers["etag"]
@@ -1,7 +1,9 @@
+import asyncpg
 import pytest
 from fastapi import status
 from httpx import ASGITransport, AsyncClient
 
+from app.core.config import settings
 from app.main import app
 from app.utils import get_unique_email
 
@@ -44,3 +46,38 @@ async def test_get_current_user():
         assert response.status_code == status.HTTP_200_OK, response.text
         user_data = response.json()
         assert user_data["email"] == unique_email
+
+
+@pytest.mark.asyncio
+async def test_concurrent_catalog_writers_do_not_block_each_other():
+    first, second = await asyncpg.connect(settings.db_url), await asyncpg.connect(settings.db_url)
+    first_transaction = first.transaction()
+    committed = False
+    try:
+        await first_transaction.start()
+        first_id = await first.fetchval("INSERT INTO authors (name) VALUES ($1) RETURNING id", get_unique_email())
+
+        # A lock shared by all catalog writers would make this wait until the first transaction ends.
+        async with second.transaction():
+            await second.execute("SET LOCAL lock_timeout = '2s'")
+            second_id = await second.fetchval(
+                "INSERT INTO authors (name) VALUES ($1) RETURNING id", get_unique_email()
+            )
+        bounds = await second.fetchrow("SELECT * FROM get_change_events_bounds_function()")
+        assert bounds["held_back"], "the second writer's event must wait for the older, running transaction"
+
+        await first_transaction.commit()
+        committed = True
+        events = await second.fetch(
+            "SELECT * FROM get_change_events_function($1, $2, NULL, NULL, 1000000, 'author')",
+            bounds["last_xid"] or 0,
+            bounds["last_seq"] or 0,
+        )
+        inserted = [event["entity_id"] for event in events if event["entity_id"] in (first_id, second_id)]
+        # The older transaction's event comes first, although it committed last.
+        assert inserted == [first_id, second_id]
+    finally:
+        if not committed:
+            await first_transaction.rollback()
+        await first.close()
+        await second.close()
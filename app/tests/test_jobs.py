@@ -0,0 +1,239 @@
+import asyncio
+import csv
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+import app.core.jobs
+import app.routers.job
+from app.core.jobs import JobWorkers, save_upload
+from app.crud.user import get_current_user
+from app.main import app as fastapi_app
+from app.schemas.job import JobDetail
+
+
+class FakeJobStore:
+    def __init__(self, cancel_after=None):
+        self.cancel_after = cancel_after
+        self.progress = []
+        self.finished = {}
+
+    async def update_job_progress_crud(self, job_id, processed_rows, failed_rows):
+        self.progress.append((processed_rows, failed_rows))
+        return self.cancel_after is not None and processed_rows >= self.cancel_after
+
+    async def finish_job_crud(self, job_id, status, result=None, result_file=None, error=None):
+        self.finished[job_id] = {"status": status, "result": result, "result_file": result_file, "error": error}
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = FakeJobStore()
+    monkeypatch.setattr(app.core.jobs, "update_job_progress_crud", store.update_job_progress_crud)
+    monkeypatch.setattr(app.core.jobs, "finish_job_crud", store.finish_job_crud)
+    return store
+
+
+async def fake_iter_books_crud(batch_size):
+    for start in (1, 3):
+        yield [
+            {"id": i, "title": f"Book {i}", "isbn": f"978000000000{i}", "published_year": 2000, "genre": "Fiction"}
+            | {"author_id": 1, "author_name": "Mary Beard"}
+            for i in (start, start + 1)
+        ]
+
+
+def job(kind, **params):
+    return {"id": uuid.uuid4(), "kind": kind, "params": params}
+
+
+@pytest.mark.asyncio
+async def test_export_job_writes_result_file(tmp_path, store, monkeypatch):
+    monkeypatch.setattr(app.core.jobs, "iter_books_crud", fake_iter_books_crud)
+    workers = JobWorkers(str(tmp_path))
+    export = job("export", format="csv")
+
+    assert await workers.run(export) == "succeeded"
+
+    finished = store.finished[export["id"]]
+    assert finished["result"] == {"rows": 4, "format": "csv"}
+    assert finished["result_file"] == "books.csv"
+    assert store.progress == [(2, 0), (4, 0)]
+    with open(workers.job_directory(export["id"]) / "books.csv", newline="") as file:
+        assert [row["id"] for row in csv.DictReader(file)] == ["1", "2", "3", "4"]
+    assert not (workers.job_directory(export["id"]) / "books.csv.part").exists()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_job_stops_at_next_progress_update(tmp_path, store, monkeypatch):
+    monkeypatch.setattr(app.core.jobs, "iter_books_crud", fake_iter_books_crud)
+    store.cancel_after = 2
+    workers = JobWorkers(str(tmp_path))
+    export = job("export", format="json")
+
+    assert await workers.run(export) == "cancelled"
+    assert store.progress == [(2, 0)]
+    assert store.finished[export["id"]]["result_file"] is None
+
+
+@pytest.mark.asyncio
+async def test_failed_job_records_error(tmp_path, store):
+    async def broken_handler(job, progress, directory):
+        raise RuntimeError("disk full")
+
+    workers = JobWorkers(str(tmp_path), handlers={"export": broken_handler})
+    export = job("export", format="csv")
+
+    assert await workers.run(export) == "failed"
+    assert store.finished[export["id"]]["error"] == "disk full"
+
+
+@pytest.mark.asyncio
+async def test_import_job_reads_stored_upload(tmp_path, store, monkeypatch):
+    imported = []
+
+    async def fake_run_book_import(chunks, import_format, mode, progress, **kwargs):
+        imported.append((b"".join([chunk async for chunk in chunks]), import_format, mode))
+        await progress(1, 0)
+        return JobReport()
+
+    class JobReport:
+        def model_dump(self, mode):
+            return {"imported": 1}
+
+    async def chunks():
+        yield b'[{"title": '
+        yield b'"Dune"}]'
+
+    monkeypatch.setattr(app.core.jobs, "run_book_import", fake_run_book_import)
+    workers = JobWorkers(str(tmp_path))
+    upload = job("import", format="json", mode="upsert")
+    await save_upload(chunks(), workers.job_directory(upload["id"]))
+
+    assert await workers.run(upload) == "succeeded"
+    assert imported == [(b'[{"title": "Dune"}]', "json", "upsert")]
+    assert store.finished[upload["id"]]["result"] == {"imported": 1}
+    # The upload is removed once it has been imported.
+    assert not any(workers.job_directory(upload["id"]).iterdir())
+
+
+@pytest.mark.asyncio
+async def test_clean_up_removes_files_of_expired_jobs(tmp_path, monkeypatch):
+    expired, kept = uuid.uuid4(), uuid.uuid4()
+    calls = []
+
+    async def fake_expire_jobs_crud(retention_seconds, stale_seconds):
+        calls.append((retention_seconds, stale_seconds))
+        return [expired]
+
+    monkeypatch.setattr(app.core.jobs, "expire_jobs_crud", fake_expire_jobs_crud)
+    workers = JobWorkers(str(tmp_path), retention_seconds=60, stale_seconds=30)
+    for job_id in (expired, kept):
+        workers.job_directory(job_id).mkdir()
+        (workers.job_directory(job_id) / "books.csv").write_text("id\n")
+
+    assert await workers.clean_up() == [expired]
+    assert calls == [(60, 30)]
+    assert not workers.job_directory(expired).exists()
+    assert workers.job_directory(kept).exists()
+
+
+def test_job_detail_hides_result_but_reports_it():
+    detail = JobDetail(
+        id=uuid.uuid4(),
+        kind="export",
+        status="succeeded",
+        params={"format": "csv"},
+        processed_rows=4,
+        failed_rows=0,
+        cancel_requested=False,
+        created_at="2024-01-01T00:00:00Z",
+        result={"rows": 4},
+        result_file="books.csv",
+    ).model_dump()
+
+    assert detail["has_result"] is True
+    assert "result" not in detail and "result_file" not in detail
+
+
+def test_upload_is_removed_when_the_job_cannot_be_queued(tmp_path, monkeypatch):
+    async def failing_create_job_crud(job_id, kind, user_id, params, node_id):
+        raise HTTPException(status_code=400, detail="Error creating job: connection lost")
+
+    monkeypatch.setattr(app.core.jobs.job_workers, "directory", tmp_path)
+    monkeypatch.setattr(app.routers.job, "create_job_crud", failing_create_job_crud)
+    fastapi_app.dependency_overrides[get_current_user] = lambda: {"id": 1}
+    try:
+        response = TestClient(fastapi_app).post(
+            "/api/jobs/import/", files={"file": ("books.json", b'[{"title": "Dune"}]', "application/json")}
+        )
+    finally:
+        fastapi_app.dependency_overrides.clear()
+
+    assert response.status_code == 400
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_workers_only_claim_jobs_of_their_node(tmp_path, monkeypatch):
+    claimed_for = []
+
+    async def fake_claim_job_crud(node_id):
+        claimed_for.append(node_id)
+        return None
+
+    async def fake_expire_jobs_crud(retention_seconds, stale_seconds):
+        return []
+
+    monkeypatch.setattr(app.core.jobs, "claim_job_crud", fake_claim_job_crud)
+    monkeypatch.setattr(app.core.jobs, "expire_jobs_crud", fake_expire_jobs_crud)
+    workers = JobWorkers(str(tmp_path), concurrency=2, node_id="node-a")
+    await workers.start()
+    await asyncio.sleep(0)
+    await workers.stop()
+
+    assert claimed_for == ["node-a", "node-a"]
+
+
+def test_jobs_are_queued_for_this_node_and_served_there(tmp_path, monkeypatch):
+    queued = []
+    job_id = uuid.uuid4()
+    stored = {
+        "id": job_id,
+        "kind": "export",
+        "status": "succeeded",
+        "params": {"format": "csv"},
+        "processed_rows": 4,
+        "failed_rows": 0,
+        "cancel_requested": False,
+        "created_at": "2024-01-01T00:00:00Z",
+        "result": {"rows": 4},
+        "result_file": "books.csv",
+        "node_id": "node-b",
+    }
+
+    async def fake_create_job_crud(job_id, kind, user_id, params, node_id):
+        queued.append(node_id)
+        return stored | {"id": job_id, "status": "queued", "node_id": node_id}
+
+    async def fake_get_job_crud(job_id, user_id):
+        return stored
+
+    monkeypatch.setattr(app.core.jobs.job_workers, "node_id", "node-a")
+    monkeypatch.setattr(app.routers.job, "create_job_crud", fake_create_job_crud)
+    monkeypatch.setattr(app.routers.job, "get_job_crud", fake_get_job_crud)
+    fastapi_app.dependency_overrides[get_current_user] = lambda: {"id": 1}
+    try:
+        client = TestClient(fastapi_app)
+        submitted = client.post("/api/jobs/export/?export_file_ext=csv")
+        result = client.get(f"/api/jobs/{job_id}/result/")
+    finally:
+        fastapi_app.dependency_overrides.clear()
+
+    assert submitted.status_code == 202
+    assert submitted.json()["node_id"] == "node-a"
+    assert queued == ["node-a"]
+    assert result.status_code == 421
+    assert "node-b" in result.json()["detail"]
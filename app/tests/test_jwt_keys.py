@@ -0,0 +1,122 @@
+from datetime import UTC, datetime, timedelta
+
+import jwt
+import pytest
+from fastapi import HTTPException
+
+import app.crud.auth
+import app.crud.user
+from app.core.jwt_keys import KeyConfigurationError, KeyRing, load_key_ring
+from app.crud.auth import create_jwt_token, decrypt_jwt
+from app.crud.user import verify_user_and_create_jwt
+from app.schemas.user import UserLogin
+
+OLD_SECRET = "o" * 32
+NEW_SECRET = "n" * 32
+
+
+def claims(minutes=5):
+    return {"sub": "john.doe@example.com", "exp": datetime.now(UTC) + timedelta(minutes=minutes)}
+
+
+def test_token_carries_kid_and_verifies_on_another_ring():
+    token = KeyRing(NEW_SECRET, "2024-06").sign(claims())
+
+    assert jwt.get_unverified_header(token)["kid"] == "2024-06"
+    # Another process configured with the same settings accepts it.
+    assert KeyRing(NEW_SECRET, "2024-06").verify(token)["sub"] == "john.doe@example.com"
+
+
+def test_rotation_keeps_previous_keys_valid():
+    old_token = KeyRing(OLD_SECRET, "old").sign(claims())
+    ring = KeyRing(NEW_SECRET, "new", verification_keys={"old": OLD_SECRET})
+
+    assert ring.kids == ["old", "new"]
+    assert ring.verify(old_token)["sub"] == "john.doe@example.com"
+    assert jwt.get_unverified_header(ring.sign(claims()))["kid"] == "new"
+
+
+@pytest.mark.parametrize("headers", [{"kid": "retired"}, {}])
+def test_unknown_or_missing_kid_is_rejected(headers):
+    token = jwt.encode(claims(), OLD_SECRET, algorithm="HS256", headers=headers)
+
+    with pytest.raises(jwt.InvalidTokenError):
+        KeyRing(NEW_SECRET, "new", verification_keys={"old": OLD_SECRET}).verify(token)
+
+
+def test_short_secret_is_rejected():
+    with pytest.raises(KeyConfigurationError):
+        KeyRing("too-short")
+
+
+def test_kid_with_two_different_secrets_is_rejected():
+    with pytest.raises(KeyConfigurationError):
+        KeyRing(NEW_SECRET, "current", verification_keys={"current": OLD_SECRET})
+    # Listing the signing key itself among the verification keys is fine.
+    assert KeyRing(NEW_SECRET, "current", verification_keys={"current": NEW_SECRET}).kids == ["current"]
+
+
+def test_verification_only_ring_cannot_sign():
+    token = KeyRing(NEW_SECRET, "new").sign(claims())
+    ring = load_key_ring(None, None, "new", {"new": NEW_SECRET})
+
+    assert ring.verify(token)["sub"] == "john.doe@example.com"
+    with pytest.raises(KeyConfigurationError):
+        ring.sign(claims())
+
+
+@pytest.mark.parametrize("key_type", ["rsa", "ed25519"])
+def test_asymmetric_keys_verify_with_public_key_only(key_type):
+    pytest.importorskip("cryptography")
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+
+    private_key = (
+        rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        if key_type == "rsa"
+        else ed25519.Ed25519PrivateKey.generate()
+    )
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+    public_pem = (
+        private_key.public_key()
+        .public_bytes(serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo)
+        .decode()
+    )
+
+    signer = KeyRing(private_pem, "k1")
+    token = signer.sign(claims())
+
+    assert jwt.get_unverified_header(token)["alg"] == ("RS256" if key_type == "rsa" else "EdDSA")
+    assert KeyRing(verification_keys={"k1": public_pem}).verify(token)["sub"] == "john.doe@example.com"
+
+
+def test_decrypt_jwt_rejects_expired_and_foreign_tokens(monkeypatch):
+    monkeypatch.setattr(app.crud.auth, "key_ring", KeyRing(NEW_SECRET, "new"))
+
+    assert decrypt_jwt(create_jwt_token("john.doe@example.com")) == "john.doe@example.com"
+    with pytest.raises(HTTPException) as expired:
+        decrypt_jwt(KeyRing(NEW_SECRET, "new").sign(claims(minutes=-1)))
+    assert expired.value.detail == "Token expired"
+    with pytest.raises(HTTPException) as foreign:
+        decrypt_jwt(KeyRing(OLD_SECRET, "new").sign(claims()))
+    assert foreign.value.detail == "Invalid token"
+
+
+@pytest.mark.asyncio
+async def test_login_on_a_verification_only_node_is_unavailable(monkeypatch):
+    async def fake_get_user_by_email_crud(email):
+        return {"email": email, "hashed_password": "hash"}
+
+    async def fake_verify(hashed_password, password):
+        return True
+
+    monkeypatch.setattr(app.crud.auth, "key_ring", load_key_ring(None, None, "new", {"new": NEW_SECRET}))
+    monkeypatch.setattr(app.crud.user, "get_user_by_email_crud", fake_get_user_by_email_crud)
+    monkeypatch.setattr(app.crud.user.password_hashing, "verify", fake_verify)
+
+    with pytest.raises(HTTPException) as unavailable:
+        await verify_user_and_create_jwt(UserLogin(email="john.doe@example.com", password="password123"))
+    assert unavailable.value.status_code == 503
+    assert unavailable.value.detail == "This node cannot issue tokens"
@@ -0,0 +1,48 @@
+import os
+
+from fastapi.testclient import TestClient
+from prometheus_client import Counter, generate_latest, values
+
+import app.core.metrics
+import app.routers.book
+from app.core.metrics import MULTIPROC_DIR_ENV, metrics_registry, query_function_name
+from app.main import app as fastapi_app
+
+
+def test_query_function_name():
+    assert query_function_name("SELECT * FROM get_books_function($1, $2)") == "get_books_function"
+    assert query_function_name("SELECT 1") == "other"
+
+
+def test_requests_are_labelled_by_route_template(monkeypatch):
+    async def fake_get_books_by_ids_crud(book_ids):
+        return []
+
+    monkeypatch.setattr(app.routers.book, "get_books_by_ids_crud", fake_get_books_by_ids_crud)
+    client = TestClient(fastapi_app)
+    client.get("/api/books/batch/?ids=1")
+    client.get("/no/such/path/12345")
+
+    body = client.get("/metrics").text
+    assert 'http_requests_total{method="GET",route="/api/books/batch/",status="200"}' in body
+    assert 'http_requests_total{method="GET",route="<unmatched>",status="404"}' in body
+    assert "12345" not in body
+    assert "http_requests_in_progress" in body
+    assert "password_hash_duration_seconds" in body
+
+
+def test_multiprocess_metrics_merge_all_workers(monkeypatch, tmp_path):
+    monkeypatch.setenv(MULTIPROC_DIR_ENV, str(tmp_path))
+    monkeypatch.setattr(app.core.metrics, "_stats_collectors", [])
+    app.core.metrics._multiprocess_registry.cache_clear()
+    app.core.metrics.register_stats_collector("test_component", lambda: {"size": 3}, "Test component")
+    # Two workers, each counting in its own file.
+    for pid, count in ((101, 1), (102, 2)):
+        monkeypatch.setattr(values, "ValueClass", values.MultiProcessValue(lambda pid=pid: pid))
+        Counter("test_worker_requests", "Requests.", registry=None).inc(count)
+
+    body = generate_latest(metrics_registry()).decode()
+    app.core.metrics._multiprocess_registry.cache_clear()
+
+    assert "test_worker_requests_total 3.0" in body
+    assert f'test_component_size{{pid="{os.getpid()}"}} 3.0' in body
@@ -0,0 +1,123 @@
+from pathlib import Path
+
+import pytest
+
+from app.core.migrations import (
+    Migration,
+    MigrationError,
+    apply_migration,
+    concurrent_index_name,
+    load_migrations,
+    plan,
+    split_statements,
+)
+
+MIGRATIONS_DIR = Path(__file__).parent.parent / "migrations"
+
+
+def test_versioned_migrations_run_before_repeatable_ones():
+    names = [migration.filename for migration in load_migrations(MIGRATIONS_DIR)]
+    assert names[0] == "001_create_tables.sql"
+    first_repeatable = next(index for index, name in enumerate(names) if name.startswith("_"))
+    assert all(name.startswith("_") for name in names[first_repeatable:])
+    assert all(name[0].isdigit() for name in names[:first_repeatable])
+
+
+def test_unexpected_file_names_are_rejected(tmp_path):
+    (tmp_path / "create_tables.sql").write_text("SELECT 1;")
+    with pytest.raises(MigrationError):
+        load_migrations(tmp_path)
+
+
+def test_plan_compares_checksums():
+    versioned = Migration("001_tables.sql", "CREATE TABLE t (id INT);")
+    edited = Migration("002_more.sql", "CREATE TABLE u (id INT);")
+    function = Migration("_function.sql", "CREATE OR REPLACE FUNCTION f() ...")
+    new = Migration("_new.sql", "SELECT 1;")
+    applied = {versioned.filename: versioned.checksum, edited.filename: "old", function.filename: "old"}
+
+    states = {state.migration.filename: state.status for state in plan([versioned, edited, function, new], applied)}
+    assert states == {
+        "001_tables.sql": "applied",
+        "002_more.sql": "modified",
+        "_function.sql": "changed",
+        "_new.sql": "pending",
+    }
+
+
+def test_no_transaction_directive():
+    assert Migration("001_a.sql", "CREATE INDEX i ON t (c);").transactional
+    assert not Migration(
+        "002_b.sql", "-- migrate: no-transaction\nCREATE INDEX CONCURRENTLY i ON t (c);"
+    ).transactional
+    index_migration = MIGRATIONS_DIR / "006_create_author_books_index.sql"
+    assert not Migration(index_migration.name, index_migration.read_text()).transactional
+
+
+def test_split_statements_respects_quotes_bodies_and_comments():
+    sql = """
+    -- a comment; with a semicolon
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS a ON t (c);
+    INSERT INTO t (c) VALUES ('x;y');
+    CREATE FUNCTION f() RETURNS INT AS $$ SELECT 1; $$ LANGUAGE sql;
+    /* trailing; comment */
+    """
+    assert split_statements(sql) == [
+        "-- a comment; with a semicolon\n    CREATE INDEX CONCURRENTLY IF NOT EXISTS a ON t (c)",
+        "INSERT INTO t (c) VALUES ('x;y')",
+        "CREATE FUNCTION f() RETURNS INT AS $$ SELECT 1; $$ LANGUAGE sql",
+    ]
+
+
+class FakeIndexConnection:
+    """Builds indexes like CREATE INDEX CONCURRENTLY: a build that fails leaves the index behind, invalid."""
+
+    def __init__(self, failing_builds=0):
+        self.failing_builds = failing_builds
+        self.indexes = {}
+        self.executed = []
+
+    async def fetchval(self, query, name):
+        assert "indisvalid" in query
+        return None if name not in self.indexes else not self.indexes[name]
+
+    async def execute(self, statement, *args):
+        self.executed.append(statement.split(" ON ")[0] if args == () else "record")
+        if name := concurrent_index_name(statement):
+            if name in self.indexes:
+                return
+            self.indexes[name] = False
+            if self.failing_builds:
+                self.failing_builds -= 1
+                raise RuntimeError("canceling statement due to lock timeout")
+            self.indexes[name] = True
+        elif statement.startswith("DROP INDEX CONCURRENTLY IF EXISTS"):
+            self.indexes.pop(statement.rsplit(" ", 1)[1], None)
+
+
+def test_concurrent_index_name():
+    assert concurrent_index_name("-- comment\nCREATE INDEX CONCURRENTLY IF NOT EXISTS idx_a ON t (c)") == "idx_a"
+    assert concurrent_index_name('create unique index concurrently if not exists s."Idx" on t (c)') == 's."Idx"'
+    assert concurrent_index_name("CREATE INDEX idx_a ON t (c)") is None
+
+
+@pytest.mark.asyncio
+async def test_retry_drops_the_invalid_index_of_a_failed_concurrent_build():
+    migration = Migration(
+        "006_index.sql", "-- migrate: no-transaction\nCREATE INDEX CONCURRENTLY IF NOT EXISTS idx_a ON t (c);"
+    )
+    conn = FakeIndexConnection(failing_builds=1)
+
+    with pytest.raises(RuntimeError):
+        await apply_migration(conn, migration)
+    assert conn.indexes == {"idx_a": False}
+    assert "record" not in conn.executed
+
+    conn.executed.clear()
+    await apply_migration(conn, migration)
+    assert conn.indexes == {"idx_a": True}
+    assert conn.executed == [
+        "DROP INDEX CONCURRENTLY IF EXISTS idx_a",
+        "-- migrate: no-transaction\nCREATE INDEX CONCURRENTLY IF NOT EXISTS idx_a",
+        "record",
+    ]
@@ -0,0 +1,105 @@
+import time
+from contextlib import asynccontextmanager
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import app.core.database as database
+import app.core.replication as replication
+from app.core.config import settings
+from app.core.http_cache import response_cache
+from app.core.replication import (
+    ReadYourWritesMiddleware,
+    format_lsn,
+    parse_lsn,
+    record_write_lsn,
+    required_lsn,
+)
+from app.crud.book import update_book_crud
+from app.schemas.book import BookUpdate
+
+
+class FakeConnection:
+    def __init__(self, lsn):
+        self.lsn = lsn
+
+    async def fetchval(self, query):
+        assert "pg_current_wal_lsn" in query
+        return self.lsn
+
+
+@pytest.fixture
+def replica(monkeypatch):
+    monkeypatch.setattr(settings, "database_replica_url", "postgresql://replica/db")
+    monkeypatch.setattr(replication, "_last_written", None)
+
+
+def test_lsn_round_trip():
+    assert parse_lsn("16/B374D848") == (0x16 << 32) | 0xB374D848
+    assert format_lsn(parse_lsn("16/B374D848")) == "16/B374D848"
+    assert parse_lsn("not-an-lsn") is None
+    assert parse_lsn("") is None
+
+
+@pytest.mark.asyncio
+async def test_writes_are_not_tracked_without_a_replica(monkeypatch):
+    monkeypatch.setattr(settings, "database_replica_url", None)
+    monkeypatch.setattr(replication, "_last_written", None)
+    await record_write_lsn(FakeConnection("0/10"))
+    assert required_lsn() is None
+
+
+def test_middleware_returns_and_reads_the_written_lsn(replica):
+    app = FastAPI()
+    seen = []
+
+    @app.post("/write/")
+    async def write():
+        await record_write_lsn(FakeConnection("0/3000"))
+        return {}
+
+    @app.get("/read/")
+    async def read():
+        seen.append(required_lsn())
+        return {}
+
+    client = TestClient(app)
+    app.add_middleware(ReadYourWritesMiddleware)
+
+    response = client.post("/write/")
+    assert response.headers["x-db-lsn"] == "0/3000"
+    assert response.cookies["db_lsn"] == "0/3000"
+
+    # The process remembers its own newest write; a client's newer LSN takes precedence.
+    client.cookies.clear()
+    client.get("/read/")
+    client.get("/read/", headers={"X-DB-LSN": "1/0"})
+    assert seen == [0x3000, 1 << 32]
+    assert "x-db-lsn" not in client.get("/read/").headers
+
+
+@pytest.mark.asyncio
+async def test_reads_fall_back_to_the_primary_while_the_replica_is_down(replica, monkeypatch):
+    primary = object()
+
+    @asynccontextmanager
+    async def fake_get_connection():
+        yield primary
+
+    monkeypatch.setattr(database, "get_connection", fake_get_connection)
+    monkeypatch.setattr(database, "_replica_down_until", time.monotonic() + 60)
+    async with database.get_read_connection() as conn:
+        assert conn is primary
+
+
+@pytest.mark.asyncio
+async def test_committed_write_succeeds_when_bookkeeping_fails(replica, fake_connection, monkeypatch):
+    async def broken_bump_version():
+        raise RuntimeError("cache backend unreachable")
+
+    # The fake connection cannot report a WAL position and the cache cannot be bumped.
+    monkeypatch.setattr(response_cache, "bump_version", broken_bump_version)
+    fake_connection.respond = lambda query, args: [{"id": args[0], "title": args[1]}]
+
+    assert await update_book_crud(7, BookUpdate(title="SPQR")) == {"id": 7, "title": "SPQR"}
@@ -0,0 +1,31 @@
+import pytest
+from argon2.exceptions import VerifyMismatchError
+
+from app.core.security import PasswordHashing
+
+
+@pytest.fixture
+def hashing():
+    hashing = PasswordHashing(time_cost=1, memory_cost=8192, parallelism=1, max_concurrency=1)
+    yield hashing
+    hashing.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_hash_and_verify_run_in_executor(hashing):
+    hashed = await hashing.hash("strongpassword")
+    assert await hashing.verify(hashed, "strongpassword")
+    with pytest.raises(VerifyMismatchError):
+        await hashing.verify(hashed, "wrongpassword")
+    assert hashing.stats()["completed"] == 3
+    assert hashing.stats()["in_flight"] == 0
+    assert hashing.stats()["waiting"] == 0
+
+
+@pytest.mark.asyncio
+async def test_needs_rehash_when_parameters_change(hashing):
+    hashed = await hashing.hash("strongpassword")
+    assert not hashing.needs_rehash(hashed)
+
+    stronger = PasswordHashing(time_cost=2, memory_cost=8192, parallelism=1)
+    assert stronger.needs_rehash(hashed)
@@ -0,0 +1,67 @@
+import os
+
+import httpx
+import pytest
+
+from app.core.metrics import MULTIPROC_DIR_ENV
+from app.main import app
+from app.routers import health
+from app.serve import prepare_metrics_directory, worker_pool_sizes
+
+
+@pytest.mark.parametrize(
+    "budget, workers, expected",
+    [
+        (None, 4, (2, 10)),
+        (44, 4, (2, 10)),
+        (40, 4, (2, 9)),
+        (24, 8, (2, 2)),
+        (14, 7, (1, 1)),
+    ],
+)
+def test_worker_pool_sizes_share_the_budget(budget, workers, expected):
+    # Every worker also opens one dedicated connection (the change feed listener) from its share.
+    assert worker_pool_sizes(budget, workers, min_size=2, max_size=10) == expected
+
+
+@pytest.mark.parametrize("budget", [3, 4, 7])
+def test_worker_pool_sizes_rejects_too_small_budget(budget):
+    with pytest.raises(ValueError):
+        worker_pool_sizes(budget, 4, min_size=2, max_size=10)
+
+
+def test_prepare_metrics_directory_clears_files_of_the_last_run(monkeypatch, tmp_path):
+    monkeypatch.setenv(MULTIPROC_DIR_ENV, str(tmp_path))
+    (tmp_path / "counter_123.db").write_bytes(b"stale")
+
+    assert prepare_metrics_directory(4) is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_prepare_metrics_directory_creates_one_for_several_workers(monkeypatch):
+    monkeypatch.delenv(MULTIPROC_DIR_ENV, raising=False)
+    assert prepare_metrics_directory(1) is None
+    assert MULTIPROC_DIR_ENV not in os.environ
+
+    created = prepare_metrics_directory(2)
+    try:
+        assert os.environ[MULTIPROC_DIR_ENV] == created
+        assert os.path.isdir(created)
+    finally:
+        os.rmdir(created)
+
+
+@pytest.mark.asyncio
+async def test_health_endpoints(monkeypatch):
+    def unreachable_database():
+        raise OSError("Connection refused")
+
+    monkeypatch.setattr(health, "get_connection", unreachable_database)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        live = await client.get("/health/live")
+        ready = await client.get("/health/ready")
+
+    assert live.status_code == 200
+    assert ready.status_code == 503
+    assert ready.json() == {"status": "unavailable", "detail": "Connection refused"}
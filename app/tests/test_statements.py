@@ -0,0 +1,41 @@
+import pytest
+
+from app.core.statements import StatementRegistry
+
+
+class FakeProxy:
+    def __init__(self, conn):
+        self._con = conn
+
+    def __getattr__(self, name):
+        return getattr(self._con, name)
+
+
+@pytest.mark.asyncio
+async def test_statement_is_prepared_once_per_connection(fake_connection_factory):
+    registry = StatementRegistry()
+    conn = fake_connection_factory()
+    conn.respond = lambda query, args: [{"query": query, "args": args}]
+    query = "SELECT * FROM get_books_function($1)"
+
+    await registry.fetch(FakeProxy(conn), query, 1)
+    result = await registry.fetch(FakeProxy(conn), query, 2)
+
+    assert conn.prepared == [query]
+    assert result == [{"query": query, "args": (2,)}]
+    assert registry.stats()["hits"] == 1
+    assert registry.stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_statements_are_not_shared_between_connections(fake_connection_factory):
+    registry = StatementRegistry()
+    first, second = fake_connection_factory(), fake_connection_factory()
+    query = "SELECT * FROM get_user_by_email_function($1)"
+
+    await registry.fetch(first, query, "a@example.com")
+    await registry.fetch(second, query, "b@example.com")
+
+    assert first.prepared == [query]
+    assert second.prepared == [query]
+    assert registry.stats() == {"hits": 0, "misses": 2, "connections": 2, "prepared": 2}
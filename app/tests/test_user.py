@@ -2,51 +2,43 @@ import datetime
 
 import pytest
 
-from app.crud.user import create_user_crud, get_user_by_email_crud
+from app.crud.auth import create_jwt_token
+from app.crud.user import create_user_crud, get_current_user, get_user_by_email_crud
 from app.schemas.user import UserCreate
 from app.utils import get_unique_email
 
 
-class FakeUserConnection:
-    async def fetch(self, query, *args, **kwargs):
-        if "get_user_by_email_function" in query:
-            email = args[0]
-            if email == "existing@example.com":
-                return [
-                    {
-                        "id": 1,
-                        "email": email,
-                        "hashed_password": "hashedpassword",
-                        "full_name": "Existing User",
-                        "created_at": datetime.datetime.now(),
-                    }
-                ]
-            return []  # Simulate no user found for new email
-        elif "create_user_function" in query:
-            # Return a dummy record for user creation
+def respond(query, args):
+    if "get_user_by_email_function" in query:
+        email = args[0]
+        if email == "existing@example.com":
             return [
                 {
-                    "id": 2,
-                    "email": args[0],
-                    "hashed_password": args[1],
-                    "full_name": args[2],
+                    "id": 1,
+                    "email": email,
+                    "hashed_password": "hashedpassword",
+                    "full_name": "Existing User",
                     "created_at": datetime.datetime.now(),
                 }
             ]
-        return []
-
-    async def close(self):
-        pass
+        return []  # Simulate no user found for new email
+    elif "create_user_function" in query:
+        # Return a dummy record for user creation
+        return [
+            {
+                "id": 2,
+                "email": args[0],
+                "hashed_password": args[1],
+                "full_name": args[2],
+                "created_at": datetime.datetime.now(),
+            }
+        ]
+    return []
 
 
 @pytest.fixture(autouse=True)
-def fake_db_user(monkeypatch):
-    async def fake_get_connection():
-        return FakeUserConnection()
-
-    import app.utils
-
-    monkeypatch.setattr(app.utils, "get_connection", fake_get_connection)
+def fake_db_user(fake_connection):
+    fake_connection.respond = respond
 
 
 @pytest.mark.asyncio
@@ -61,3 +53,41 @@ async def test_create_user_crud_success():
     created_user = await create_user_crud(user_data)
     assert created_user["email"] == user_data.email
     assert created_user["full_name"] == "New User"
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_is_cached(monkeypatch):
+    import app.crud.user
+
+    lookups = []
+    real_lookup = app.crud.user.get_user_by_email_crud
+
+    async def counting_lookup(email):
+        lookups.append(email)
+        return await real_lookup(email)
+
+    monkeypatch.setattr(app.crud.user, "get_user_by_email_crud", counting_lookup)
+    app.crud.user.user_cache.clear()
+
+    token = create_jwt_token("existing@example.com")
+    first = await get_current_user(token)
+    second = await get_current_user(token)
+
+    assert first["email"] == second["email"] == "existing@example.com"
+    assert lookups == ["existing@example.com"]
+
+
+@pytest.mark.asyncio
+async def test_users_changed_drops_the_notified_users_or_all_of_them():
+    from app.crud.user import user_cache, users_changed
+
+    user_cache.clear()
+    for email in ("a@example.com", "b@example.com", "c@example.com"):
+        user_cache.set(email, {"email": email})
+
+    await users_changed(None, {"a@example.com"})
+    assert user_cache.get("a@example.com") is None
+    assert user_cache.get("b@example.com") is not None
+
+    await users_changed(None, None)
+    assert user_cache.stats()["size"] == 0
@@ -0,0 +1,9 @@
+"""
+HTTP load-test and latency benchmarks for the API.
+
+    python -m benchmarks seed --books 100000          # synthetic catalog in the configured database
+    python -m benchmarks run --rate 50 --output benchmarks/results/current.json
+    python -m benchmarks compare benchmarks/results/current.json --baseline benchmarks/baseline.json
+
+Run from the repository root; the database settings are read from the app's .env.
+"""
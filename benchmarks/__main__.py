@@ -0,0 +1,206 @@
+import argparse
+import asyncio
+import fnmatch
+import json
+import logging
+import platform
+import random
+import subprocess
+import sys
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from benchmarks.catalog import CatalogSize, seed_catalog
+from benchmarks.compression import DEFAULT_LEVELS, compression_report, format_report
+from benchmarks.runner import run_scenario
+from benchmarks.scenarios import SCENARIOS, BenchContext, prepare_context
+from benchmarks.stats import compare
+
+logger = logging.getLogger("benchmarks")
+
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def _run(args: argparse.Namespace) -> dict[str, Any]:
+    rng = random.Random(args.seed)
+    ctx = BenchContext(author_count=args.authors, user_count=args.users)
+    scenarios = [
+        scenario
+        for scenario in SCENARIOS
+        if (args.include_writes or not scenario.writes)
+        and (not args.only or any(fnmatch.fnmatch(scenario.name, pattern) for pattern in args.only))
+    ]
+    limits = httpx.Limits(max_connections=args.max_in_flight, max_keepalive_connections=args.max_in_flight)
+    endpoints = {}
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        await prepare_context(client, ctx, rng)
+        for scenario in scenarios:
+            rate = scenario.rate or args.rate
+            logger.info("Running %s at %s req/s for %ss", scenario.name, rate, args.duration)
+            result = await run_scenario(
+                client, scenario, ctx, rng, rate, args.duration, warmup=args.warmup, max_in_flight=args.max_in_flight
+            )
+            if result is None:
+                logger.warning("%s sent no requests", scenario.name)
+                continue
+            endpoints[scenario.name] = result
+            logger.info(
+                "%s: %.1f req/s, p50 %.1f ms, p95 %.1f ms, p99 %.1f ms, errors %.2f%%",
+                scenario.name,
+                result["rps"],
+                result["p50_ms"],
+                result["p95_ms"],
+                result["p99_ms"],
+                result["error_rate"] * 100,
+            )
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(UTC).isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "base_url": args.base_url,
+            "rate": args.rate,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "max_in_flight": args.max_in_flight,
+            "seed": args.seed,
+            "include_writes": args.include_writes,
+        },
+        "endpoints": endpoints,
+    }
+
+
+def _add_catalog_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = CatalogSize()
+    parser.add_argument("--authors", type=int, default=defaults.authors, help="Number of seeded authors")
+    parser.add_argument("--users", type=int, default=defaults.users, help="Number of seeded users")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed, for reproducible data and requests")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="HTTP load-test and latency benchmarks.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed = commands.add_parser("seed", help="Fill the configured database with a synthetic catalog")
+    _add_catalog_arguments(seed)
+    seed.add_argument("--books", type=int, default=CatalogSize().books, help="Number of seeded books")
+    seed.add_argument("--reset", action="store_true", help="Remove earlier benchmark data first")
+
+    run = commands.add_parser("run", help="Load-test a running server and write the results as JSON")
+    _add_catalog_arguments(run)
+    run.add_argument("--base-url", default="http://localhost:8000")
+    run.add_argument("--rate", type=float, default=50, help="Requests per second per scenario")
+    run.add_argument("--duration", type=float, default=10, help="Measured seconds per scenario")
+    run.add_argument("--warmup", type=float, default=2, help="Unmeasured seconds before each scenario")
+    run.add_argument("--max-in-flight", type=int, default=64, help="Concurrent requests per scenario")
+    run.add_argument("--timeout", type=float, default=30, help="Per-request timeout in seconds")
+    run.add_argument("--include-writes", action="store_true", help="Also run scenarios that modify data")
+    run.add_argument("--only", nargs="*", help="Scenario name patterns to run, e.g. 'books.*'")
+    run.add_argument("--output", type=Path, help="Where to write the results (default: stdout)")
+
+    check = commands.add_parser("compare", help="Flag regressions of a result file against a baseline")
+    check.add_argument("results", type=Path)
+    check.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    check.add_argument("--latency-threshold", type=float, default=0.10, help="Allowed relative latency increase")
+    check.add_argument("--error-threshold", type=float, default=0.01, help="Allowed absolute error-rate increase")
+    check.add_argument(
+        "--record-baseline",
+        action="store_true",
+        help="Store the results as the baseline instead of comparing: the first time, or to accept a known change",
+    )
+
+    compression = commands.add_parser(
+        "compression", help="Measure CPU time against bytes saved when compressing a synthetic catalog export"
+    )
+    _add_catalog_arguments(compression)
+    compression.add_argument("--books", type=int, default=CatalogSize().books, help="Number of exported books")
+    compression.add_argument(
+        "--formats", nargs="*", default=["json", "ndjson", "csv"], choices=["json", "ndjson", "csv"]
+    )
+    compression.add_argument(
+        "--levels",
+        nargs="*",
+        metavar="ENCODING:LEVEL,...",
+        help="Levels to try per encoding, e.g. gzip:1,6,9 zstd:3 (default: a fast, default and high level each)",
+    )
+    compression.add_argument("--output", type=Path, help="Also write the results as JSON")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    if args.command == "seed":
+        size = CatalogSize(authors=args.authors, books=args.books, users=args.users)
+        asyncio.run(seed_catalog(size, seed=args.seed, reset=args.reset))
+        logger.info("Seeded %s authors, %s books and %s users", size.authors, size.books, size.users)
+        return 0
+
+    if args.command == "run":
+        document = json.dumps(asyncio.run(_run(args)), indent=2)
+        if args.output is None:
+            print(document)
+        else:
+            args.output.parent.mkdir(parents=True, exist_ok=True)
+            args.output.write_text(document + "\n")
+            logger.info("Results written to %s", args.output)
+        return 0
+
+    if args.command == "compression":
+        levels = DEFAULT_LEVELS
+        if args.levels:
+            levels = {}
+            for item in args.levels:
+                encoding, _, values = item.partition(":")
+                levels[encoding] = tuple(int(value) for value in values.split(",") if value)
+        size = CatalogSize(authors=args.authors, books=args.books, users=args.users)
+        report = compression_report(size, args.formats, levels, seed=args.seed)
+        print(format_report(report))
+        if args.output is not None:
+            args.output.parent.mkdir(parents=True, exist_ok=True)
+            args.output.write_text(json.dumps(report, indent=2) + "\n")
+            logger.info("Results written to %s", args.output)
+        return 0
+
+    results = json.loads(args.results.read_text())
+    if args.record_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n")
+        logger.info("Recorded %s as the baseline in %s", args.results, args.baseline)
+        return 0
+    if not args.baseline.exists():
+        logger.error(
+            "No baseline at %s; record one on the reference machine with `compare %s --record-baseline`",
+            args.baseline,
+            args.results,
+        )
+        return 2
+    baseline = json.loads(args.baseline.read_text())
+    if unknown := sorted(set(results["endpoints"]) - set(baseline["endpoints"])):
+        logger.info("Not in the baseline, so not compared: %s", ", ".join(unknown))
+    regressions = compare(
+        baseline,
+        results,
+        latency_threshold=args.latency_threshold,
+        error_rate_threshold=args.error_threshold,
+    )
+    for regression in regressions:
+        logger.warning("Regression: %s", regression)
+    if not regressions:
+        logger.info("No regressions against %s (%s)", args.baseline, baseline["meta"].get("commit"))
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
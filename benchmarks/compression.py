@@ -0,0 +1,101 @@
+import asyncio
+import random
+import time
+from typing import Any, AsyncIterator
+
+from app.core.compression import ENCODERS
+from app.core.export import export_chunks
+from benchmarks.catalog import CatalogSize, author_name, generate_books
+
+DEFAULT_LEVELS = {"gzip": (1, 6, 9), "zstd": (1, 3, 10), "br": (1, 4, 9)}
+
+
+def synthetic_rows(size: CatalogSize, seed: int = 42) -> list[dict[str, Any]]:
+    """Export rows shaped like export_books_function's, built from the same generator as the seeded catalog."""
+    rng = random.Random(seed)
+    author_ids = list(range(1, size.authors + 1))
+    return [
+        {
+            "id": index + 1,
+            "title": title,
+            "isbn": isbn,
+            "published_year": year,
+            "genre": genre,
+            "author_id": author_id,
+            "author_name": author_name(author_id),
+        }
+        for index, (title, isbn, year, genre, author_id) in enumerate(generate_books(size, author_ids, rng))
+    ]
+
+
+async def _batches(rows: list[dict[str, Any]], batch_size: int) -> AsyncIterator[list[dict[str, Any]]]:
+    for start in range(0, len(rows), batch_size):
+        yield rows[start : start + batch_size]
+
+
+async def _collect(rows: list[dict[str, Any]], export_format: str, batch_size: int) -> list[bytes]:
+    return [chunk.encode() async for chunk in export_chunks(_batches(rows, batch_size), export_format)]
+
+
+def export_body_chunks(rows: list[dict[str, Any]], export_format: str, batch_size: int = 1000) -> list[bytes]:
+    """The body of GET /api/books/export/ as the chunks the streaming response sends."""
+    return asyncio.run(_collect(rows, export_format, batch_size))
+
+
+def measure(chunks: list[bytes], encoding: str, level: int) -> dict[str, Any]:
+    """
+    Compress `chunks` the way CompressionMiddleware does (compress and flush every chunk) and report the
+    output size and the CPU time it took.
+    """
+    encoder = ENCODERS[encoding](level)
+    input_bytes = sum(len(chunk) for chunk in chunks)
+    output_bytes = 0
+    started = time.process_time()
+    for index, chunk in enumerate(chunks):
+        last = index == len(chunks) - 1
+        output_bytes += len(encoder.compress(chunk) + (encoder.finish() if last else encoder.flush()))
+    cpu_seconds = time.process_time() - started
+    return {
+        "encoding": encoding,
+        "level": level,
+        "input_bytes": input_bytes,
+        "output_bytes": output_bytes,
+        "ratio": round(input_bytes / output_bytes, 2) if output_bytes else 0.0,
+        "cpu_ms": round(cpu_seconds * 1000, 1),
+        "mb_per_cpu_second": round(input_bytes / 1e6 / cpu_seconds, 1) if cpu_seconds > 0 else 0.0,
+    }
+
+
+def compression_report(
+    size: CatalogSize,
+    formats: list[str],
+    levels: dict[str, tuple[int, ...]],
+    batch_size: int = 1000,
+    seed: int = 42,
+) -> dict[str, list[dict[str, Any]]]:
+    """CPU time against bytes saved for every format, installed encoding and level."""
+    rows = synthetic_rows(size, seed)
+    report = {}
+    for export_format in formats:
+        chunks = export_body_chunks(rows, export_format, batch_size)
+        report[export_format] = [
+            measure(chunks, encoding, level)
+            for encoding, encoding_levels in levels.items()
+            if encoding in ENCODERS
+            for level in encoding_levels
+        ]
+    return report
+
+
+def format_report(report: dict[str, list[dict[str, Any]]]) -> str:
+    lines = [
+        f"{'format':<7} {'encoding':<8} {'level':>5} {'MB in':>8} {'MB out':>8} {'ratio':>6} {'CPU ms':>8} {'MB/s':>7}"
+    ]
+    for export_format, results in report.items():
+        for result in results:
+            lines.append(
+                f"{export_format:<7} {result['encoding']:<8} {result['level']:>5} "
+                f"{result['input_bytes'] / 1e6:>8.2f} {result['output_bytes'] / 1e6:>8.2f} {result['ratio']:>6.2f} "
+                f"{result['cpu_ms']:>8.1f} {result['mb_per_cpu_second']:>7.1f}"
+            )
+    return "\n".join(lines)
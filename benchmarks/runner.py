@@ -0,0 +1,70 @@
+"""
+Open-loop load generation: requests are started on a fixed schedule (rate per second) whether or not
+earlier ones have finished, and latency is measured from the scheduled start. A slow server therefore
+shows up as growing latency instead of silently lowering the request rate (coordinated omission).
+"""
+
+import asyncio
+import random
+from collections import Counter
+from typing import Any, Optional
+
+import httpx
+
+from benchmarks.scenarios import BenchContext, Scenario
+from benchmarks.stats import summarize
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    ctx: BenchContext,
+    rng: random.Random,
+    rate: float,
+    duration: float,
+    warmup: float = 0.0,
+    max_in_flight: int = 64,
+) -> Optional[dict[str, Any]]:
+    """Drive one scenario at `rate` requests per second; requests scheduled during `warmup` are not recorded."""
+    loop = asyncio.get_running_loop()
+    in_flight = asyncio.Semaphore(max_in_flight)
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+    skipped = 0
+
+    async def send(request: dict[str, Any], scheduled: float, record: bool) -> None:
+        async with in_flight:
+            try:
+                if scenario.send is not None:
+                    response = await scenario.send(client, request)
+                else:
+                    response = await client.request(**request)
+                status = str(response.status_code)
+                if scenario.after is not None:
+                    scenario.after(ctx, response)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+        if record:
+            latencies.append(loop.time() - scheduled)
+            statuses[status] += 1
+
+    tasks = []
+    start = loop.time()
+    measured_from = start + warmup
+    for index in range(int(rate * (warmup + duration))):
+        scheduled = start + index / rate
+        if (delay := scheduled - loop.time()) > 0:
+            await asyncio.sleep(delay)
+        request = scenario.build(rng, ctx)
+        if request is None:
+            skipped += 1
+            continue
+        tasks.append(asyncio.create_task(send(request, scheduled, record=scheduled >= measured_from)))
+    await asyncio.gather(*tasks)
+
+    if not statuses:
+        return None
+    result = summarize(latencies, statuses, loop.time() - measured_from, rate)
+    if skipped:
+        result["skipped"] = skipped
+    return result
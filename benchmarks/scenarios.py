@@ -0,0 +1,344 @@
+"""
+The requests each benchmark scenario sends, covering every router in app/routers.
+
+A scenario builds one request at a time from the shared BenchContext, which holds ids discovered
+through the API before the run. Scenarios that write are only run with --include-writes.
+"""
+
+import itertools
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional
+
+import httpx
+
+from benchmarks.catalog import (
+    AUTHOR_PREFIX,
+    BENCHMARK_EMAIL_DOMAIN,
+    BENCHMARK_PASSWORD,
+    GENRES,
+    WORDS,
+    author_name,
+    random_title,
+    user_email,
+)
+
+Request = dict[str, Any]
+IMPORT_COLUMNS = ("title", "isbn", "published_year", "genre", "author_name")
+
+
+@dataclass
+class BenchContext:
+    author_count: int
+    user_count: int
+    token: str = ""
+    author_ids: list[int] = field(default_factory=list)
+    book_ids: list[int] = field(default_factory=list)
+    cursor: Optional[str] = None
+    created_book_ids: list[int] = field(default_factory=list)
+    created_author_ids: list[int] = field(default_factory=list)
+    job_ids: list[str] = field(default_factory=list)
+    # Unique ISBNs, author names and emails for the write scenarios, distinct between runs.
+    run_tag: int = field(default_factory=lambda: int(time.time()) % 10_000)
+    counter: itertools.count = field(default_factory=itertools.count)
+
+    @property
+    def auth(self) -> dict[str, str]:
+        return {"Authorization": f"Bearer {self.token}"}
+
+    def unique(self) -> str:
+        return f"{self.run_tag:04d}{next(self.counter):06d}"
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    build: Callable[[random.Random, BenchContext], Optional[Request]]
+    # Requests per second for this scenario instead of the run's default, e.g. for Argon2-bound endpoints.
+    rate: Optional[float] = None
+    writes: bool = False
+    after: Optional[Callable[[BenchContext, httpx.Response], None]] = None
+    # Sends the request instead of client.request, e.g. to stop reading a response that never ends.
+    send: Optional[Callable[[httpx.AsyncClient, Request], Awaitable[httpx.Response]]] = None
+
+
+def _sample_author_name(rng: random.Random, ctx: BenchContext) -> str:
+    return author_name(rng.randrange(ctx.author_count))
+
+
+def _new_book(rng: random.Random, ctx: BenchContext) -> dict[str, Any]:
+    return {
+        "title": random_title(rng),
+        "isbn": f"998{ctx.unique()}",
+        "published_year": rng.randint(1800, 2020),
+        "genre": rng.choice(GENRES),
+        "author_name": _sample_author_name(rng, ctx),
+    }
+
+
+def _import_file(url: str) -> Callable[[random.Random, BenchContext], Request]:
+    def build(rng: random.Random, ctx: BenchContext) -> Request:
+        rows = [",".join(IMPORT_COLUMNS)]
+        for _ in range(50):
+            book = _new_book(rng, ctx)
+            rows.append(",".join(str(book[column]) for column in IMPORT_COLUMNS))
+        return {
+            "method": "POST",
+            "url": url,
+            "files": {"file": ("books.csv", "\n".join(rows).encode(), "text/csv")},
+            "headers": ctx.auth,
+        }
+
+    return build
+
+
+async def until_first_event(client: httpx.AsyncClient, request: Request) -> httpx.Response:
+    """Open a Server-Sent Events stream, read it up to its first event or heartbeat and disconnect."""
+    async with client.stream(**request) as response:
+        if response.is_success:
+            async for line in response.aiter_lines():
+                if line.startswith(("id:", ":")):
+                    break
+    return response
+
+
+def _pop(ids: list[int]) -> Optional[int]:
+    return ids.pop() if ids else None
+
+
+def _remember(ids_attribute: str) -> Callable[[BenchContext, httpx.Response], None]:
+    def after(ctx: BenchContext, response: httpx.Response) -> None:
+        if response.is_success:
+            getattr(ctx, ids_attribute).append(response.json()["id"])
+
+    return after
+
+
+def _delete(url: str, ids_attribute: str) -> Callable[[random.Random, BenchContext], Optional[Request]]:
+    def build(rng: random.Random, ctx: BenchContext) -> Optional[Request]:
+        item_id = _pop(getattr(ctx, ids_attribute))
+        if item_id is None:
+            return None
+        return {"method": "DELETE", "url": url.format(item_id), "headers": ctx.auth}
+
+    return build
+
+
+SCENARIOS = [
+    # app/routers/book.py
+    Scenario(
+        "books.list",
+        lambda rng, ctx: {
+            "method": "GET",
+            "url": "/api/books/",
+            "params": {"sort_by": rng.choice(("title", "published_year", "genre", "isbn")), "limit": 20},
+        },
+    ),
+    Scenario(
+        "books.list_filtered",
+        lambda rng, ctx: {
+            "method": "GET",
+            "url": "/api/books/",
+            "params": {"genre": rng.choice(GENRES), "year_from": rng.randint(1800, 1950), "year_to": 2000},
+        },
+    ),
+    Scenario(
+        "books.list_offset_deep",
+        lambda rng, ctx: {"method": "GET", "url": "/api/books/", "params": {"sort_by": "title", "offset": 50_000}},
+    ),
+    Scenario(
+        "books.list_cursor",
+        lambda rng, ctx: {"method": "GET", "url": "/api/books/", "params": {"sort_by": "title", "cursor": ctx.cursor}},
+    ),
+    Scenario(
+        "books.search",
+        lambda rng, ctx: {"method": "GET", "url": "/api/books/search/", "params": {"q": rng.choice(WORDS)}},
+    ),
+    Scenario(
+        "books.search_prefix",
+        lambda rng, ctx: {
+            "method": "GET",
+            "url": "/api/books/search/",
+            "params": {"q": rng.choice(WORDS)[:3], "prefix": True},
+        },
+    ),
+    Scenario("books.facets", lambda rng, ctx: {"method": "GET", "url": "/api/books/facets/"}),
+    Scenario(
+        "books.facets_filtered",
+        lambda rng, ctx: {"method": "GET", "url": "/api/books/facets/", "params": {"title": rng.choice(WORDS)}},
+    ),
+    Scenario(
+        "books.batch",
+        lambda rng, ctx: {
+            "method": "GET",
+            "url": "/api/books/batch/",
+            "params": {"ids": rng.sample(ctx.book_ids, min(20, len(ctx.book_ids)))},
+        },
+    ),
+    Scenario("books.get", lambda rng, ctx: {"method": "GET", "url": f"/api/books/{rng.choice(ctx.book_ids)}/"}),
+    Scenario(
+        "books.export",
+        lambda rng, ctx: {"method": "GET", "url": "/api/books/export/", "params": {"export_file_ext": "ndjson"}},
+        rate=0.5,
+    ),
+    Scenario(
+        "books.create",
+        lambda rng, ctx: {"method": "POST", "url": "/api/books/", "json": _new_book(rng, ctx), "headers": ctx.auth},
+        writes=True,
+        after=_remember("created_book_ids"),
+    ),
+    Scenario(
+        "books.update",
+        lambda rng, ctx: {
+            "method": "PUT",
+            "url": f"/api/books/{rng.choice(ctx.book_ids)}/",
+            "json": {"title": random_title(rng)},
+            "headers": ctx.auth,
+        },
+        writes=True,
+    ),
+    Scenario("books.delete", _delete("/api/books/{}/", "created_book_ids"), writes=True),
+    Scenario("books.import", _import_file("/api/books/import/"), rate=2, writes=True),
+    # app/routers/author.py
+    Scenario("authors.list", lambda rng, ctx: {"method": "GET", "url": "/api/authors/"}),
+    Scenario("authors.get", lambda rng, ctx: {"method": "GET", "url": f"/api/authors/{rng.choice(ctx.author_ids)}/"}),
+    Scenario(
+        "authors.books",
+        lambda rng, ctx: {"method": "GET", "url": f"/api/authors/{rng.choice(ctx.author_ids)}/books/"},
+    ),
+    Scenario(
+        "authors.lookup",
+        lambda rng, ctx: {
+            "method": "POST",
+            "url": "/api/authors/lookup/",
+            "json": {"names": [_sample_author_name(rng, ctx) for _ in range(20)]},
+        },
+    ),
+    Scenario(
+        "authors.create",
+        lambda rng, ctx: {
+            "method": "POST",
+            "url": "/api/authors/",
+            "json": {"name": f"{AUTHOR_PREFIX}new {ctx.unique()}"},
+            "headers": ctx.auth,
+        },
+        writes=True,
+        after=_remember("created_author_ids"),
+    ),
+    Scenario(
+        "authors.update",
+        lambda rng, ctx: (
+            {
+                "method": "PUT",
+                "url": f"/api/authors/{ctx.created_author_ids[-1]}/",
+                "json": {"name": f"{AUTHOR_PREFIX}new {ctx.unique()}"},
+                "headers": ctx.auth,
+            }
+            if ctx.created_author_ids
+            else None
+        ),
+        writes=True,
+    ),
+    Scenario("authors.delete", _delete("/api/authors/{}/", "created_author_ids"), writes=True),
+    # app/routers/user.py
+    Scenario(
+        "users.register",
+        lambda rng, ctx: {
+            "method": "POST",
+            "url": "/api/register/",
+            "json": {
+                "email": f"new{ctx.unique()}@{BENCHMARK_EMAIL_DOMAIN}",
+                "password": BENCHMARK_PASSWORD,
+                "full_name": "Bench User",
+            },
+        },
+        rate=5,
+        writes=True,
+    ),
+    Scenario(
+        "users.login",
+        lambda rng, ctx: {
+            "method": "POST",
+            "url": "/api/login/",
+            "json": {"email": user_email(rng.randrange(ctx.user_count)), "password": BENCHMARK_PASSWORD},
+        },
+        rate=5,
+    ),
+    Scenario("users.me", lambda rng, ctx: {"method": "GET", "url": "/api/me/", "headers": ctx.auth}),
+    # app/routers/job.py: submitting queues work for the job workers, so it only runs with --include-writes.
+    Scenario(
+        "jobs.import",
+        _import_file("/api/jobs/import/"),
+        rate=2,
+        writes=True,
+        after=_remember("job_ids"),
+    ),
+    Scenario(
+        "jobs.export",
+        lambda rng, ctx: {
+            "method": "POST",
+            "url": "/api/jobs/export/",
+            "params": {"export_file_ext": "ndjson"},
+            "headers": ctx.auth,
+        },
+        rate=0.5,
+        writes=True,
+        after=_remember("job_ids"),
+    ),
+    # Polls the jobs submitted above.
+    Scenario(
+        "jobs.get",
+        lambda rng, ctx: (
+            {"method": "GET", "url": f"/api/jobs/{rng.choice(ctx.job_ids)}/", "headers": ctx.auth}
+            if ctx.job_ids
+            else None
+        ),
+        writes=True,
+    ),
+    # app/routers/change.py: clients resuming from the oldest retained change, timed to their first event.
+    Scenario(
+        "changes.replay",
+        lambda rng, ctx: {"method": "GET", "url": "/api/changes/stream/", "params": {"after": "0-0"}},
+        send=until_first_event,
+    ),
+    Scenario(
+        "changes.replay_author",
+        lambda rng, ctx: {
+            "method": "GET",
+            "url": "/api/changes/stream/",
+            "params": {"after": "0-0", "author_id": rng.choice(ctx.author_ids)},
+        },
+        send=until_first_event,
+    ),
+    # app/routers/system.py
+    Scenario("system.stats", lambda rng, ctx: {"method": "GET", "url": "/api/stats/"}),
+    # app/routers/health.py: probed by the orchestrator; readiness runs one query against the pool.
+    Scenario("health.live", lambda rng, ctx: {"method": "GET", "url": "/health/live"}),
+    Scenario("health.ready", lambda rng, ctx: {"method": "GET", "url": "/health/ready"}),
+    # app/routers/metrics.py: a scrape renders every series, so it runs at a scraper's pace.
+    Scenario("metrics.scrape", lambda rng, ctx: {"method": "GET", "url": "/metrics"}, rate=1),
+]
+
+
+async def prepare_context(client: httpx.AsyncClient, ctx: BenchContext, rng: random.Random) -> None:
+    """Log in and discover author and book ids of the seeded catalog through the API."""
+    response = await client.post("/api/login/", json={"email": user_email(0), "password": BENCHMARK_PASSWORD})
+    response.raise_for_status()
+    ctx.token = response.json()["access_token"]
+
+    names = [author_name(index) for index in rng.sample(range(ctx.author_count), min(ctx.author_count, 100))]
+    response = await client.post("/api/authors/lookup/", json={"names": names})
+    response.raise_for_status()
+    ctx.author_ids = [author["id"] for author in response.json()]
+    if not ctx.author_ids:
+        raise RuntimeError("No benchmark authors found; run `python -m benchmarks seed` first.")
+
+    for author_id in ctx.author_ids[:20]:
+        response = await client.get(f"/api/authors/{author_id}/books/", params={"limit": 100})
+        response.raise_for_status()
+        ctx.book_ids.extend(book["id"] for book in response.json())
+
+    response = await client.get("/api/books/", params={"sort_by": "title", "limit": 20})
+    response.raise_for_status()
+    ctx.cursor = response.headers.get("X-Next-Cursor")
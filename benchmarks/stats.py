@@ -0,0 +1,62 @@
+import math
+from collections import Counter
+from typing import Any
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of already sorted values (0.0 for no values)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(fraction * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def is_error(status: str) -> bool:
+    return not status.isdigit() or int(status) >= 400
+
+
+def summarize(latencies: list[float], statuses: Counter, elapsed: float, target_rate: float) -> dict[str, Any]:
+    """Per-endpoint result: throughput, latency percentiles in milliseconds and error rate."""
+    latencies = sorted(latencies)
+    requests = sum(statuses.values())
+    errors = sum(count for status, count in statuses.items() if is_error(status))
+    return {
+        "target_rps": target_rate,
+        "requests": requests,
+        "errors": errors,
+        "error_rate": round(errors / requests, 4) if requests else 0.0,
+        "rps": round(requests / elapsed, 2) if elapsed > 0 else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        "statuses": dict(sorted(statuses.items())),
+    }
+
+
+def compare(
+    baseline: dict[str, Any],
+    current: dict[str, Any],
+    latency_threshold: float = 0.10,
+    error_rate_threshold: float = 0.01,
+) -> list[str]:
+    """
+    Regressions of `current` against `baseline` (two result documents): an endpoint whose p50, p95 or p99
+    grew by more than `latency_threshold` (relative), whose error rate grew by more than
+    `error_rate_threshold` (absolute), or whose achieved throughput fell short of the baseline's.
+    Endpoints present in only one of the runs are ignored.
+    """
+    regressions = []
+    for name, result in current["endpoints"].items():
+        before = baseline["endpoints"].get(name)
+        if before is None:
+            continue
+        for metric in ("p50_ms", "p95_ms", "p99_ms"):
+            if before[metric] > 0 and result[metric] > before[metric] * (1 + latency_threshold):
+                change = (result[metric] / before[metric] - 1) * 100
+                regressions.append(f"{name}: {metric} {before[metric]} -> {result[metric]} (+{change:.0f}%)")
+        if result["error_rate"] > before["error_rate"] + error_rate_threshold:
+            regressions.append(f"{name}: error_rate {before['error_rate']} -> {result['error_rate']}")
+        if result["rps"] < before["rps"] * (1 - latency_threshold):
+            regressions.append(f"{name}: rps {before['rps']} -> {result['rps']}")
+    return regressions